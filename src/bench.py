@@ -0,0 +1,145 @@
+import argparse
+import contextlib
+import io
+import json
+import pathlib
+import sys
+import tempfile
+import time
+from typing import Callable, Optional
+
+from corpus import CorpusOptions, generate_corpus_pages, write_corpus
+from markdown import markdown_to_html_node
+from textnode import BlockType, block_to_block_type, markdown_to_blocks, text_to_textnodes
+
+
+ROOT_DIR = (pathlib.Path(__file__) / pathlib.Path("../..")).resolve()
+BASELINE_PATH = pathlib.Path("bench/baseline.json")
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    # The fastest run is the least disturbed by other load on the machine
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(options: CorpusOptions, repeat: int = 5) -> dict[str, float]:
+    # Imported here so the corpus and comparison helpers do not pull in the whole build
+    from main import generate_pages_recursive
+
+    pages = list(generate_corpus_pages(options).values())
+    paragraphs = [
+        block
+        for markdown in pages
+        for block in markdown_to_blocks(markdown)
+        if block_to_block_type(block) == BlockType.PARAGRAPH
+    ]
+    trees = [markdown_to_html_node(markdown) for markdown in pages]
+
+    results = {
+        "markdown_to_html_node": measure(lambda: [markdown_to_html_node(markdown) for markdown in pages], repeat),
+        "text_to_textnodes": measure(lambda: [text_to_textnodes(paragraph) for paragraph in paragraphs], repeat),
+        "ParentNode.to_html": measure(lambda: [tree.to_html() for tree in trees], repeat),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        root = pathlib.Path(tmp)
+        write_corpus(root / "content", options)
+        (root / "template.html").write_text((ROOT_DIR / "template.html").read_text())
+        with contextlib.redirect_stdout(io.StringIO()):
+            results["generate_pages_recursive"] = measure(
+                lambda: generate_pages_recursive(root / "content", root / "template.html", root / "public"),
+                repeat,
+            )
+    return results
+
+
+def compare_results(baseline: dict[str, float], results: dict[str, float], threshold: float) -> list[str]:
+    regressions = []
+    for name, seconds in results.items():
+        previous = baseline.get(name)
+        if previous and seconds > previous * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def format_results(results: dict[str, float], baseline: Optional[dict[str, float]] = None) -> str:
+    lines = [f"{'Benchmark':<28}{'Time (ms)':>12}" + (f"{'Baseline':>12}{'Change':>10}" if baseline else "")]
+    for name, seconds in results.items():
+        line = f"{name:<28}{seconds * 1000:>12.2f}"
+        if baseline and baseline.get(name):
+            line += f"{baseline[name] * 1000:>12.2f}{(seconds / baseline[name] - 1) * 100:>+9.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the site generator on a synthetic corpus")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["run", "save", "compare"],
+        default="run",
+        help="print results, save them as the baseline, or compare them with the baseline",
+    )
+    parser.add_argument("--baseline", type=pathlib.Path, default=BASELINE_PATH, help="baseline results file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown reported as a regression by compare (0.1 is 10%%)",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark, the fastest one is kept")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--blocks-per-page", type=int, default=20)
+    parser.add_argument("--paragraph-words", type=int, default=60)
+    parser.add_argument("--link-density", type=float, default=0.05)
+    parser.add_argument("--image-density", type=float, default=0.01)
+    parser.add_argument("--emphasis-density", type=float, default=0.05)
+    parser.add_argument("--list-ratio", type=float, default=0.2)
+    parser.add_argument("--code-ratio", type=float, default=0.1)
+    parser.add_argument("--nesting-depth", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    options = CorpusOptions(
+        pages=args.pages,
+        blocks_per_page=args.blocks_per_page,
+        paragraph_words=args.paragraph_words,
+        link_density=args.link_density,
+        image_density=args.image_density,
+        emphasis_density=args.emphasis_density,
+        list_ratio=args.list_ratio,
+        code_ratio=args.code_ratio,
+        nesting_depth=args.nesting_depth,
+        seed=args.seed,
+    )
+    results = run_benchmarks(options, args.repeat)
+    baseline_path = ROOT_DIR / args.baseline
+
+    if args.command == "save":
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump({"options": vars(options), "results": results}, f, indent=2)
+        print(format_results(results))
+        print(f"Saved baseline to {baseline_path}")
+        return 0
+    if args.command == "compare":
+        with open(baseline_path, "r") as f:
+            saved = json.load(f)
+        if saved["options"] != vars(options):
+            print("Warning: the baseline was recorded with different corpus options", file=sys.stderr)
+        print(format_results(results, saved["results"]))
+        regressions = compare_results(saved["results"], results, args.threshold)
+        for name in regressions:
+            print(f"Regression: {name} is more than {args.threshold:.0%} slower than the baseline")
+        return 1 if regressions else 0
+    print(format_results(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+from typing import Callable, Optional, TextIO
+
+from manifest import generator_version, hash_file
+
+
+class RenderCache:
+    # Rendered page bodies keyed by source hash and generator version. Each entry is a file whose first
+    # line is the JSON-encoded title and the rest is the body HTML. Hits refresh the entry's mtime,
+    # which prune() uses to evict the least recently used entries once the cache exceeds max_bytes.
+    def __init__(self, directory: pathlib.Path, max_bytes: int) -> None:
+        self.directory = pathlib.Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f"RenderCache({self.directory=}, {self.max_bytes=}, {self.hits=}, {self.misses=})"
+
+    def key(self, source_path: pathlib.Path) -> str:
+        return hashlib.sha256(f"{hash_file(source_path)}:{generator_version()}".encode()).hexdigest()
+
+    def entry_path(self, key: str) -> pathlib.Path:
+        return self.directory / key[:2] / f"{key[2:]}.html"
+
+    def get(self, key: str) -> Optional[pathlib.Path]:
+        path = self.entry_path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key: str, title: str, write_body: Callable[[TextIO], None]) -> pathlib.Path:
+        path = self.entry_path(key)
+        os.makedirs(path.parent, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(json.dumps(title))
+                f.write("\n")
+                write_body(f)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        return path
+
+    def prune(self) -> int:
+        entries = []
+        total = 0
+        for path in self.directory.glob("*/*.html"):
+            stat = path.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+
+def read_entry_title(path: pathlib.Path) -> str:
+    with open(path, "r") as f:
+        return json.loads(f.readline())
+
+
+def copy_entry_body(path: pathlib.Path, fp: TextIO) -> None:
+    with open(path, "r") as f:
+        f.readline()
+        shutil.copyfileobj(f, fp)
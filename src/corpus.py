@@ -0,0 +1,106 @@
+import os
+import pathlib
+import random
+
+
+WORDS = (
+    "the", "ring", "of", "power", "elves", "dwarves", "hobbit", "shire", "mountain", "river", "journey", "council",
+    "wizard", "fellowship", "shadow", "light", "tower", "forest", "ancient", "song", "road", "king", "return",
+    "stone", "fire", "water", "star", "sword", "horn", "gate", "bridge", "lore", "tale", "map", "rune", "silver",
+)
+CODE_LINES = (
+    "def render(page):",
+    "    return template.fill(page)",
+    "for block in blocks:",
+    "    nodes.append(convert(block))",
+    "print(\"Hello, World!\")",
+    "x = [1, 2, 3]",
+)
+
+
+class CorpusOptions:
+    def __init__(
+            self,
+            pages: int = 100,
+            blocks_per_page: int = 20,
+            paragraph_words: int = 60,
+            link_density: float = 0.05,
+            image_density: float = 0.01,
+            emphasis_density: float = 0.05,
+            list_ratio: float = 0.2,
+            code_ratio: float = 0.1,
+            nesting_depth: int = 2,
+            seed: int = 0,
+        ) -> None:
+        self.pages = pages
+        self.blocks_per_page = blocks_per_page
+        self.paragraph_words = paragraph_words
+        self.link_density = link_density
+        self.image_density = image_density
+        self.emphasis_density = emphasis_density
+        self.list_ratio = list_ratio
+        self.code_ratio = code_ratio
+        self.nesting_depth = nesting_depth
+        self.seed = seed
+
+    def __repr__(self) -> str:
+        return f"CorpusOptions({vars(self)})"
+
+
+def generate_inline(rng: random.Random, words: int, options: CorpusOptions) -> str:
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < options.link_density:
+            parts.append(f"[{word}](/{rng.choice(WORDS)}/{rng.choice(WORDS)})")
+        elif roll < options.link_density + options.image_density:
+            parts.append(f"![{word}](/images/{rng.choice(WORDS)}.png)")
+        elif roll < options.link_density + options.image_density + options.emphasis_density:
+            parts.append(rng.choice((f"**{word}**", f"*{word}*", f"`{word}`")))
+        else:
+            parts.append(word)
+    return " ".join(parts)
+
+
+def generate_block(rng: random.Random, options: CorpusOptions) -> str:
+    roll = rng.random()
+    if roll < options.code_ratio:
+        return "```\n" + "\n".join(rng.choice(CODE_LINES) for _ in range(rng.randint(2, 8))) + "\n```"
+    if roll < options.code_ratio + options.list_ratio:
+        items = [generate_inline(rng, rng.randint(3, 12), options) for _ in range(rng.randint(2, 8))]
+        if rng.random() < 0.5:
+            return "\n".join(f"- {item}" for item in items)
+        return "\n".join(f"{i}. {item}" for i, item in enumerate(items, start=1))
+    if roll < options.code_ratio + options.list_ratio + 0.1:
+        return f"{'#' * rng.randint(2, 6)} {generate_inline(rng, rng.randint(2, 6), options)}"
+    if roll < options.code_ratio + options.list_ratio + 0.15:
+        return "\n".join(f"> {generate_inline(rng, rng.randint(5, 15), options)}" for _ in range(rng.randint(1, 3)))
+    return generate_inline(rng, max(1, int(rng.gauss(options.paragraph_words, options.paragraph_words / 4))), options)
+
+
+def generate_page_markdown(rng: random.Random, options: CorpusOptions) -> str:
+    title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).title()
+    blocks = [f"# {title}"]
+    blocks.extend(generate_block(rng, options) for _ in range(options.blocks_per_page))
+    return "\n\n".join(blocks) + "\n"
+
+
+def generate_corpus_pages(options: CorpusOptions) -> dict[str, str]:
+    rng = random.Random(options.seed)
+    pages = {}
+    for i in range(options.pages):
+        directories = [rng.choice(WORDS) for _ in range(rng.randint(0, options.nesting_depth))]
+        path = "/".join([*directories, f"page{i}", "index.md"])
+        pages[path] = generate_page_markdown(rng, options)
+    return pages
+
+
+def write_corpus(dest: pathlib.Path, options: CorpusOptions) -> list[pathlib.Path]:
+    paths = []
+    for rel, markdown in generate_corpus_pages(options).items():
+        path = pathlib.Path(dest) / rel
+        os.makedirs(path.parent, exist_ok=True)
+        path.write_text(markdown)
+        paths.append(path)
+    return paths
@@ -0,0 +1,148 @@
+import json
+import os
+import pathlib
+import posixpath
+import urllib.parse
+from typing import Optional
+
+from textnode import TextType
+
+
+GRAPH_VERSION = 2
+
+
+def page_url(output: str) -> str:
+    # "blog/post.html" is served as /blog/post and "blog/index.html" as /blog
+    if output == "index.html" or output.endswith("/index.html"):
+        output = output[:-len("index.html")]
+    elif output.endswith(".html"):
+        output = output[:-len(".html")]
+    return "/" + output.strip("/")
+
+
+def site_path(url: str, output: str) -> Optional[str]:
+    # Resolves a link or image URL found in the page rendered to output into a site path, external
+    # URLs, fragments and query-only links are not dependencies
+    parts = urllib.parse.urlsplit(url.strip())
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = parts.path
+    if not path.startswith("/"):
+        path = posixpath.join("/" + posixpath.dirname(output), path)
+    path = posixpath.normpath(path)
+    for suffix in ("/index.html", "/index.md", ".html", ".md"):
+        if path.endswith(suffix):
+            return path[:-len(suffix)] or "/"
+    return path
+
+
+def reference_dependencies(references: list[tuple[TextType, str, int]], output: str) -> tuple[list[str], list[str]]:
+    # The references are the link and image TextNodes the renderer produced, so the graph and the
+    # link check agree on what a page links to and code never counts as a link
+    links = {site_path(url, output) for text_type, url, _ in references if text_type == TextType.LINK}
+    images = {site_path(url, output) for text_type, url, _ in references if text_type == TextType.IMAGE}
+    links.discard(None)
+    images.discard(None)
+    return sorted(links), sorted(images)
+
+
+class DependencyGraph:
+    # For every page key, the template it was rendered with, the site paths it links to or embeds and
+    # the link and image references with their source lines, which the link check reads instead of
+    # parsing the page again. Reverse edges are derived on demand and dropped whenever a page is
+    # recorded or removed.
+    def __init__(self, path: pathlib.Path, pages: Optional[dict[str, dict]] = None, assets: Optional[list[str]] = None) -> None:
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.assets = assets if assets is not None else []
+        self._dependents: Optional[dict[str, set[str]]] = None
+
+    def __repr__(self) -> str:
+        return f"DependencyGraph({self.path=}, {len(self.pages)=}, {len(self.assets)=})"
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "DependencyGraph":
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(path)
+        if data.get("version") != GRAPH_VERSION:
+            return cls(path)
+        return cls(path, data.get("pages", {}), data.get("assets", []))
+
+    def save(self) -> None:
+        os.makedirs(self.path.parent, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        # json.dumps runs the C encoder, json.dump always encodes in Python, which shows once every
+        # page carries its references
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps({"version": GRAPH_VERSION, "pages": self.pages, "assets": self.assets}, sort_keys=True))
+        os.replace(tmp_path, self.path)
+
+    def record(
+            self,
+            key: str,
+            output: str,
+            template: str,
+            links: list[str],
+            images: list[str],
+            references: Optional[list[tuple[TextType, str, int]]] = None,
+        ) -> None:
+        self.pages[key] = {"output": output, "template": template, "links": links, "images": images}
+        if references is not None:
+            self.pages[key]["references"] = [[text_type.value, url, line] for text_type, url, line in references]
+        self._dependents = None
+
+    def references(self, key: str) -> Optional[list[tuple[TextType, str, int]]]:
+        entry = self.pages.get(key)
+        if entry is None or "references" not in entry:
+            return None
+        return [(TextType(text_type), url, line) for text_type, url, line in entry["references"]]
+
+    def set_template(self, key: str, template: str) -> None:
+        # For a page rebuilt only because of its template, the recorded links stay valid
+        self.pages[key]["template"] = template
+
+    def remove(self, key: str) -> Optional[dict]:
+        self._dependents = None
+        return self.pages.pop(key, None)
+
+    def dependents(self, target: str) -> set[str]:
+        if self._dependents is None:
+            self._dependents = {}
+            for key, entry in self.pages.items():
+                for path in entry["links"] + entry["images"]:
+                    self._dependents.setdefault(path, set()).add(key)
+        return self._dependents.get(target, set())
+
+    def template_dependents(self, template: str) -> set[str]:
+        return {key for key, entry in self.pages.items() if entry["template"] == template}
+
+    def find(self, page: str) -> Optional[str]:
+        # Accepts a content key, a path under content/, an output path or a site URL
+        page = page.strip()
+        if page in self.pages:
+            return page
+        for key, entry in self.pages.items():
+            if page.endswith("/" + key) or page in (entry["output"], page_url(entry["output"])):
+                return key
+        return None
+
+    def explain(self, key: str) -> str:
+        entry = self.pages[key]
+        urls = {page_url(other["output"]): other_key for other_key, other in self.pages.items()}
+        assets = set(self.assets)
+        lines = [f"{key} -> {entry['output']}", f"  template: {entry['template']}"]
+        for label, paths in (("links", entry["links"]), ("images", entry["images"])):
+            for path in paths:
+                if path in urls:
+                    target = f"page {urls[path]}"
+                elif path.lstrip("/") in assets:
+                    target = f"asset {path.lstrip('/')}"
+                else:
+                    target = "not found"
+                lines.append(f"  {label}: {path} ({target})")
+        for dependent in sorted(self.dependents(page_url(entry["output"]))):
+            lines.append(f"  linked from: {dependent}")
+        return "\n".join(lines)
@@ -0,0 +1,214 @@
+import datetime
+import email.utils
+import hashlib
+import json
+import os
+import pathlib
+import re
+from typing import Callable, Optional, TextIO
+
+from depgraph import page_url
+from htmlnode import escape_attribute, escape_text
+from metadata import SiteMetadata
+from template import Template
+
+
+FEEDS_VERSION = 1
+SITEMAP_FILE = "sitemap.xml"
+SITEMAP_URL_LIMIT = 50000
+RSS_FILE = "rss.xml"
+RSS_ITEMS = 20
+TAGS_DIR = "tags"
+SLUG_PATTERN = re.compile(r"[^\w]+")
+
+
+class HashWriter:
+    # Stands in for a file so an output can be rendered once to decide whether it changed without
+    # ever holding its text in memory
+    def __init__(self, salt: str = "") -> None:
+        self.digest = hashlib.sha256(salt.encode())
+
+    def __repr__(self) -> str:
+        return f"HashWriter({self.digest.hexdigest()=})"
+
+    def write(self, text: str) -> int:
+        self.digest.update(text.encode())
+        return len(text)
+
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+
+def tag_slug(tag: str) -> str:
+    return SLUG_PATTERN.sub("-", tag.lower()).strip("-") or "tag"
+
+
+def absolute_url(base_url: str, output: str) -> str:
+    return base_url.rstrip("/") + page_url(output)
+
+
+def rss_date(date: str) -> Optional[str]:
+    try:
+        value = datetime.datetime.fromisoformat(date)
+    except ValueError:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return email.utils.format_datetime(value)
+
+
+def write_sitemap(fp: TextIO, site: SiteMetadata, keys: list[str], base_url: str) -> None:
+    fp.write('<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+    for key in keys:
+        entry = site.pages[key]
+        fp.write(f"<url><loc>{escape_text(absolute_url(base_url, entry['output']))}</loc>")
+        if entry["date"]:
+            fp.write(f"<lastmod>{escape_text(entry['date'])}</lastmod>")
+        fp.write("</url>\n")
+    fp.write("</urlset>\n")
+
+
+def write_sitemap_index(fp: TextIO, names: list[str], base_url: str) -> None:
+    fp.write('<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+    for name in names:
+        fp.write(f"<sitemap><loc>{escape_text(base_url.rstrip('/') + '/' + name)}</loc></sitemap>\n")
+    fp.write("</sitemapindex>\n")
+
+
+def write_rss(fp: TextIO, site: SiteMetadata, keys: list[str], base_url: str) -> None:
+    home = site.pages.get("index.md")
+    title = home["title"] if home else base_url
+    description = str(home["fields"].get("description", title)) if home else title
+    fp.write('<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>\n')
+    fp.write(f"<title>{escape_text(title)}</title><link>{escape_text(absolute_url(base_url, 'index.html'))}</link>")
+    fp.write(f"<description>{escape_text(description)}</description>\n")
+    for key in keys:
+        entry = site.pages[key]
+        url = escape_text(absolute_url(base_url, entry["output"]))
+        fp.write(f"<item><title>{escape_text(entry['title'])}</title><link>{url}</link><guid>{url}</guid>")
+        published = rss_date(entry["date"])
+        if published is not None:
+            fp.write(f"<pubDate>{published}</pubDate>")
+        if entry["fields"].get("description"):
+            fp.write(f"<description>{escape_text(str(entry['fields']['description']))}</description>")
+        for tag in entry["tags"]:
+            fp.write(f"<category>{escape_text(tag)}</category>")
+        fp.write("</item>\n")
+    fp.write("</channel></rss>\n")
+
+
+def write_page_list(fp: TextIO, site: SiteMetadata, keys: list[str]) -> None:
+    fp.write("<ul>")
+    for key in keys:
+        entry = site.pages[key]
+        fp.write(f'<li><a href="{escape_attribute(page_url(entry["output"]))}">{escape_text(entry["title"])}</a>')
+        if entry["date"]:
+            fp.write(f" <time>{escape_text(entry['date'])}</time>")
+        fp.write("</li>")
+    fp.write("</ul>")
+
+
+def write_tag_index(fp: TextIO, tags: dict[str, tuple[str, list[str]]]) -> None:
+    fp.write("<ul>")
+    for slug, (tag, keys) in sorted(tags.items()):
+        fp.write(f'<li><a href="/{TAGS_DIR}/{slug}">{escape_text(tag)}</a> ({len(keys)})</li>')
+    fp.write("</ul>")
+
+
+class Feeds:
+    # Digests of the aggregate outputs from the last build. Every output is first rendered into a
+    # HashWriter and only written when its digest changed or the file is missing, so editing one
+    # page rewrites the sitemap chunk, feed and tag pages it appears in and nothing else.
+    def __init__(self, path: pathlib.Path, outputs: Optional[dict[str, str]] = None) -> None:
+        self.path = path
+        self.outputs = outputs if outputs is not None else {}
+
+    def __repr__(self) -> str:
+        return f"Feeds({self.path=}, {len(self.outputs)=})"
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "Feeds":
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(path)
+        if data.get("version") != FEEDS_VERSION:
+            return cls(path)
+        return cls(path, data.get("outputs", {}))
+
+    def save(self) -> None:
+        os.makedirs(self.path.parent, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": FEEDS_VERSION, "outputs": self.outputs}, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def update(
+            self,
+            site: SiteMetadata,
+            template: Template,
+            dir_path_public: pathlib.Path,
+            base_url: str,
+            salt: str = "",
+        ) -> tuple[list[str], list[str]]:
+        # salt is folded into the digest of every page rendered through the template, so a template
+        # or post-processing change reaches the tag pages too. Returns the written and removed outputs.
+        outputs = {}
+        keys = sorted(site.pages, key=lambda key: site.pages[key]["output"])
+        if len(keys) <= SITEMAP_URL_LIMIT:
+            outputs[SITEMAP_FILE] = lambda fp: write_sitemap(fp, site, keys, base_url)
+        else:
+            names = []
+            for index, start in enumerate(range(0, len(keys), SITEMAP_URL_LIMIT), 1):
+                chunk = keys[start:start + SITEMAP_URL_LIMIT]
+                names.append(f"sitemap-{index}.xml")
+                outputs[names[-1]] = lambda fp, chunk=chunk: write_sitemap(fp, site, chunk, base_url)
+            outputs[SITEMAP_FILE] = lambda fp: write_sitemap_index(fp, names, base_url)
+        by_date = site.by_date()
+        dated = [key for key in by_date if site.pages[key]["date"]][:RSS_ITEMS]
+        outputs[RSS_FILE] = lambda fp: write_rss(fp, site, dated, base_url)
+
+        # Tags differing only in case or punctuation share a slug and so a page
+        order = {key: index for index, key in enumerate(by_date)}
+        tags = {}
+        for tag, tagged in site.by_tag().items():
+            first, previous = tags.get(tag_slug(tag), (tag, []))
+            tags[tag_slug(tag)] = (first, sorted(set(previous) | set(tagged), key=order.__getitem__))
+        templated = {f"{TAGS_DIR}/index.html": ("Tags", lambda fp: write_tag_index(fp, tags))}
+        for slug, (tag, tagged) in tags.items():
+            templated[f"{TAGS_DIR}/{slug}.html"] = (f"Tagged {tag}", lambda fp, tagged=tagged: write_page_list(fp, site, tagged))
+        for output, (title, content) in templated.items():
+            outputs[output] = lambda fp, title=title, content=content: template.write(fp, {"Title": title, "Content": content})
+
+        written = []
+        digests = {}
+        for output, write in outputs.items():
+            hasher = HashWriter(salt if output.endswith(".html") else "")
+            write(hasher)
+            digests[output] = hasher.hexdigest()
+            path = dir_path_public / output
+            if self.outputs.get(output) == digests[output] and path.exists():
+                continue
+            write_atomic(path, write)
+            written.append(output)
+        removed = []
+        for output in self.outputs.keys() - digests.keys():
+            path = dir_path_public / output
+            if path.exists():
+                path.unlink()
+            removed.append(output)
+        self.outputs = digests
+        return written, sorted(removed)
+
+
+def write_atomic(path: pathlib.Path, write: Callable[[TextIO], None]) -> None:
+    os.makedirs(path.parent, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
@@ -0,0 +1,101 @@
+import datetime
+import itertools
+from typing import Iterable, Iterator
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+
+FRONT_MATTER_FORMATS = {"---": "yaml", "+++": "toml"}
+
+
+def split_front_matter(lines: Iterable[str]) -> tuple[dict[str, object], Iterator[str]]:
+    # Consumes only the front matter, the returned iterator continues with the body so a file can
+    # still be streamed block by block. Without a closing delimiter the whole input is body.
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    delimiter = first.strip()
+    if delimiter not in FRONT_MATTER_FORMATS:
+        return {}, itertools.chain([first], lines)
+    head = []
+    for line in lines:
+        if line.strip() == delimiter:
+            return parse_front_matter(head, FRONT_MATTER_FORMATS[delimiter]), lines
+        head.append(line)
+    return {}, itertools.chain([first], head, lines)
+
+
+def strip_front_matter(markdown: str) -> tuple[dict[str, object], str]:
+    if not markdown.startswith(tuple(FRONT_MATTER_FORMATS)):
+        return {}, markdown
+    metadata, lines = split_front_matter(markdown.splitlines(keepends=True))
+    return metadata, "".join(lines)
+
+
+def parse_front_matter(lines: list[str], front_matter_format: str) -> dict[str, object]:
+    if front_matter_format == "toml":
+        if tomllib is None:
+            raise ValueError("TOML front matter needs Python 3.11 or newer")
+        try:
+            data = tomllib.loads("".join(lines))
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(f"Invalid TOML front matter: {e}")
+    else:
+        data = parse_yaml_subset(lines)
+    return {key: _normalize(value) for key, value in data.items()}
+
+
+def parse_yaml_subset(lines: list[str]) -> dict[str, object]:
+    # Flat mappings only: "key: value", inline lists "[a, b]" and block lists of "- item" lines
+    data = {}
+    key = None
+    for number, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and isinstance(data.get(key), list):
+            data[key].append(_yaml_scalar(stripped[2:]))
+            continue
+        name, colon, value = stripped.partition(":")
+        if not colon or not name or line[0].isspace():
+            raise ValueError(f"Invalid front matter line {number}: {stripped}")
+        key = name.strip()
+        value = value.strip()
+        if not value:
+            data[key] = []
+        elif value.startswith("[") and value.endswith("]"):
+            data[key] = [_yaml_scalar(item) for item in value[1:-1].split(",") if item.strip()]
+        else:
+            data[key] = _yaml_scalar(value)
+    return data
+
+
+def _yaml_scalar(value: str) -> object:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value in ("true", "false"):
+        return value == "true"
+    if value.lstrip("-").isdigit():
+        return int(value)
+    return value
+
+
+def _normalize(value: object) -> object:
+    # Keeps metadata JSON-serializable: TOML dates become ISO strings
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    return value
+
+
+def template_context(metadata: dict[str, object]) -> dict[str, object]:
+    # Front matter fields become template variables, lists are joined for display
+    return {key: ", ".join(str(item) for item in value) if isinstance(value, list) else value for key, value in metadata.items()}
@@ -0,0 +1,179 @@
+import collections
+import hashlib
+import re
+from typing import Optional
+
+from htmlnode import HTMLNode, close_tag, escape_text
+from leafnode import LeafNode
+
+
+def _keywords(words: str) -> str:
+    return r"\b(?:" + "|".join(words.split()) + r")\b"
+
+
+NUMBER = r"\b(?:0[xX][\da-fA-F_]+|0[oObB][\d_]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)\b"
+DOUBLE_QUOTED = r'"(?:\\.|[^"\\\n])*"'
+SINGLE_QUOTED = r"'(?:\\.|[^'\\\n])*'"
+
+# Token rules per language, tried left to right at each position; anything unmatched is plain text
+LANGUAGE_RULES = {
+    "python": [
+        ("comment", r"#[^\n]*"),
+        ("string", r"(?:\b[rRbBuUfF]{1,2})?(?:\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''|" + DOUBLE_QUOTED + "|" + SINGLE_QUOTED + ")"),
+        ("keyword", _keywords(
+            "False None True and as assert async await break class continue def del elif else except finally for "
+            "from global if import in is lambda nonlocal not or pass raise return try while with yield"
+        )),
+        ("number", NUMBER),
+    ],
+    "javascript": [
+        ("comment", r"//[^\n]*|/\*[\s\S]*?\*/"),
+        ("string", DOUBLE_QUOTED + "|" + SINGLE_QUOTED + r"|`(?:\\.|[^`\\])*`"),
+        ("keyword", _keywords(
+            "async await break case catch class const continue debugger default delete do else export extends false "
+            "finally for function if import in instanceof let new null of return static super switch this throw true "
+            "try typeof undefined var void while with yield"
+        )),
+        ("number", NUMBER),
+    ],
+    "bash": [
+        ("comment", r"(?<![^\s;])#[^\n]*"),
+        ("string", r'"(?:\\.|[^"\\])*"' + "|'[^']*'"),
+        ("variable", r"\$(?:\{[^}\n]*\}|\w+|[@#?$!*-])"),
+        ("keyword", _keywords("case do done elif else esac export fi for function if in local return select then until while")),
+    ],
+    "json": [
+        ("key", DOUBLE_QUOTED + r"(?=\s*:)"),
+        ("string", DOUBLE_QUOTED),
+        ("keyword", _keywords("true false null")),
+        ("number", r"-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b"),
+    ],
+    "css": [
+        ("comment", r"/\*[\s\S]*?\*/"),
+        ("string", DOUBLE_QUOTED + "|" + SINGLE_QUOTED),
+        ("keyword", r"@[\w-]+|!important"),
+        ("number", r"#[\da-fA-F]{3,8}\b|-?\b\d+(?:\.\d+)?(?:%|[a-zA-Z]+)?"),
+    ],
+}
+LANGUAGE_ALIASES = {"py": "python", "js": "javascript", "sh": "bash", "shell": "bash", "console": "bash"}
+LANGUAGE_PATTERNS = {
+    language: re.compile("|".join(f"(?P<{kind}>{pattern})" for kind, pattern in rules))
+    for language, rules in LANGUAGE_RULES.items()
+}
+
+
+def find_language(info: str) -> Optional[str]:
+    # The info string of a fence is the language name, optionally followed by other words
+    words = info.split()
+    if not words:
+        return None
+    language = words[0].lower()
+    return LANGUAGE_ALIASES.get(language, language)
+
+
+def highlight_code(code: str, language: str) -> str:
+    pattern = LANGUAGE_PATTERNS.get(language)
+    if pattern is None:
+        return escape_text(code)
+    parts = []
+    cursor = 0
+    for match in pattern.finditer(code):
+        if cursor < match.start():
+            parts.append(escape_text(code[cursor:match.start()]))
+        parts.append(f'<span class="hl-{match.lastgroup}">{escape_text(match.group())}</span>')
+        cursor = match.end()
+    parts.append(escape_text(code[cursor:]))
+    return "".join(parts)
+
+
+class HighlightedCode(HTMLNode):
+    # A <code> element whose value is markup produced by highlight_code, written without escaping
+    __slots__ = ()
+
+    def __init__(self, html: str, language: str) -> None:
+        super().__init__("code", html, None, {"class": f"language-{language}"})
+
+    def __repr__(self) -> str:
+        return f"HighlightedCode({self.value=}, {self.props=})"
+
+    def to_html(self) -> str:
+        return self.open_tag_html() + self.value + close_tag(self.tag)
+
+
+class HighlightCache:
+    # Highlighted markup keyed by a digest of (language, code), so repeated snippets are tokenized
+    # once per process and the key stays small however long the snippet is
+    __slots__ = ("maxsize", "entries", "hits", "misses")
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize < 1:
+            raise ValueError("Highlight cache size must be positive")
+        self.maxsize = maxsize
+        self.entries: collections.OrderedDict[bytes, str] = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f"HighlightCache({self.maxsize=}, {len(self.entries)=}, {self.hits=}, {self.misses=})"
+
+    def highlight(self, code: str, language: str) -> str:
+        key = hashlib.sha256(f"{language}\0{code}".encode()).digest()
+        html = self.entries.get(key)
+        if html is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return html
+        self.misses += 1
+        html = self.entries[key] = highlight_code(code, language)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return html
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "maxsize": self.maxsize}
+
+    def merge(self, hits: int, misses: int) -> None:
+        self.hits += hits
+        self.misses += misses
+
+
+HIGHLIGHTER: Optional[HighlightCache] = None
+
+
+def enable_highlighting(maxsize: int = 1024) -> HighlightCache:
+    global HIGHLIGHTER
+    HIGHLIGHTER = HighlightCache(maxsize)
+    return HIGHLIGHTER
+
+
+def disable_highlighting() -> None:
+    global HIGHLIGHTER
+    HIGHLIGHTER = None
+
+
+def current_highlighter() -> Optional[HighlightCache]:
+    return HIGHLIGHTER
+
+
+def highlight_stats() -> Optional[dict[str, int]]:
+    return HIGHLIGHTER.stats() if HIGHLIGHTER is not None else None
+
+
+def format_highlight_stats(stats: dict[str, int]) -> str:
+    lookups = stats["hits"] + stats["misses"]
+    rate = stats["hits"] / lookups * 100 if lookups else 0.0
+    return f"Highlight cache: {stats['hits']} hits, {stats['misses']} misses ({rate:.1f}% hit rate), capacity {stats['maxsize']}"
+
+
+def code_block_node(code: str) -> HTMLNode:
+    # code is the fence content without the backticks. It is kept verbatim, info string included,
+    # unless highlighting is on and the info string names a language, which is then dropped.
+    highlighter = HIGHLIGHTER
+    if highlighter is None:
+        return LeafNode("code", code)
+    info, newline, body = code.partition("\n")
+    language = find_language(info) if newline else None
+    if language is None:
+        return LeafNode("code", code)
+    return HighlightedCode(highlighter.highlight(body, language), language)
+
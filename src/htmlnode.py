@@ -1,7 +1,42 @@
-from typing import Optional
+from typing import Iterator, Optional, TextIO
+
+
+TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+ATTRIBUTE_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+OPEN_TAGS: dict[str, str] = {}
+CLOSE_TAGS: dict[str, str] = {}
+
+
+def escape_text(value: str) -> str:
+    # Most text has nothing to escape, the containment checks are much cheaper than translate
+    if "&" in value or "<" in value or ">" in value:
+        return value.translate(TEXT_ESCAPES)
+    return value
+
+
+def escape_attribute(value: str) -> str:
+    if "&" in value or "<" in value or ">" in value or '"' in value:
+        return value.translate(ATTRIBUTE_ESCAPES)
+    return value
+
+
+def open_tag(tag: str) -> str:
+    fragment = OPEN_TAGS.get(tag)
+    if fragment is None:
+        fragment = OPEN_TAGS[tag] = f"<{tag}>"
+    return fragment
+
+
+def close_tag(tag: str) -> str:
+    fragment = CLOSE_TAGS.get(tag)
+    if fragment is None:
+        fragment = CLOSE_TAGS[tag] = f"</{tag}>"
+    return fragment
 
 
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(
             self,
             tag: Optional[str] = None, 
@@ -20,10 +55,18 @@ class HTMLNode:
     def to_html(self) -> str:
         raise NotImplementedError()
 
+    def iter_html(self) -> Iterator[str]:
+        yield self.to_html()
+
+    def write_html(self, fp: TextIO) -> None:
+        fp.writelines(self.iter_html())
+
     def props_to_html(self) -> str:
-        if self.props is None:
+        if not self.props:
             return ""
-        props_string = " ".join(f'{key}="{value}"' for key, value in self.props.items())
-        if props_string:
-            props_string = f" {props_string}"
-        return props_string
+        return "".join([f' {key}="{escape_attribute(value)}"' for key, value in self.props.items()])
+
+    def open_tag_html(self) -> str:
+        if not self.props:
+            return open_tag(self.tag)
+        return f"<{self.tag}{self.props_to_html()}>"
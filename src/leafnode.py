@@ -1,8 +1,10 @@
 from typing import Optional
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, close_tag, escape_text
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: Optional[str], value: Optional[str], props: Optional[dict[str, str]] = None) -> None:
         super().__init__(tag, value, None, props)
 
@@ -13,5 +15,5 @@ class LeafNode(HTMLNode):
         if self.value is None:
             raise ValueError("LeafNode must have a value")
         if not self.tag:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value or ''}</{self.tag}>"
+            return escape_text(self.value)
+        return self.open_tag_html() + escape_text(self.value) + close_tag(self.tag)
@@ -0,0 +1,129 @@
+import bisect
+import os
+import pathlib
+from typing import Callable, Iterable, Iterator, Optional
+
+from depgraph import page_url, site_path
+from frontmatter import strip_front_matter
+from textnode import BlockType, TextNode, TextType, block_to_parent_node, scan_blocks, text_to_textnodes
+
+
+class ReferenceCollector:
+    # Collects the link and image TextNodes the renderer produces, with their source lines, so a page
+    # is never parsed again for the link check or the dependency graph. source wraps the lines before
+    # the front matter is split and body the lines after it, blocks wraps the block stream and inline
+    # is passed to block_to_parent_node, wrapping parse when another callback such as TermCounter.inline
+    # also needs the nodes.
+    def __init__(self) -> None:
+        self.parse: Callable[[str], list[TextNode]] = text_to_textnodes
+        self.references: list[tuple[TextType, str, int]] = []
+        self.read = 0
+        self.content_line: Optional[int] = None
+        self.block = ""
+        self.block_line = 0
+        self.cursor = 0
+
+    def __repr__(self) -> str:
+        return f"ReferenceCollector({self.read=}, {len(self.references)=})"
+
+    def source(self, lines: Iterable[str]) -> Iterator[str]:
+        for line in lines:
+            self.read += 1
+            yield line
+
+    def body(self, lines: Iterable[str]) -> Iterator[str]:
+        # A line pulled from the source has its source line number, the lines split_front_matter read
+        # ahead and handed back come first and are numbered from the top of the file
+        read = self.read
+        for count, line in enumerate(lines, 1):
+            number = self.read if self.read != read else count
+            read = self.read
+            if self.content_line is None and line.strip():
+                self.content_line = number
+            yield line
+
+    def blocks(self, blocks: Iterable[tuple[BlockType, str]]) -> Iterator[tuple[BlockType, str]]:
+        # iter_blocks yields a block before reading any line of the next one, so the first line with
+        # content seen since the previous block is where this one starts
+        for block_type, block in blocks:
+            self.block, self.block_line, self.cursor = block, self.content_line, 0
+            self.content_line = None
+            yield block_type, block
+
+    def inline(self, text: str) -> list[TextNode]:
+        nodes = self.parse(text)
+        if "](" not in text:
+            return nodes
+        for node in nodes:
+            if node.text_type != TextType.LINK and node.text_type != TextType.IMAGE:
+                continue
+            found = self.block.find(f"]({node.url})", self.cursor)
+            if found == -1:
+                found = self.cursor
+            else:
+                self.cursor = found + 1
+            self.references.append((node.text_type, node.url, self.block_line + self.block.count("\n", 0, found)))
+        return nodes
+
+
+def collect_references(markdown: str) -> list[tuple[TextType, str, int]]:
+    # Uses the same TextNodes the renderer turns into <a> and <img>, so text inside code spans is
+    # not mistaken for a link, and finds each target in its block to report the source line. Front
+    # matter is blanked out rather than removed so the line numbers still match the file.
+    _, body = strip_front_matter(markdown)
+    markdown = "\n" * markdown[:len(markdown) - len(body)].count("\n") + body
+    line_starts = [0]
+    position = markdown.find("\n")
+    while position != -1:
+        line_starts.append(position + 1)
+        position = markdown.find("\n", position + 1)
+    references = []
+    for block_type, start, end in scan_blocks(markdown):
+        nodes = []
+
+        def collect(text: str) -> list[TextNode]:
+            block_nodes = text_to_textnodes(text)
+            nodes.extend(block_nodes)
+            return block_nodes
+
+        block_to_parent_node(markdown[start:end], block_type, collect)
+        cursor = start
+        for node in nodes:
+            if node.text_type != TextType.LINK and node.text_type != TextType.IMAGE:
+                continue
+            found = markdown.find(f"]({node.url})", cursor, end)
+            if found == -1:
+                found = cursor
+            else:
+                cursor = found + 1
+            references.append((node.text_type, node.url, bisect.bisect_right(line_starts, found)))
+    return references
+
+
+def site_targets(outputs: list[str], dir_path_static: pathlib.Path) -> set[str]:
+    targets = {page_url(output) for output in outputs}
+    for dirpath, _, filenames in os.walk(dir_path_static):
+        for filename in filenames:
+            rel = (pathlib.Path(dirpath) / filename).relative_to(dir_path_static).as_posix()
+            targets.add(site_path("/" + rel, "index.html"))
+    return targets
+
+
+def check_references(
+        pages: list[tuple[str, str, list[tuple[TextType, str, int]]]],
+        targets: set[str],
+    ) -> list[tuple[str, int, str, str]]:
+    # pages holds (source name, output path, references); external URLs and fragments are skipped
+    dead = []
+    for source, output, references in pages:
+        for text_type, url, line in references:
+            path = site_path(url, output)
+            if path is not None and path not in targets:
+                dead.append((source, line, text_type.value, url))
+    return dead
+
+
+def format_dead_links(dead: list[tuple[str, int, str, str]]) -> str:
+    lines = [f"{source}:{line}: broken {kind} {url}" for source, line, kind, url in dead]
+    lines.append(f"{len(dead)} broken link(s)" if dead else "No broken links")
+    return "\n".join(lines)
@@ -1,17 +1,272 @@
-from textnode import TextNode, TextType, split_nodes_delimiter
-from markdown import markdown_to_html_node, extract_title
+from textnode import TextNode, TextType, current_inline_memo, enable_inline_memo, format_memo_stats, inline_memo_stats, split_nodes_delimiter
+from markdown import page_title, write_blocks_html
+from highlight import current_highlighter, enable_highlighting, format_highlight_stats, highlight_stats
+from frontmatter import split_front_matter, template_context
+from cache import RenderCache, copy_entry_body, read_entry_title
+from manifest import BuildManifest, generator_version, hash_file
+from depgraph import DependencyGraph, page_url, reference_dependencies
+from postprocess import post_write, prune_fingerprints, update_fingerprints
+from profiler import BuildProfiler, profile_page
+from scheduler import MemoryScheduler
+from search import SearchIndex, TermCounter
+from metadata import SiteMetadata
+from feeds import Feeds
+from linkcheck import ReferenceCollector, check_references, collect_references, format_dead_links, site_targets
+from template import load_template
 
+from shard import find_shard_count, merge_shards, parse_shard, partition_pages, shard_dir, verify_shards, write_shard_manifest
+from sync import prune_file, sync_tree
+from watch import Watcher
+from pipeline import build_pages, counts_delta, split_page
+
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
+import http.server
+import itertools
+import json
 import pathlib
 import os
 import shutil
+import threading
+import time
+from typing import Iterable, Iterator, Optional, TextIO
 
 
 ROOT_DIR = (pathlib.Path(__file__) / pathlib.Path("../..")).resolve()
+MANIFEST_PATH = pathlib.Path(".build/manifest.json")
+CONTENT_DIR = pathlib.Path("content")
+STATIC_DIR = pathlib.Path("static")
+TEMPLATE_PATH = pathlib.Path("template.html")
+PUBLIC_DIR = pathlib.Path("public")
+SHARD_DIR = pathlib.Path(".build/shards")
+SEARCH_INDEX_PATH = pathlib.Path(".build/search.json")
+SEARCH_DIR = pathlib.Path("search")
+METADATA_PATH = pathlib.Path(".build/metadata.json")
+FEEDS_PATH = pathlib.Path(".build/feeds.json")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate the static site from content/ into public/")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["build", "serve", "merge"],
+        default="build",
+        help="build the site once, build it and serve public/ while rebuilding changed files, or merge shard outputs into public/",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only regenerate pages whose source, template or generator changed since the last build",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="number of worker processes used to generate pages (0 uses every CPU core)",
+    )
+    parser.add_argument(
+        "--asset-compare",
+        choices=["mtime", "hash"],
+        default="mtime",
+        help="how incremental builds decide that a static asset changed: size and mtime, or content hash",
+    )
+    parser.add_argument(
+        "--hardlink",
+        action="store_true",
+        help="hardlink static assets into public/ instead of copying them when the filesystem allows it",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time every stage of every page and print a summary with the slowest pages and peak memory",
+    )
+    parser.add_argument(
+        "--profile-json",
+        type=pathlib.Path,
+        metavar="PATH",
+        help="also write the profile summary as JSON to PATH (implies --profile)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=pathlib.Path,
+        metavar="PATH",
+        help="cache rendered page bodies in PATH so unchanged pages only go through the template fill",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=parse_size,
+        default="1G",
+        metavar="SIZE",
+        help="maximum size of the render cache, least recently used entries are evicted (default 1G)",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=parse_size,
+        metavar="SIZE",
+        help="keep the estimated memory of pages rendered at once under SIZE, largest pages first (with --jobs)",
+    )
+    parser.add_argument(
+        "--inline-memo",
+        type=int,
+        default=0,
+        metavar="N",
+        help="memoize the inline parse of up to N repeated fragments per process and print the hit rate",
+    )
+    parser.add_argument(
+        "--highlight",
+        action="store_true",
+        help="highlight fenced code tagged with a known language, caching the markup of repeated snippets",
+    )
+    parser.add_argument(
+        "--async",
+        dest="async_io",
+        action="store_true",
+        help="read and write pages concurrently from an asyncio pipeline while they are rendered (--jobs sets the render processes)",
+    )
+    parser.add_argument(
+        "--explain",
+        metavar="PAGE",
+        help="show the template, links and images recorded for PAGE by the last incremental build and the pages linking to it",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="copy static assets to content-hashed names and point the rendered pages at them",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="write .gz siblings (and .br when brotli is installed) for changed text files in public/",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="write a sharded search index to public/search/ for static/search.js, re-tokenizing only changed pages",
+    )
+    parser.add_argument(
+        "--feeds",
+        action="store_true",
+        help="write sitemap.xml, rss.xml and tag listing pages under tags/ from the front matter of every page (needs --base-url)",
+    )
+    parser.add_argument(
+        "--base-url",
+        default="",
+        metavar="URL",
+        help="absolute URL the site is served from, used by the sitemap and the RSS feed",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="after building, report links and images that point at no page or static asset and exit with status 1",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="i/N",
+        help="render only the i-th of N deterministic slices of the pages into the shard directory",
+    )
+    parser.add_argument(
+        "--shard-dir",
+        type=pathlib.Path,
+        default=SHARD_DIR,
+        metavar="PATH",
+        help=f"where shard builds write their output and merge reads it from (default {SHARD_DIR})",
+    )
+    parser.add_argument("--port", type=int, default=8888, help="port used by the serve command")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.2,
+        metavar="SECONDS",
+        help="how often the serve command polls for changes",
+    )
+    args = parser.parse_args(argv)
+    if args.async_io and (args.profile or args.profile_json or args.cache_dir or args.command == "serve"):
+        parser.error("--async cannot be combined with serve, --profile or --cache-dir")
+    if args.async_io and args.max_memory:
+        parser.error("--max-memory does not apply to --async, whose queues already bound the pages in memory")
+    if args.shard and (args.incremental or args.command != "build"):
+        parser.error("--shard only applies to full builds")
+    if args.feeds and not args.base_url:
+        parser.error("--feeds needs --base-url for the absolute URLs of the sitemap and the RSS feed")
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    profiler = BuildProfiler() if args.profile or args.profile_json else None
+    cache = RenderCache(ROOT_DIR / args.cache_dir, args.cache_size) if args.cache_dir else None
+    if args.inline_memo > 0:
+        enable_inline_memo(args.inline_memo)
+    if args.highlight:
+        enable_highlighting()
+    # Search terms are counted while pages render, the index only re-reads pages it was not given
+    terms = {} if args.search else None
+    # Likewise the link references of a full build, an incremental build records them in the graph
+    references = {} if args.check_links and not args.incremental else None
+
+    if args.explain:
+        explain(args.explain, MANIFEST_PATH)
+    elif args.command == "serve":
+        serve(args.port, args.interval, jobs, args.asset_compare, args.hardlink)
+    elif args.command == "merge":
+        merge_site(CONTENT_DIR, STATIC_DIR, PUBLIC_DIR, args.shard_dir)
+    elif args.shard:
+        build_shard(*args.shard, CONTENT_DIR, TEMPLATE_PATH, args.shard_dir, jobs, profiler, cache, args.async_io, args.max_memory)
+    elif args.incremental:
+        sync_assets(STATIC_DIR, PUBLIC_DIR, MANIFEST_PATH, args.asset_compare, args.hardlink)
+        fingerprints, invalidated = sync_fingerprints(STATIC_DIR, PUBLIC_DIR, MANIFEST_PATH, args.fingerprint)
+        generated = generate_pages_incremental(
+            CONTENT_DIR, TEMPLATE_PATH, PUBLIC_DIR, MANIFEST_PATH, jobs, profiler, cache, args.async_io, invalidated, args.max_memory, terms
+        )
+        if args.search:
+            build_search_index(CONTENT_DIR, PUBLIC_DIR, SEARCH_INDEX_PATH, terms)
+        if args.feeds:
+            generated += build_feeds(CONTENT_DIR, TEMPLATE_PATH, PUBLIC_DIR, METADATA_PATH, FEEDS_PATH, args.base_url, fingerprints)
+        if args.fingerprint or args.compress:
+            post_write(ROOT_DIR / PUBLIC_DIR, generated, fingerprints, args.compress, jobs)
+        commit_fingerprints(PUBLIC_DIR, MANIFEST_PATH, fingerprints)
+    else:
+        copy_src_to_dest(STATIC_DIR, PUBLIC_DIR)
+        if (
+            jobs > 1 or profiler is not None or cache is not None or args.inline_memo > 0 or args.highlight
+            or args.async_io or args.max_memory or args.search or args.check_links
+        ):
+            generate_pages(
+                find_pages(CONTENT_DIR, PUBLIC_DIR), TEMPLATE_PATH, jobs, profiler, cache, args.async_io, args.max_memory, terms, references
+            )
+        else:
+            generate_pages_recursive(CONTENT_DIR, TEMPLATE_PATH, PUBLIC_DIR)
+        if args.search:
+            build_search_index(CONTENT_DIR, PUBLIC_DIR, SEARCH_INDEX_PATH, terms)
+        fingerprints = update_fingerprints(ROOT_DIR / STATIC_DIR, ROOT_DIR / PUBLIC_DIR, {})[0] if args.fingerprint else None
+        generated = [to_path for _, to_path in find_pages(CONTENT_DIR, PUBLIC_DIR)]
+        if args.feeds:
+            generated += build_feeds(CONTENT_DIR, TEMPLATE_PATH, PUBLIC_DIR, METADATA_PATH, FEEDS_PATH, args.base_url, fingerprints)
+        if args.fingerprint or args.compress:
+            post_write(ROOT_DIR / PUBLIC_DIR, generated, fingerprints, args.compress, jobs)
+
+    if cache is not None:
+        cache.prune()
+
+    feed_outputs = list(Feeds.load(ROOT_DIR / FEEDS_PATH).outputs) if args.feeds else []
+    dead_links = check_links(CONTENT_DIR, STATIC_DIR, PUBLIC_DIR, feed_outputs, MANIFEST_PATH, references) if args.check_links and args.command == "build" else 0
 
+    memo_stats = inline_memo_stats()
+    if memo_stats is not None:
+        print(format_memo_stats(memo_stats))
+    highlighter_stats = highlight_stats()
+    if highlighter_stats is not None:
+        print(format_highlight_stats(highlighter_stats))
 
-def main() -> None:
-    copy_src_to_dest("static", "public")
-    generate_pages_recursive("content", "template.html", "public")
+    if profiler is not None:
+        print(profiler.format_summary())
+        if args.profile_json:
+            profiler.write_json(args.profile_json)
+
+    if dead_links:
+        raise SystemExit(1)
 
 
 def copy_src_to_dest(src: pathlib.Path, dest: pathlib.Path) -> None:
@@ -22,20 +277,206 @@ def copy_src_to_dest(src: pathlib.Path, dest: pathlib.Path) -> None:
     shutil.copytree(src, dest)
 
 
-def generate_page(from_path: pathlib.Path, template_path: pathlib.Path, to_path: pathlib.Path) -> None:
+def parse_size(value: str) -> int:
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    value = value.strip().upper().removesuffix("B")
+    try:
+        if value and value[-1] in units:
+            return int(float(value[:-1]) * units[value[-1]])
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size {value!r}, expected a number with an optional K, M, G or T suffix")
+
+
+def sync_assets(
+        src: pathlib.Path,
+        dest: pathlib.Path,
+        manifest_path: pathlib.Path,
+        compare: str = "mtime",
+        hardlink: bool = False,
+    ) -> None:
+    manifest = BuildManifest.load(ROOT_DIR / manifest_path)
+    manifest.assets, copied, removed = sync_tree(ROOT_DIR / src, ROOT_DIR / dest, manifest.assets, compare, hardlink)
+    manifest.save()
+    print(f"Synced assets: {len(copied)} copied, {len(removed)} removed")
+
+
+def check_links(
+        dir_path_content: pathlib.Path,
+        dir_path_static: pathlib.Path,
+        dir_path_public: pathlib.Path,
+        extra_outputs: Iterable[str] = (),
+        manifest_path: Optional[pathlib.Path] = None,
+        rendered: Optional[dict[pathlib.Path, list[tuple[TextType, str, int]]]] = None,
+    ) -> int:
+    # rendered holds the references collected while this build rendered a page. Otherwise those
+    # recorded in the dependency graph when the page was last rebuilt are reused while the manifest
+    # shows the source unchanged since, and only the remaining pages are parsed again.
+    rendered = rendered if rendered is not None else {}
+    dir_path_content = ROOT_DIR / dir_path_content
+    dir_path_public = ROOT_DIR / dir_path_public
+    recorded = {}
+    if manifest_path is not None:
+        manifest = BuildManifest.load(ROOT_DIR / manifest_path)
+        graph = DependencyGraph.load(graph_path_for(manifest_path))
+        for key, entry in manifest.pages.items():
+            references = graph.references(key)
+            if references is not None:
+                recorded[key] = (entry.get("size"), entry.get("mtime"), references)
+    pages = []
+    for from_path, to_path in find_pages(dir_path_content, dir_path_public):
+        if from_path in rendered:
+            references = rendered[from_path]
+        else:
+            stat = from_path.stat()
+            size, mtime, references = recorded.get(from_path.relative_to(dir_path_content).as_posix(), (None, None, None))
+            if references is None or size != stat.st_size or mtime != stat.st_mtime_ns:
+                with open(from_path, "r") as f:
+                    references = collect_references(f.read())
+        pages.append((display_path(from_path), to_path.relative_to(dir_path_public).as_posix(), references))
+    dead = check_references(pages, site_targets([output for _, output, _ in pages] + list(extra_outputs), ROOT_DIR / dir_path_static))
+    print(format_dead_links(dead))
+    return len(dead)
+
+
+def build_search_index(
+        dir_path_content: pathlib.Path,
+        dir_path_public: pathlib.Path,
+        index_path: pathlib.Path,
+        rendered: Optional[dict[pathlib.Path, tuple[str, dict[str, int]]]] = None,
+    ) -> None:
+    dir_path_content = ROOT_DIR / dir_path_content
+    dir_path_public = ROOT_DIR / dir_path_public
+    index = SearchIndex.load(ROOT_DIR / index_path)
+    tokenized = index.update({
+        from_path.relative_to(dir_path_content).as_posix(): (from_path, to_path.relative_to(dir_path_public).as_posix())
+        for from_path, to_path in find_pages(dir_path_content, dir_path_public)
+    }, rendered)
+    written, removed = index.write(dir_path_public / SEARCH_DIR)
+    index.save()
+    print(f"Search index: {len(tokenized)} pages tokenized, {written} files written, {removed} removed")
+
+
+def build_feeds(
+        dir_path_content: pathlib.Path,
+        template_path: pathlib.Path,
+        dir_path_public: pathlib.Path,
+        metadata_path: pathlib.Path,
+        feeds_path: pathlib.Path,
+        base_url: str,
+        fingerprints: Optional[dict[str, dict]] = None,
+    ) -> list[pathlib.Path]:
+    # Fingerprinted names are rewritten into the tag pages after they are written, so a change in
+    # them has to count as a change of those pages
+    dir_path_public = ROOT_DIR / dir_path_public
+    site = SiteMetadata(ROOT_DIR / dir_path_content, ROOT_DIR / metadata_path)
+    feeds = Feeds.load(ROOT_DIR / feeds_path)
+    salt = json.dumps(fingerprints or {}, sort_keys=True)
+    written, removed = feeds.update(site, load_template(ROOT_DIR / template_path), dir_path_public, base_url, salt)
+    site.save()
+    feeds.save()
+    print(f"Feeds: {len(site.scanned)} pages scanned, {len(written)} files written, {len(removed)} removed")
+    return [dir_path_public / output for output in written]
+
+
+def sync_fingerprints(
+        dir_path_static: pathlib.Path,
+        dir_path_public: pathlib.Path,
+        manifest_path: pathlib.Path,
+        enabled: bool,
+    ) -> tuple[dict[str, dict], set[str]]:
+    # Returns the current fingerprints and the site paths of assets whose fingerprinted name changed,
+    # turning fingerprinting off invalidates every copy so the pages pointing at them are rebuilt too.
+    # Nothing is saved or pruned here: until commit_fingerprints runs after a successful build, the
+    # manifest keeps the old names so a failed build invalidates the same pages next time.
+    manifest = BuildManifest.load(ROOT_DIR / manifest_path)
+    if enabled:
+        fingerprints, changed = update_fingerprints(ROOT_DIR / dir_path_static, ROOT_DIR / dir_path_public, manifest.fingerprints)
+    else:
+        fingerprints, changed = {}, set(manifest.fingerprints)
+    return fingerprints, {"/" + rel for rel in changed}
+
+
+def commit_fingerprints(dir_path_public: pathlib.Path, manifest_path: pathlib.Path, fingerprints: dict[str, dict]) -> None:
+    manifest = BuildManifest.load(ROOT_DIR / manifest_path)
+    prune_fingerprints(ROOT_DIR / dir_path_public, manifest.fingerprints, fingerprints)
+    manifest.fingerprints = fingerprints
+    manifest.save()
+
+
+def generate_page(
+        from_path: pathlib.Path,
+        template_path: pathlib.Path,
+        to_path: pathlib.Path,
+        profiler: Optional[BuildProfiler] = None,
+        cache: Optional[RenderCache] = None,
+        terms: Optional[dict[pathlib.Path, tuple[str, dict[str, int]]]] = None,
+        references: Optional[dict[pathlib.Path, list[tuple[TextType, str, int]]]] = None,
+    ) -> None:
+    # With terms, the title and search terms counted from the rendered blocks are stored under the
+    # source path, and with references the link and image references with their lines. Cache hits
+    # and profiled pages are left out, their readers parse them again if needed.
     from_path = ROOT_DIR / from_path
     template_path = ROOT_DIR / template_path
     to_path = ROOT_DIR / to_path
 
     print(f"Generating page from {from_path} to {to_path} using template {template_path}")
-    with open(from_path, "r") as f:
-        markdown = f.read()
-    title = extract_title(markdown)
-    html_node = markdown_to_html_node(markdown)
-    with open(template_path, "r") as f:
-        template = f.read()
-    with open(to_path, "w") as f:
-        f.write(template.replace("{{ Content }}", html_node.to_html()).replace("{{ Title }}", title))
+    if profiler is not None:
+        profile_page(from_path, template_path, to_path, profiler)
+        return
+    template = load_template(template_path)
+    if cache is not None:
+        key = cache.key(from_path)
+        entry = cache.get(key)
+        if entry is not None:
+            # Only the front matter at the head of the source is read again for its template fields
+            with open(from_path, "r") as source:
+                metadata, _ = split_front_matter(source)
+            with open_atomic(to_path) as f:
+                template.write(f, {**template_context(metadata), "Title": read_entry_title(entry), "Content": functools.partial(copy_entry_body, entry)})
+            return
+    counter = TermCounter() if terms is not None else None
+    collector = ReferenceCollector() if references is not None else None
+    # Blocks are read, converted and written one at a time so memory follows the largest block
+    with open(from_path, "r") as source:
+        metadata, blocks, inline = split_page(source, counter, collector)
+        first = next(blocks, None)
+        title = page_title(metadata, first[1] if first else None)
+        content = functools.partial(write_blocks_html, itertools.chain([first], blocks) if first else (), inline=inline)
+        if cache is not None:
+            entry = cache.put(key, title, content)
+            content = functools.partial(copy_entry_body, entry)
+        with open_atomic(to_path) as f:
+            template.write(f, {**template_context(metadata), "Title": title, "Content": content})
+    if counter is not None:
+        terms[from_path] = (title, counter.terms())
+    if collector is not None:
+        references[from_path] = collector.references
+
+
+@contextlib.contextmanager
+def open_atomic(path: pathlib.Path) -> Iterator[TextIO]:
+    # Readers never see a half-written page, and a page that fails to render leaves the old one in place
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def find_pages(dir_path_content: pathlib.Path, dir_path_public: pathlib.Path) -> list[tuple[pathlib.Path, pathlib.Path]]:
+    dir_path_content = ROOT_DIR / dir_path_content
+    dir_path_public = ROOT_DIR / dir_path_public
+    pages = []
+    for path in dir_path_content.iterdir():
+        if path.is_dir():
+            pages.extend(find_pages(path, dir_path_public / path.relative_to(dir_path_content)))
+        elif path.suffix == ".md":
+            pages.append((path, dir_path_public / path.relative_to(dir_path_content).with_suffix(".html")))
+    return pages
 
 
 def generate_pages_recursive(dir_path_content: pathlib.Path, template_path: pathlib.Path, dir_path_public: pathlib.Path) -> None:
@@ -52,5 +493,399 @@ def generate_pages_recursive(dir_path_content: pathlib.Path, template_path: path
             generate_page(path, template_path, dir_path_public / path.relative_to(dir_path_content).with_suffix(".html"))
 
 
+def generate_pages(
+        pages: list[tuple[pathlib.Path, pathlib.Path]],
+        template_path: pathlib.Path,
+        jobs: int = 1,
+        profiler: Optional[BuildProfiler] = None,
+        cache: Optional[RenderCache] = None,
+        async_io: bool = False,
+        max_memory: Optional[int] = None,
+        terms: Optional[dict[pathlib.Path, tuple[str, dict[str, int]]]] = None,
+        references: Optional[dict[pathlib.Path, list[tuple[TextType, str, int]]]] = None,
+    ) -> None:
+    # terms and references collect the search terms and the link and image references of every
+    # rendered page, see generate_page
+    template_path = ROOT_DIR / template_path
+    if async_io:
+        generate_pages_async(pages, template_path, jobs, terms, references)
+        return
+    for directory in {(ROOT_DIR / to_path).parent for _, to_path in pages}:
+        os.makedirs(directory, exist_ok=True)
+    if jobs <= 1 or len(pages) <= 1:
+        batch_profiler, _, _, batch_terms, batch_references = generate_batch(
+            pages, template_path, profiler is not None, cache, terms is not None, references is not None
+        )
+        if batch_profiler is not None:
+            profiler.merge(batch_profiler)
+        if batch_terms is not None:
+            terms.update(batch_terms)
+        if batch_references is not None:
+            references.update(batch_references)
+        return
+    # With a memory budget pages are submitted one at a time as the budget allows, otherwise in batches
+    scheduler = MemoryScheduler(max_memory, jobs) if max_memory else None
+    batches = batch_pages(pages, jobs) if scheduler is None else None
+    memo = current_inline_memo()
+    highlighter = current_highlighter()
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(jobs, len(batches if batches is not None else pages)),
+            initializer=init_worker,
+            initargs=worker_state(),
+        ) as executor:
+        if scheduler is not None:
+            pages = [(ROOT_DIR / from_path, ROOT_DIR / to_path) for from_path, to_path in pages]
+            results = scheduler.run(
+                executor, generate_batch, pages, template_path, profiler is not None, cache, terms is not None, references is not None
+            )
+        else:
+            results = executor.map(
+                generate_batch,
+                batches,
+                [template_path] * len(batches),
+                [profiler is not None] * len(batches),
+                [cache] * len(batches),
+                [terms is not None] * len(batches),
+                [references is not None] * len(batches),
+            )
+        # Consume the results so that worker exceptions are raised here
+        for batch_profiler, memo_counts, highlight_counts, batch_terms, batch_references in results:
+            if batch_terms is not None:
+                terms.update(batch_terms)
+            if batch_references is not None:
+                references.update(batch_references)
+            if batch_profiler is not None:
+                profiler.merge(batch_profiler)
+            if memo is not None and memo_counts is not None:
+                memo.merge(*memo_counts)
+            if highlighter is not None and highlight_counts is not None:
+                highlighter.merge(*highlight_counts)
+    if scheduler is not None:
+        print(scheduler.format_summary())
+
+
+def generate_pages_async(
+        pages: list[tuple[pathlib.Path, pathlib.Path]],
+        template_path: pathlib.Path,
+        jobs: int = 1,
+        terms: Optional[dict[pathlib.Path, tuple[str, dict[str, int]]]] = None,
+        references: Optional[dict[pathlib.Path, list[tuple[TextType, str, int]]]] = None,
+    ) -> None:
+    pages = [(ROOT_DIR / from_path, ROOT_DIR / to_path) for from_path, to_path in pages]
+    if jobs <= 1 or len(pages) <= 1:
+        asyncio.run(build_pages(pages, ROOT_DIR / template_path, terms=terms, references=references))
+        return
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=init_worker,
+            initargs=worker_state(),
+        ) as executor:
+        asyncio.run(build_pages(pages, ROOT_DIR / template_path, renderers=jobs, queue_size=jobs * 4, executor=executor, terms=terms, references=references))
+
+
+def generate_batch(
+        pages: list[tuple[pathlib.Path, pathlib.Path]],
+        template_path: pathlib.Path,
+        profile: bool = False,
+        cache: Optional[RenderCache] = None,
+        collect_terms: bool = False,
+        collect_references: bool = False,
+    ) -> tuple[
+        Optional[BuildProfiler],
+        Optional[tuple[int, int]],
+        Optional[tuple[int, int]],
+        Optional[dict[pathlib.Path, tuple[str, dict[str, int]]]],
+        Optional[dict[pathlib.Path, list[tuple[TextType, str, int]]]],
+    ]:
+    profiler = BuildProfiler() if profile else None
+    terms = {} if collect_terms else None
+    references = {} if collect_references else None
+    memo_before = inline_memo_stats()
+    highlight_before = highlight_stats()
+    for from_path, to_path in pages:
+        generate_page(from_path, template_path, to_path, profiler, cache, terms, references)
+    return profiler, counts_delta(memo_before, inline_memo_stats()), counts_delta(highlight_before, highlight_stats()), terms, references
+
+
+def worker_state() -> tuple[Optional[tuple[int, int]], Optional[int]]:
+    memo = current_inline_memo()
+    highlighter = current_highlighter()
+    return (memo.maxsize, memo.max_length) if memo is not None else None, highlighter.maxsize if highlighter is not None else None
+
+
+def init_worker(memo: Optional[tuple[int, int]], highlighter: Optional[int]) -> None:
+    # Worker processes start with the parent's inline memo and highlighter settings but their own caches
+    if memo is not None:
+        enable_inline_memo(*memo)
+    if highlighter is not None:
+        enable_highlighting(highlighter)
+
+
+def batch_pages(pages: list[tuple[pathlib.Path, pathlib.Path]], jobs: int, batches_per_job: int = 4) -> list[list[tuple[pathlib.Path, pathlib.Path]]]:
+    # Several batches per worker keep the pool busy when page sizes are uneven
+    batch_count = min(len(pages), jobs * batches_per_job)
+    if batch_count == 0:
+        return []
+    return [pages[i::batch_count] for i in range(batch_count)]
+
+
+def build_shard(
+        index: int,
+        count: int,
+        dir_path_content: pathlib.Path,
+        template_path: pathlib.Path,
+        shard_root: pathlib.Path,
+        jobs: int = 1,
+        profiler: Optional[BuildProfiler] = None,
+        cache: Optional[RenderCache] = None,
+        async_io: bool = False,
+        max_memory: Optional[int] = None,
+    ) -> list[pathlib.Path]:
+    directory = shard_dir(ROOT_DIR / shard_root, index, count)
+    if directory.exists():
+        shutil.rmtree(directory)
+    pages = partition_pages(find_pages(dir_path_content, directory), ROOT_DIR / dir_path_content, count)[index - 1]
+    print(f"Building shard {index}/{count}: {len(pages)} pages into {directory}")
+    generate_pages(pages, template_path, jobs, profiler, cache, async_io, max_memory)
+    write_shard_manifest(directory, index, count, [to_path.relative_to(directory).as_posix() for _, to_path in pages])
+    return [to_path for _, to_path in pages]
+
+
+def merge_site(dir_path_content: pathlib.Path, dir_path_static: pathlib.Path, dir_path_public: pathlib.Path, shard_root: pathlib.Path) -> None:
+    shard_root = ROOT_DIR / shard_root
+    dir_path_public = ROOT_DIR / dir_path_public
+    count = find_shard_count(shard_root)
+    expected = {to_path.relative_to(dir_path_public).as_posix() for _, to_path in find_pages(dir_path_content, dir_path_public)}
+    # Verify before public/ is replaced so a broken set of shards leaves the previous site in place
+    owners = verify_shards(shard_root, count, expected)
+    copy_src_to_dest(dir_path_static, dir_path_public)
+    merge_shards(shard_root, count, owners, dir_path_public)
+    print(f"Merged {len(owners)} pages from {count} shards into {dir_path_public}")
+
+
+def generate_pages_incremental(
+        dir_path_content: pathlib.Path,
+        template_path: pathlib.Path,
+        dir_path_public: pathlib.Path,
+        manifest_path: pathlib.Path,
+        jobs: int = 1,
+        profiler: Optional[BuildProfiler] = None,
+        cache: Optional[RenderCache] = None,
+        async_io: bool = False,
+        invalidated: Iterable[str] = (),
+        max_memory: Optional[int] = None,
+        terms: Optional[dict[pathlib.Path, tuple[str, dict[str, int]]]] = None,
+    ) -> list[pathlib.Path]:
+    dir_path_content = ROOT_DIR / dir_path_content
+    template_path = ROOT_DIR / template_path
+    dir_path_public = ROOT_DIR / dir_path_public
+    manifest = BuildManifest.load(ROOT_DIR / manifest_path)
+    graph = DependencyGraph.load(graph_path_for(manifest_path))
+    template_hash = hash_file(template_path)
+    template_key = display_path(template_path)
+    generator_hash = generator_version()
+    # Only the pages rendered with a changed template are invalidated by it, pages missing from the
+    # graph have no recorded template and are treated as dependents
+    template_pages = graph.template_dependents(template_key) if manifest.template_hash != template_hash else set()
+
+    stale = {}
+    pages = {}
+    # Pages whose source and generator did not change keep their recorded links when rebuilt
+    unchanged = set()
+    for from_path, to_path in find_pages(dir_path_content, dir_path_public):
+        key = from_path.relative_to(dir_path_content).as_posix()
+        pages[key] = (from_path, to_path)
+        source_hash = manifest.source_hash(key, from_path)
+        if manifest.generator_hash == generator_hash and manifest.pages.get(key, {}).get("hash") == source_hash:
+            unchanged.add(key)
+        if (
+            manifest.is_stale(key, source_hash, manifest.template_hash, generator_hash)
+            or key in template_pages
+            or key not in graph.pages
+            or not to_path.exists()
+        ):
+            stale[key] = (from_path, to_path)
+        manifest.record(key, from_path, source_hash, to_path.relative_to(dir_path_public).as_posix())
+
+    # Pages that link to or embed a page or asset that appeared or disappeared are rebuilt as well
+    added = [page_url(manifest.pages[key]["output"]) for key in pages.keys() - graph.pages.keys()]
+    removed = [page_url(graph.pages[key]["output"]) for key in graph.pages.keys() - pages.keys()]
+    added += ["/" + asset for asset in manifest.assets.keys() - set(graph.assets)]
+    removed += ["/" + asset for asset in set(graph.assets) - manifest.assets.keys()]
+    invalidated = list(invalidated)
+    for target in added + removed + invalidated:
+        for key in graph.dependents(target):
+            if key in pages:
+                stale.setdefault(key, pages[key])
+    # Assets referenced by the template itself, such as the stylesheet, invalidate every page using it
+    if invalidated:
+        with open(template_path, "r") as f:
+            template_source = f.read()
+        if any(target in template_source for target in invalidated):
+            for key in graph.template_dependents(template_key):
+                if key in pages:
+                    stale.setdefault(key, pages[key])
+    references = {}
+    try:
+        generate_pages(list(stale.values()), template_path, jobs, profiler, cache, async_io, max_memory, terms, references)
+    except BaseException:
+        record_owned_outputs(manifest_path, stale, dir_path_public)
+        raise
+
+    for key in manifest.pages.keys() - pages.keys():
+        prune_output(dir_path_public, dir_path_public / manifest.pages.pop(key)["output"])
+        graph.remove(key)
+    for key, (from_path, _) in stale.items():
+        if from_path not in references and key in unchanged and graph.references(key) is not None:
+            graph.set_template(key, template_key)
+        else:
+            record_dependencies(graph, key, from_path, manifest.pages[key]["output"], template_key, references.get(from_path))
+    graph.assets = sorted(manifest.assets)
+
+    manifest.template_hash = template_hash
+    manifest.generator_hash = generator_hash
+    manifest.save()
+    graph.save()
+    return [to_path for _, to_path in stale.values()]
+
+
+def record_owned_outputs(manifest_path: pathlib.Path, pages: dict[str, tuple[pathlib.Path, pathlib.Path]], dir_path_public: pathlib.Path) -> None:
+    # A failed build saves nothing else, but new pages whose output was already written need an owner
+    # so deleting their source later prunes it. Without a hash they stay stale for the next build.
+    manifest = BuildManifest.load(ROOT_DIR / manifest_path)
+    for key, (_, to_path) in pages.items():
+        if key not in manifest.pages and to_path.exists():
+            manifest.pages[key] = {"hash": None, "output": to_path.relative_to(dir_path_public).as_posix()}
+    manifest.save()
+
+
+def graph_path_for(manifest_path: pathlib.Path) -> pathlib.Path:
+    return (ROOT_DIR / manifest_path).with_name("depgraph.json")
+
+
+def display_path(path: pathlib.Path) -> str:
+    path = ROOT_DIR / path
+    return path.relative_to(ROOT_DIR).as_posix() if path.is_relative_to(ROOT_DIR) else path.as_posix()
+
+
+def record_dependencies(
+        graph: DependencyGraph,
+        key: str,
+        from_path: pathlib.Path,
+        output: str,
+        template_key: str,
+        references: Optional[list[tuple[TextType, str, int]]] = None,
+    ) -> None:
+    # references are those collected while the page rendered, only a page served from the cache or
+    # profiled is parsed here
+    if references is None:
+        with open(from_path, "r") as f:
+            references = collect_references(f.read())
+    links, images = reference_dependencies(references, output)
+    graph.record(key, output, template_key, links, images, references)
+
+
+def prune_output(dir_path_public: pathlib.Path, path: pathlib.Path) -> None:
+    print(f"Removing {path}")
+    prune_file(dir_path_public, path)
+
+
+def rebuild_changed(
+        changed: set[pathlib.Path],
+        removed: set[pathlib.Path],
+        dir_path_content: pathlib.Path,
+        dir_path_static: pathlib.Path,
+        template_path: pathlib.Path,
+        dir_path_public: pathlib.Path,
+        manifest_path: pathlib.Path,
+        jobs: int = 1,
+        asset_compare: str = "mtime",
+        hardlink: bool = False,
+    ) -> list[pathlib.Path]:
+    dir_path_content = ROOT_DIR / dir_path_content
+    dir_path_static = ROOT_DIR / dir_path_static
+    template_path = ROOT_DIR / template_path
+    dir_path_public = ROOT_DIR / dir_path_public
+
+    assets_changed = any(path.is_relative_to(dir_path_static) for path in changed | removed)
+    if assets_changed:
+        sync_assets(dir_path_static, dir_path_public, manifest_path, asset_compare, hardlink)
+
+    manifest = BuildManifest.load(ROOT_DIR / manifest_path)
+    graph = DependencyGraph.load(graph_path_for(manifest_path))
+    changed_pages = {path.relative_to(dir_path_content).as_posix(): path for path in changed if path.suffix == ".md" and path.is_relative_to(dir_path_content)}
+    if (
+        assets_changed
+        or template_path in changed
+        or any(path.suffix == ".md" and path.is_relative_to(dir_path_content) for path in removed)
+        or not changed_pages.keys() <= graph.pages.keys()
+    ):
+        # The dependency graph decides which pages a template, asset or added or removed page invalidates
+        return generate_pages_incremental(dir_path_content, template_path, dir_path_public, manifest_path, jobs)
+
+    template_key = display_path(template_path)
+    pages = []
+    for key, path in changed_pages.items():
+        to_path = dir_path_public / path.relative_to(dir_path_content).with_suffix(".html")
+        manifest.record(key, path, hash_file(path), to_path.relative_to(dir_path_public).as_posix())
+        pages.append((path, to_path))
+    references = {}
+    generate_pages(pages, template_path, jobs, references=references)
+    for key, path in changed_pages.items():
+        record_dependencies(graph, key, path, manifest.pages[key]["output"], template_key, references.get(path))
+    manifest.save()
+    graph.save()
+    return [to_path for _, to_path in pages]
+
+
+def explain(page: str, manifest_path: pathlib.Path) -> None:
+    graph = DependencyGraph.load(graph_path_for(manifest_path))
+    key = graph.find(page)
+    if key is None:
+        raise SystemExit(f"{page} is not in the dependency graph, run an incremental build first")
+    print(graph.explain(key))
+
+
+def serve(port: int, interval: float, jobs: int = 1, asset_compare: str = "mtime", hardlink: bool = False) -> None:
+    sync_assets(STATIC_DIR, PUBLIC_DIR, MANIFEST_PATH, asset_compare, hardlink)
+    generate_pages_incremental(CONTENT_DIR, TEMPLATE_PATH, PUBLIC_DIR, MANIFEST_PATH, jobs)
+
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(ROOT_DIR / PUBLIC_DIR))
+    server = http.server.ThreadingHTTPServer(("", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving {ROOT_DIR / PUBLIC_DIR} at http://localhost:{port}/")
+
+    watcher = Watcher([ROOT_DIR / CONTENT_DIR, ROOT_DIR / STATIC_DIR, ROOT_DIR / TEMPLATE_PATH])
+    try:
+        while True:
+            time.sleep(interval)
+            changed, removed = watcher.poll()
+            if not changed and not removed:
+                continue
+            start = time.perf_counter()
+            try:
+                generated = rebuild_changed(
+                    changed,
+                    removed,
+                    CONTENT_DIR,
+                    STATIC_DIR,
+                    TEMPLATE_PATH,
+                    PUBLIC_DIR,
+                    MANIFEST_PATH,
+                    jobs,
+                    asset_compare,
+                    hardlink,
+                )
+            except Exception as e:
+                # Keep serving while a page is mid-edit and temporarily invalid
+                print(f"Rebuild failed: {e}")
+                continue
+            print(f"Rebuilt {len(generated)} page(s) in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,126 @@
+import functools
+import hashlib
+import json
+import os
+import pathlib
+from typing import Optional
+
+from highlight import current_highlighter
+
+
+MANIFEST_VERSION = 1
+SRC_DIR = pathlib.Path(__file__).resolve().parent
+# The modules whose code decides the markup of a rendered page; tooling such as bench.py, corpus.py
+# or watch.py is left out so editing it does not invalidate every page and cache entry
+RENDER_MODULES = (
+    "cache.py",
+    "frontmatter.py",
+    "highlight.py",
+    "htmlnode.py",
+    "leafnode.py",
+    "main.py",
+    "markdown.py",
+    "parentnode.py",
+    "pipeline.py",
+    "profiler.py",
+    "template.py",
+    "textnode.py",
+)
+
+
+def hash_file(path: pathlib.Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def generator_version() -> str:
+    # Options that change the rendered markup count as a different generator
+    if current_highlighter() is None:
+        return source_version()
+    return hashlib.sha256(f"{source_version()}:highlight".encode()).hexdigest()
+
+
+@functools.cache
+def source_version() -> str:
+    digest = hashlib.sha256(str(MANIFEST_VERSION).encode())
+    for name in RENDER_MODULES:
+        digest.update(name.encode())
+        digest.update((SRC_DIR / name).read_bytes())
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    def __init__(
+            self,
+            path: pathlib.Path,
+            template_hash: Optional[str] = None,
+            generator_hash: Optional[str] = None,
+            pages: Optional[dict[str, dict]] = None,
+            assets: Optional[dict[str, dict]] = None,
+            fingerprints: Optional[dict[str, dict]] = None,
+        ) -> None:
+        self.path = path
+        self.template_hash = template_hash
+        self.generator_hash = generator_hash
+        self.pages = pages if pages is not None else {}
+        self.assets = assets if assets is not None else {}
+        self.fingerprints = fingerprints if fingerprints is not None else {}
+
+    def __repr__(self) -> str:
+        return f"BuildManifest({self.path=}, {self.template_hash=}, {self.generator_hash=}, {len(self.pages)=}, {len(self.assets)=})"
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "BuildManifest":
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(path)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get("template"), data.get("generator"), data.get("pages", {}), data.get("assets", {}), data.get("fingerprints", {}))
+
+    def save(self) -> None:
+        os.makedirs(self.path.parent, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "template": self.template_hash,
+                    "generator": self.generator_hash,
+                    "pages": self.pages,
+                    "assets": self.assets,
+                    "fingerprints": self.fingerprints,
+                },
+                f,
+                indent=1,
+                sort_keys=True,
+            )
+        os.replace(tmp_path, self.path)
+
+    def source_hash(self, key: str, path: pathlib.Path) -> str:
+        # Reuse the stored hash when size and mtime match so unchanged sources are not re-read
+        stat = path.stat()
+        entry = self.pages.get(key)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime_ns:
+            return entry["hash"]
+        return hash_file(path)
+
+    def record(self, key: str, path: pathlib.Path, source_hash: str, output: str) -> None:
+        stat = path.stat()
+        self.pages[key] = {
+            "hash": source_hash,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "output": output,
+        }
+
+    def is_stale(self, key: str, source_hash: str, template_hash: str, generator_hash: str) -> bool:
+        if self.template_hash != template_hash or self.generator_hash != generator_hash:
+            return True
+        entry = self.pages.get(key)
+        return entry is None or entry["hash"] != source_hash
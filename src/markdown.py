@@ -1,22 +1,46 @@
-from textnode import block_to_parent_node, block_to_block_type, markdown_to_blocks
+from frontmatter import strip_front_matter
+from textnode import BlockType, TextNode, block_spans, block_to_parent_node, scan_blocks
 from parentnode import ParentNode
 
+from typing import Callable, Iterable, Optional, TextIO
+
 
 def markdown_to_html_node(markdown: str) -> ParentNode:
-    blocks = markdown_to_blocks(markdown)
-    nodes = []
-    for block in blocks:
-        block = block.strip()
-        block_type = block_to_block_type(block)
-        nodes.append(block_to_parent_node(block, block_type))
+    _, markdown = strip_front_matter(markdown)
+    nodes = [block_to_parent_node(markdown[start:end], block_type) for block_type, start, end in scan_blocks(markdown)]
     return ParentNode("div", nodes, None)
 
 
+def write_blocks_html(
+        blocks: Iterable[tuple[BlockType, str]],
+        fp: TextIO,
+        inline: Optional[Callable[[str], list[TextNode]]] = None,
+    ) -> None:
+    # Streaming counterpart of markdown_to_html_node: each block is converted and written on its own
+    fp.write("<div>")
+    for block_type, block in blocks:
+        block_to_parent_node(block, block_type, inline).write_html(fp)
+    fp.write("</div>")
+
+
 def extract_title(markdown: str) -> str:
-    blocks = markdown_to_blocks(markdown)
-    if not blocks:
+    metadata, markdown = strip_front_matter(markdown)
+    if metadata.get("title"):
+        return str(metadata["title"])
+    span = next(block_spans(markdown), None)
+    return title_from_block(markdown[span[0]:span[1]] if span else None)
+
+
+def page_title(metadata: dict[str, object], first_block: Optional[str]) -> str:
+    # A title field in the front matter wins over the leading heading
+    if metadata.get("title"):
+        return str(metadata["title"])
+    return title_from_block(first_block)
+
+
+def title_from_block(block: Optional[str]) -> str:
+    if block is None:
         raise Exception("No blocks found in markdown")
-    title = blocks[0]
-    if title.startswith("# "):
-        return title[2:]
+    if block.startswith("# "):
+        return block[2:]
     raise Exception("No title found in markdown")
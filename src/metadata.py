@@ -0,0 +1,107 @@
+import json
+import os
+import pathlib
+from typing import Optional
+
+from frontmatter import split_front_matter
+from markdown import page_title
+from textnode import iter_blocks
+
+
+METADATA_VERSION = 1
+
+
+def page_tags(metadata: dict[str, object]) -> list[str]:
+    tags = metadata.get("tags", [])
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return [str(tag).strip() for tag in tags if str(tag).strip()]
+
+
+def read_page_metadata(path: pathlib.Path) -> dict[str, object]:
+    # Reads the front matter and, without a title field, only up to the end of the first block
+    with open(path, "r") as f:
+        metadata, lines = split_front_matter(f)
+        first = None
+        if not metadata.get("title"):
+            block = next(iter_blocks(lines), None)
+            first = block[1] if block else None
+        metadata["title"] = page_title(metadata, first)
+    return metadata
+
+
+class SiteMetadata:
+    # Title, date, tags and output path of every page. The scan runs on first access and reuses the
+    # cached entry of every page whose size and mtime did not change, so bodies are never parsed.
+    def __init__(self, dir_path_content: pathlib.Path, cache_path: Optional[pathlib.Path] = None) -> None:
+        self.dir_path_content = pathlib.Path(dir_path_content)
+        self.cache_path = cache_path
+        self._pages: Optional[dict[str, dict]] = None
+        self.scanned: list[str] = []
+
+    def __repr__(self) -> str:
+        return f"SiteMetadata({self.dir_path_content=}, {self.cache_path=}, {self._pages is not None=})"
+
+    @property
+    def pages(self) -> dict[str, dict]:
+        if self._pages is None:
+            self._pages = self.scan()
+        return self._pages
+
+    def load_cache(self) -> dict[str, dict]:
+        if self.cache_path is None:
+            return {}
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return data.get("pages", {}) if data.get("version") == METADATA_VERSION else {}
+
+    def scan(self) -> dict[str, dict]:
+        cached = self.load_cache()
+        pages = {}
+        self.scanned = []
+        for dirpath, _, filenames in os.walk(self.dir_path_content):
+            for filename in filenames:
+                if not filename.endswith(".md"):
+                    continue
+                path = pathlib.Path(dirpath) / filename
+                key = path.relative_to(self.dir_path_content).as_posix()
+                stat = path.stat()
+                entry = cached.get(key)
+                if entry is None or entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime_ns:
+                    metadata = read_page_metadata(path)
+                    entry = {
+                        "title": metadata["title"],
+                        "date": str(metadata["date"]) if metadata.get("date") is not None else None,
+                        "tags": page_tags(metadata),
+                        "output": pathlib.PurePosixPath(key).with_suffix(".html").as_posix(),
+                        "fields": metadata,
+                        "size": stat.st_size,
+                        "mtime": stat.st_mtime_ns,
+                    }
+                    self.scanned.append(key)
+                pages[key] = entry
+        return pages
+
+    def save(self) -> None:
+        if self.cache_path is None or self._pages is None:
+            return
+        os.makedirs(self.cache_path.parent, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": METADATA_VERSION, "pages": self._pages}, f, sort_keys=True)
+        os.replace(tmp_path, self.cache_path)
+
+    def by_tag(self) -> dict[str, list[str]]:
+        tags = {}
+        for key in self.by_date():
+            for tag in self.pages[key]["tags"]:
+                tags.setdefault(tag, []).append(key)
+        return tags
+
+    def by_date(self) -> list[str]:
+        # Newest first, undated pages last in path order
+        dated = sorted((key for key, entry in self.pages.items() if entry["date"]), key=lambda key: (self.pages[key]["date"], key), reverse=True)
+        return dated + sorted(key for key, entry in self.pages.items() if not entry["date"])
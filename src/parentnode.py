@@ -1,8 +1,10 @@
-from typing import Optional
-from htmlnode import HTMLNode
+from typing import Iterator, Optional
+from htmlnode import HTMLNode, close_tag
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: Optional[str], children: list[HTMLNode], props: Optional[dict[str, str]]) -> None:
         super().__init__(tag, None, children, props)
     
@@ -14,5 +16,25 @@ class ParentNode(HTMLNode):
             raise ValueError("ParentNode must have a tag")
         if not self.children:
             raise ValueError("ParentNode must have children")
-        children_html = "".join(child.to_html() for child in self.children)
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
\ No newline at end of file
+        return self.open_tag_html() + "".join([child.to_html() for child in self.children]) + close_tag(self.tag)
+
+    def iter_html(self) -> Iterator[str]:
+        # Yields the same markup as to_html without materializing any subtree as one string
+        if not self.tag:
+            raise ValueError("ParentNode must have a tag")
+        if not self.children:
+            raise ValueError("ParentNode must have children")
+        yield self.open_tag_html()
+        leaves = []
+        for child in self.children:
+            if child.children is None:
+                leaves.append(child.to_html())
+                continue
+            # Runs of leaves are joined into one fragment, only nested parents are streamed
+            if leaves:
+                yield "".join(leaves)
+                leaves = []
+            yield from child.iter_html()
+        if leaves:
+            yield "".join(leaves)
+        yield close_tag(self.tag)
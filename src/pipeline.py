@@ -0,0 +1,199 @@
+import asyncio
+import concurrent.futures
+import functools
+import io
+import itertools
+import os
+import pathlib
+from typing import Callable, Iterable, Iterator, Optional
+
+from frontmatter import split_front_matter, template_context
+from highlight import current_highlighter, highlight_stats
+from linkcheck import ReferenceCollector
+from markdown import page_title, write_blocks_html
+from search import TermCounter
+from template import load_template
+from textnode import BlockType, TextNode, TextType, current_inline_memo, inline_memo_stats, iter_blocks
+
+
+DONE = None
+
+
+def split_page(
+        lines: Iterable[str],
+        counter: Optional[TermCounter] = None,
+        collector: Optional[ReferenceCollector] = None,
+    ) -> tuple[dict[str, object], Iterator[tuple[BlockType, str]], Optional[Callable[[str], list[TextNode]]]]:
+    # Returns the front matter, the block stream and the inline callback for block_to_parent_node,
+    # routed through the term counter and reference collector when given
+    if collector is not None:
+        lines = collector.source(lines)
+    metadata, lines = split_front_matter(lines)
+    blocks = iter_blocks(lines if collector is None else collector.body(lines))
+    inline = None
+    if counter is not None:
+        blocks, inline = counter.blocks(blocks), counter.inline
+    if collector is not None:
+        if inline is not None:
+            collector.parse = inline
+        blocks, inline = collector.blocks(blocks), collector.inline
+    return metadata, blocks, inline
+
+
+def render_page(
+        source: str,
+        template_path: pathlib.Path,
+        counter: Optional[TermCounter] = None,
+        collector: Optional[ReferenceCollector] = None,
+    ) -> str:
+    # Pure CPU stage so it can run in the event loop thread or in a worker process
+    template = load_template(template_path)
+    metadata, blocks, inline = split_page(source.splitlines(keepends=True), counter, collector)
+    first = next(blocks, None)
+    title = page_title(metadata, first[1] if first else None)
+    output = io.StringIO()
+    content = functools.partial(write_blocks_html, itertools.chain([first], blocks) if first else (), inline=inline)
+    template.write(output, {**template_context(metadata), "Title": title, "Content": content})
+    if counter is not None:
+        counter.title = title
+    return output.getvalue()
+
+
+def render_page_counted(
+        source: str,
+        template_path: pathlib.Path,
+        collect_terms: bool = False,
+        collect_references: bool = False,
+    ) -> tuple[
+        str,
+        Optional[tuple[int, int]],
+        Optional[tuple[int, int]],
+        Optional[tuple[str, dict[str, int]]],
+        Optional[list[tuple[TextType, str, int]]],
+    ]:
+    # Worker processes have their own inline memo and highlight cache, so the hits and misses of
+    # this render are returned for the parent to merge, along with the page's title, terms and
+    # link and image references
+    memo_before = inline_memo_stats()
+    highlight_before = highlight_stats()
+    counter = TermCounter() if collect_terms else None
+    collector = ReferenceCollector() if collect_references else None
+    html = render_page(source, template_path, counter, collector)
+    page_terms = (counter.title, counter.terms()) if counter is not None else None
+    page_references = collector.references if collector is not None else None
+    return html, counts_delta(memo_before, inline_memo_stats()), counts_delta(highlight_before, highlight_stats()), page_terms, page_references
+
+
+def counts_delta(before: Optional[dict[str, int]], after: Optional[dict[str, int]]) -> Optional[tuple[int, int]]:
+    if before is None or after is None:
+        return None
+    return after["hits"] - before["hits"], after["misses"] - before["misses"]
+
+
+def read_page(path: pathlib.Path) -> str:
+    with open(path, "r") as f:
+        return f.read()
+
+
+def write_page(path: pathlib.Path, html: str) -> None:
+    os.makedirs(path.parent, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+async def build_pages(
+        pages: Iterable[tuple[pathlib.Path, pathlib.Path]],
+        template_path: pathlib.Path,
+        readers: int = 8,
+        writers: int = 8,
+        renderers: int = 1,
+        queue_size: int = 32,
+        executor: Optional[concurrent.futures.Executor] = None,
+        terms: Optional[dict[pathlib.Path, tuple[str, dict[str, int]]]] = None,
+        references: Optional[dict[pathlib.Path, list[tuple[TextType, str, int]]]] = None,
+    ) -> int:
+    # Readers and writers run blocking file calls in threads so slow storage overlaps with rendering,
+    # while the bounded queues keep at most queue_size sources and pages in memory at each hand-off
+    if readers < 1 or writers < 1 or renderers < 1 or queue_size < 1:
+        raise ValueError("Pipeline stages and queues must have at least one slot")
+    read_queue: asyncio.Queue = asyncio.Queue(queue_size)
+    write_queue: asyncio.Queue = asyncio.Queue(queue_size)
+    source = iter(pages)
+    written = []
+    try:
+        async with asyncio.TaskGroup() as group:
+            reader_tasks = [group.create_task(_read_stage(source, read_queue)) for _ in range(readers)]
+            render_tasks = [
+                group.create_task(_render_stage(read_queue, write_queue, template_path, executor, terms, references))
+                for _ in range(renderers)
+            ]
+            for _ in range(writers):
+                group.create_task(_write_stage(write_queue, written))
+            group.create_task(_finish_stage(reader_tasks, read_queue, renderers))
+            group.create_task(_finish_stage(render_tasks, write_queue, writers))
+    except ExceptionGroup as errors:
+        # Surface the first failure the same way the serial and process pool builds do
+        raise errors.exceptions[0]
+    return len(written)
+
+
+async def _read_stage(source: Iterator[tuple[pathlib.Path, pathlib.Path]], read_queue: asyncio.Queue) -> None:
+    # The event loop is single threaded, so readers can share one iterator without a lock
+    for from_path, to_path in source:
+        await read_queue.put((from_path, to_path, await asyncio.to_thread(read_page, from_path)))
+
+
+async def _render_stage(
+        read_queue: asyncio.Queue,
+        write_queue: asyncio.Queue,
+        template_path: pathlib.Path,
+        executor: Optional[concurrent.futures.Executor],
+        terms: Optional[dict[pathlib.Path, tuple[str, dict[str, int]]]],
+        references: Optional[dict[pathlib.Path, list[tuple[TextType, str, int]]]],
+    ) -> None:
+    loop = asyncio.get_running_loop()
+    while (item := await read_queue.get()) is not DONE:
+        from_path, to_path, source = item
+        print(f"Generating page from {from_path} to {to_path} using template {template_path}")
+        if executor is None:
+            counter = TermCounter() if terms is not None else None
+            collector = ReferenceCollector() if references is not None else None
+            html = render_page(source, template_path, counter, collector)
+            if counter is not None:
+                terms[from_path] = (counter.title, counter.terms())
+            if collector is not None:
+                references[from_path] = collector.references
+        else:
+            html, memo_counts, highlight_counts, page_terms, page_references = await loop.run_in_executor(
+                executor, render_page_counted, source, template_path, terms is not None, references is not None
+            )
+            if page_terms is not None:
+                terms[from_path] = page_terms
+            if page_references is not None:
+                references[from_path] = page_references
+            memo = current_inline_memo()
+            if memo is not None and memo_counts is not None:
+                memo.merge(*memo_counts)
+            highlighter = current_highlighter()
+            if highlighter is not None and highlight_counts is not None:
+                highlighter.merge(*highlight_counts)
+        await write_queue.put((to_path, html))
+
+
+async def _write_stage(write_queue: asyncio.Queue, written: list[pathlib.Path]) -> None:
+    while (item := await write_queue.get()) is not DONE:
+        to_path, html = item
+        await asyncio.to_thread(write_page, to_path, html)
+        written.append(to_path)
+
+
+async def _finish_stage(tasks: list[asyncio.Task], queue: asyncio.Queue, consumers: int) -> None:
+    await asyncio.wait(tasks)
+    for _ in range(consumers):
+        await queue.put(DONE)
@@ -0,0 +1,151 @@
+import concurrent.futures
+import gzip
+import os
+import pathlib
+import re
+from typing import Iterable, Optional
+
+from manifest import hash_file
+from sync import clone_file, prune_file
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt", ".xml"}
+REFERENCE_PATTERN = re.compile(r"""(\b(?:src|href)=["'])(/[^"'?#]*)""")
+
+
+def compressed_suffixes() -> list[str]:
+    return [".gz", ".br"] if brotli is not None else [".gz"]
+
+
+def fingerprint_name(rel: str, digest: str) -> str:
+    # "images/logo.png" becomes "images/logo.1a2b3c4d5e.png"
+    directory, _, name = rel.rpartition("/")
+    stem, dot, suffix = name.rpartition(".")
+    if not dot or not stem:
+        stem, suffix = name, ""
+    name = f"{stem}.{digest[:10]}" + (f".{suffix}" if suffix else "")
+    return f"{directory}/{name}" if directory else name
+
+
+def update_fingerprints(
+        dir_path_static: pathlib.Path,
+        dir_path_public: pathlib.Path,
+        previous: dict[str, dict],
+    ) -> tuple[dict[str, dict], set[str]]:
+    # Each asset gets a content-hashed copy next to the original. The stored size and mtime avoid
+    # re-hashing unchanged assets. Old copies stay until prune_fingerprints, since pages not yet
+    # rebuilt still link to them.
+    fingerprints = {}
+    changed = set()
+    for dirpath, _, filenames in os.walk(dir_path_static):
+        for filename in filenames:
+            src_path = pathlib.Path(dirpath) / filename
+            rel = src_path.relative_to(dir_path_static).as_posix()
+            stat = src_path.stat()
+            entry = previous.get(rel)
+            if entry is None or entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime_ns:
+                entry = {"name": fingerprint_name(rel, hash_file(src_path)), "size": stat.st_size, "mtime": stat.st_mtime_ns}
+            if not (dir_path_public / entry["name"]).exists():
+                clone_file(src_path, dir_path_public / entry["name"])
+            if previous.get(rel, {}).get("name") != entry["name"]:
+                changed.add(rel)
+            fingerprints[rel] = entry
+    return fingerprints, changed
+
+
+def prune_fingerprints(dir_path_public: pathlib.Path, previous: dict[str, dict], fingerprints: dict[str, dict]) -> None:
+    # Runs after post_write, so the compressed siblings of an old copy go with it; a later build
+    # without --compress would otherwise never remove them
+    names = {entry["name"] for entry in fingerprints.values()}
+    for entry in previous.values():
+        if entry["name"] not in names:
+            path = dir_path_public / entry["name"]
+            for suffix in (".gz", ".br"):
+                prune_file(dir_path_public, path.with_name(path.name + suffix))
+            prune_file(dir_path_public, path)
+
+
+def rewrite_references(path: pathlib.Path, names: dict[str, str]) -> bool:
+    with open(path, "r") as f:
+        html = f.read()
+
+    def replace(match: re.Match) -> str:
+        name = names.get(match.group(2)[1:])
+        return match.group(1) + "/" + name if name is not None else match.group(0)
+
+    rewritten = REFERENCE_PATTERN.sub(replace, html)
+    if rewritten == html:
+        return False
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(rewritten)
+    os.replace(tmp_path, path)
+    return True
+
+
+def compress_file(path: pathlib.Path) -> pathlib.Path:
+    with open(path, "rb") as f:
+        data = f.read()
+    stat = os.stat(path)
+    for suffix in compressed_suffixes():
+        compressed_path = path.with_name(path.name + suffix)
+        tmp_path = path.with_name(f".{compressed_path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            if suffix == ".gz":
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+            else:
+                f.write(brotli.compress(data))
+        # The sibling carries the source mtime so later builds can tell it is up to date
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_path, compressed_path)
+    return path
+
+
+def is_compressed(path: pathlib.Path) -> bool:
+    mtime = path.stat().st_mtime_ns
+    for suffix in compressed_suffixes():
+        try:
+            if os.stat(path.with_name(path.name + suffix)).st_mtime_ns != mtime:
+                return False
+        except FileNotFoundError:
+            return False
+    return True
+
+
+def compress_tree(dir_path_public: pathlib.Path, jobs: int = 1) -> list[pathlib.Path]:
+    pending = []
+    for dirpath, _, filenames in os.walk(dir_path_public):
+        for filename in filenames:
+            path = pathlib.Path(dirpath) / filename
+            if filename.startswith("."):
+                continue
+            if path.suffix in {".gz", ".br"}:
+                # Siblings of pages and assets that no longer exist
+                if not path.with_suffix("").exists():
+                    prune_file(dir_path_public, path)
+            elif path.suffix in COMPRESSIBLE_SUFFIXES and not is_compressed(path):
+                pending.append(path)
+    if jobs <= 1 or len(pending) <= 1:
+        return [compress_file(path) for path in pending]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(compress_file, pending, chunksize=max(1, len(pending) // (jobs * 4))))
+
+
+def post_write(
+        dir_path_public: pathlib.Path,
+        pages: Iterable[pathlib.Path],
+        fingerprints: Optional[dict[str, dict]] = None,
+        compress: bool = False,
+        jobs: int = 1,
+    ) -> None:
+    rewritten = 0
+    if fingerprints:
+        names = {rel: entry["name"] for rel, entry in fingerprints.items()}
+        rewritten = sum(rewrite_references(path, names) for path in pages)
+    compressed = compress_tree(dir_path_public, jobs) if compress else []
+    print(f"Post-processed output: {rewritten} pages rewritten, {len(compressed)} files compressed")
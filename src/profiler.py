@@ -0,0 +1,153 @@
+import contextlib
+import json
+import pathlib
+import time
+from typing import Iterator, Optional
+
+from frontmatter import strip_front_matter, template_context
+from markdown import extract_title
+from parentnode import ParentNode
+from template import load_template
+from textnode import TextNode, block_spans, block_to_parent_node, classify_block, text_to_textnodes
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+STAGES = (
+    "read",
+    "extract_title",
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_textnodes",
+    "build_nodes",
+    "to_html",
+    "template",
+    "write",
+)
+
+
+def peak_memory() -> Optional[int]:
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class BuildProfiler:
+    def __init__(self) -> None:
+        self.pages: dict[str, dict[str, float]] = {}
+        self.peak_memory: Optional[int] = None
+
+    def __repr__(self) -> str:
+        return f"BuildProfiler({len(self.pages)=}, {self.peak_memory=})"
+
+    def add(self, page: str, stage: str, seconds: float) -> None:
+        stages = self.pages.setdefault(page, {})
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def stage(self, page: str, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(page, stage, time.perf_counter() - start)
+
+    def sample_memory(self) -> None:
+        memory = peak_memory()
+        if memory is not None:
+            self.peak_memory = max(self.peak_memory or 0, memory)
+
+    def merge(self, other: "BuildProfiler") -> None:
+        for page, stages in other.pages.items():
+            for stage, seconds in stages.items():
+                self.add(page, stage, seconds)
+        if other.peak_memory is not None:
+            self.peak_memory = max(self.peak_memory or 0, other.peak_memory)
+
+    def summary(self, slowest: int = 10) -> dict:
+        stages = {stage: 0.0 for stage in STAGES}
+        totals = {}
+        for page, page_stages in self.pages.items():
+            for stage, seconds in page_stages.items():
+                stages[stage] = stages.get(stage, 0.0) + seconds
+            totals[page] = sum(page_stages.values())
+        slowest_pages = sorted(totals, key=totals.__getitem__, reverse=True)[:slowest]
+        return {
+            "pages": len(self.pages),
+            "total_seconds": sum(totals.values()),
+            "peak_memory_bytes": self.peak_memory,
+            "stages": stages,
+            "slowest": [
+                {"page": page, "total_seconds": totals[page], "stages": self.pages[page]}
+                for page in slowest_pages
+            ],
+        }
+
+    def format_summary(self, slowest: int = 10) -> str:
+        summary = self.summary(slowest)
+        total = summary["total_seconds"]
+        memory = summary["peak_memory_bytes"]
+        lines = [
+            f"Profiled {summary['pages']} page(s) in {total * 1000:.1f} ms"
+            + (f", peak RSS {memory / (1 << 20):.1f} MiB" if memory is not None else ""),
+            "",
+            f"{'Stage':<24}{'Total (ms)':>12}{'Share':>8}",
+        ]
+        for stage, seconds in summary["stages"].items():
+            share = seconds / total * 100 if total else 0.0
+            lines.append(f"{stage:<24}{seconds * 1000:>12.2f}{share:>7.1f}%")
+        lines.extend(["", f"{'Slowest pages':<60}{'Total (ms)':>12}"])
+        for page in summary["slowest"]:
+            lines.append(f"{page['page']:<60}{page['total_seconds'] * 1000:>12.2f}")
+        return "\n".join(lines)
+
+    def write_json(self, path: pathlib.Path, slowest: int = 10) -> None:
+        with open(path, "w") as f:
+            json.dump(self.summary(slowest), f, indent=2)
+
+
+def profile_page(from_path: pathlib.Path, template_path: pathlib.Path, to_path: pathlib.Path, profiler: BuildProfiler) -> None:
+    # Runs the same steps as generate_page but materializes each intermediate result so every stage can be timed
+    page = str(from_path)
+    with profiler.stage(page, "read"):
+        with open(from_path, "r") as f:
+            markdown = f.read()
+    with profiler.stage(page, "extract_title"):
+        metadata, markdown = strip_front_matter(markdown)
+        title = extract_title(markdown) if not metadata.get("title") else str(metadata["title"])
+    with profiler.stage(page, "markdown_to_blocks"):
+        spans = list(block_spans(markdown))
+
+    inline_seconds = 0.0
+
+    def timed_text_to_textnodes(text: str) -> list[TextNode]:
+        nonlocal inline_seconds
+        start = time.perf_counter()
+        try:
+            return text_to_textnodes(text)
+        finally:
+            inline_seconds += time.perf_counter() - start
+
+    nodes = []
+    for block_start, block_end in spans:
+        with profiler.stage(page, "block_to_block_type"):
+            block_type = classify_block(markdown, block_start, block_end)
+        start = time.perf_counter()
+        nodes.append(block_to_parent_node(markdown[block_start:block_end], block_type, timed_text_to_textnodes))
+        profiler.add(page, "build_nodes", time.perf_counter() - start)
+    profiler.add(page, "text_to_textnodes", inline_seconds)
+    profiler.add(page, "build_nodes", -inline_seconds)
+
+    with profiler.stage(page, "to_html"):
+        content = ParentNode("div", nodes, None).to_html()
+    with profiler.stage(page, "template"):
+        # Passed as a writer so the rendered markup is not escaped as text
+        html = load_template(template_path).render({**template_context(metadata), "Title": title, "Content": lambda fp: fp.write(content)})
+    with profiler.stage(page, "write"):
+        with open(to_path, "w") as f:
+            f.write(html)
+    profiler.sample_memory()
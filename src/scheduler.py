@@ -0,0 +1,80 @@
+import bisect
+import concurrent.futures
+import pathlib
+import time
+from typing import Callable, Iterator
+
+
+# Rendering holds the source, the node tree and the output at once; measured peaks stay below
+# about ten times the markdown size plus a fixed per-page overhead
+PAGE_COST_FACTOR = 10
+PAGE_BASE_COST = 256 << 10
+
+
+def estimate_cost(size: int) -> int:
+    return size * PAGE_COST_FACTOR + PAGE_BASE_COST
+
+
+class MemoryScheduler:
+    # Admits pages while their estimated cost fits in the budget, always picking the largest page
+    # that fits so big pages start early instead of stretching the tail of the build. A page larger
+    # than the whole budget still runs, but only once nothing else is in flight.
+    def __init__(self, budget: int, slots: int, report_interval: float = 1.0) -> None:
+        if budget <= 0 or slots <= 0:
+            raise ValueError("Memory budget and slots must be positive")
+        self.budget = budget
+        self.slots = slots
+        self.report_interval = report_interval
+        self.in_flight_bytes = 0
+        self.peak_in_flight_bytes = 0
+        self.queued = 0
+        self.over_budget = 0
+
+    def __repr__(self) -> str:
+        return f"MemoryScheduler({self.budget=}, {self.slots=}, {self.in_flight_bytes=}, {self.queued=})"
+
+    def run(
+            self,
+            executor: concurrent.futures.Executor,
+            fn: Callable,
+            pages: list[tuple[pathlib.Path, pathlib.Path]],
+            *args,
+        ) -> Iterator:
+        queue = sorted((estimate_cost(from_path.stat().st_size), index) for index, (from_path, _) in enumerate(pages))
+        costs = [cost for cost, _ in queue]
+        running = {}
+        last_report = time.monotonic()
+        self.queued = len(queue)
+        while queue or running:
+            while queue and len(running) < self.slots:
+                position = bisect.bisect_right(costs, self.budget - self.in_flight_bytes) - 1
+                if position < 0:
+                    if running:
+                        break
+                    position = len(queue) - 1
+                    self.over_budget += 1
+                cost, index = queue.pop(position)
+                costs.pop(position)
+                running[executor.submit(fn, [pages[index]], *args)] = cost
+                self.in_flight_bytes += cost
+                self.peak_in_flight_bytes = max(self.peak_in_flight_bytes, self.in_flight_bytes)
+                self.queued = len(queue)
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                self.in_flight_bytes -= running.pop(future)
+                yield future.result()
+            if time.monotonic() - last_report >= self.report_interval:
+                print(self.format_status(len(running)))
+                last_report = time.monotonic()
+
+    def format_status(self, running: int) -> str:
+        return (
+            f"Scheduler: {self.queued} queued, {running} in flight, "
+            f"{self.in_flight_bytes / (1 << 20):.1f}/{self.budget / (1 << 20):.1f} MiB estimated"
+        )
+
+    def format_summary(self) -> str:
+        return (
+            f"Memory budget {self.budget / (1 << 20):.1f} MiB: peak estimated in flight "
+            f"{self.peak_in_flight_bytes / (1 << 20):.1f} MiB, {self.over_budget} page(s) ran alone over budget"
+        )
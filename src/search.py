@@ -0,0 +1,218 @@
+import collections
+import itertools
+import json
+import os
+import pathlib
+import re
+from typing import Iterable, Iterator, Optional
+
+from depgraph import page_url
+from manifest import hash_file
+from frontmatter import split_front_matter
+from markdown import page_title
+from textnode import BlockType, TextNode, block_to_parent_node, iter_blocks, text_to_textnodes
+
+
+SEARCH_INDEX_VERSION = 1
+TERM_PATTERN = re.compile(r"[^\W_]+")
+MIN_TERM_LENGTH = 2
+SHARD_PREFIX_BYTES = 2
+DOCUMENTS_FILE = "docs.json"
+
+
+def tokenize(text: str) -> list[str]:
+    return [term for term in TERM_PATTERN.findall(text.lower()) if len(term) >= MIN_TERM_LENGTH]
+
+
+class TermCounter:
+    # Collects the TextNodes the renderer produces for each block instead of re-parsing HTML, so
+    # block markers and URLs never become terms while link text and image alt text do. inline is
+    # passed to block_to_parent_node and blocks wraps the block stream, so a page is counted while
+    # it is rendered.
+    def __init__(self) -> None:
+        self.title: Optional[str] = None
+        self.counts = collections.Counter()
+
+    def __repr__(self) -> str:
+        return f"TermCounter({self.title=}, {len(self.counts)=})"
+
+    def inline(self, text: str) -> list[TextNode]:
+        nodes = text_to_textnodes(text)
+        for node in nodes:
+            self.counts.update(tokenize(node.text))
+        return nodes
+
+    def blocks(self, blocks: Iterable[tuple[BlockType, str]]) -> Iterator[tuple[BlockType, str]]:
+        for block_type, block in blocks:
+            if block_type == BlockType.CODE:
+                # Code is rendered literally, so its identifiers are indexed as they are written
+                self.counts.update(tokenize(block.strip()[3:-3]))
+            yield block_type, block
+
+    def terms(self) -> dict[str, int]:
+        return dict(self.counts)
+
+
+def page_terms(lines: Iterable[str]) -> tuple[str, dict[str, int]]:
+    metadata, lines = split_front_matter(lines)
+    blocks = iter_blocks(lines)
+    first = next(blocks, None)
+    title = page_title(metadata, first[1] if first else None)
+    counter = TermCounter()
+    for block_type, block in counter.blocks(itertools.chain([first], blocks) if first else ()):
+        if block_type != BlockType.CODE:
+            block_to_parent_node(block, block_type, counter.inline)
+    return title, counter.terms()
+
+
+def read_page_terms(path: pathlib.Path) -> tuple[str, dict[str, int]]:
+    with open(path, "r") as f:
+        return page_terms(f)
+
+
+def term_shard(term: str) -> str:
+    return term.encode()[:SHARD_PREFIX_BYTES].hex()
+
+
+def encode_varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data: bytes, position: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def encode_shard(postings: dict[str, list[tuple[int, int]]]) -> bytes:
+    # Per term: byte length, UTF-8 bytes, posting count, then (document id delta, term frequency) pairs
+    out = bytearray()
+    for term in sorted(postings):
+        encoded = term.encode()
+        encode_varint(len(encoded), out)
+        out += encoded
+        encode_varint(len(postings[term]), out)
+        previous = 0
+        for document, frequency in postings[term]:
+            encode_varint(document - previous, out)
+            encode_varint(frequency, out)
+            previous = document
+    return bytes(out)
+
+
+def decode_shard(data: bytes) -> dict[str, list[tuple[int, int]]]:
+    postings = {}
+    position = 0
+    while position < len(data):
+        length, position = decode_varint(data, position)
+        term = data[position:position + length].decode()
+        position += length
+        count, position = decode_varint(data, position)
+        document = 0
+        entries = []
+        for _ in range(count):
+            delta, position = decode_varint(data, position)
+            frequency, position = decode_varint(data, position)
+            document += delta
+            entries.append((document, frequency))
+        postings[term] = entries
+    return postings
+
+
+class SearchIndex:
+    # Term frequencies per page, kept between builds so that only changed pages are tokenized again
+    def __init__(self, path: pathlib.Path, pages: Optional[dict[str, dict]] = None) -> None:
+        self.path = path
+        self.pages = pages if pages is not None else {}
+
+    def __repr__(self) -> str:
+        return f"SearchIndex({self.path=}, {len(self.pages)=})"
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "SearchIndex":
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(path)
+        if data.get("version") != SEARCH_INDEX_VERSION:
+            return cls(path)
+        return cls(path, data.get("pages", {}))
+
+    def save(self) -> None:
+        os.makedirs(self.path.parent, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": SEARCH_INDEX_VERSION, "pages": self.pages}, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def update(
+            self,
+            pages: dict[str, tuple[pathlib.Path, str]],
+            rendered: Optional[dict[pathlib.Path, tuple[str, dict[str, int]]]] = None,
+        ) -> list[str]:
+        # pages maps content keys to their source path and output path relative to public/, rendered
+        # holds the title and terms counted while the build rendered a source so it is not read again
+        rendered = rendered if rendered is not None else {}
+        tokenized = []
+        for key, (path, output) in pages.items():
+            stat = path.stat()
+            entry = self.pages.get(key)
+            if entry is not None and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns and entry["output"] == output:
+                continue
+            source_hash = hash_file(path)
+            if entry is None or entry["hash"] != source_hash or entry["output"] != output:
+                if path in rendered:
+                    title, terms = rendered[path]
+                else:
+                    title, terms = read_page_terms(path)
+                entry = {"title": title, "terms": terms}
+                tokenized.append(key)
+            entry.update({"hash": source_hash, "size": stat.st_size, "mtime": stat.st_mtime_ns, "output": output})
+            self.pages[key] = entry
+        for key in self.pages.keys() - pages.keys():
+            del self.pages[key]
+        return tokenized
+
+    def write(self, directory: pathlib.Path) -> tuple[int, int]:
+        # Document ids follow the sorted page keys; shard files whose bytes did not change are left alone
+        keys = sorted(self.pages)
+        documents = [[page_url(self.pages[key]["output"]), self.pages[key]["title"]] for key in keys]
+        shards = collections.defaultdict(dict)
+        for document, key in enumerate(keys):
+            for term, frequency in self.pages[key]["terms"].items():
+                shards[term_shard(term)].setdefault(term, []).append((document, frequency))
+        files = {DOCUMENTS_FILE: json.dumps(documents, separators=(",", ":")).encode()}
+        for shard, postings in shards.items():
+            files[f"{shard}.bin"] = encode_shard(postings)
+
+        os.makedirs(directory, exist_ok=True)
+        written = 0
+        for name, data in files.items():
+            path = directory / name
+            try:
+                with open(path, "rb") as f:
+                    if f.read() == data:
+                        continue
+            except FileNotFoundError:
+                pass
+            tmp_path = directory / f".{name}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            written += 1
+        removed = 0
+        for path in directory.glob("*.bin"):
+            if path.name not in files:
+                path.unlink()
+                removed += 1
+        return written, removed
@@ -0,0 +1,95 @@
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import pathlib
+import shutil
+
+
+SHARD_MANIFEST = "shard.json"
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard {value!r}, expected i/N such as 1/4")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"invalid shard {value!r}, i must be between 1 and N")
+    return index, count
+
+
+def partition_pages(
+        pages: list[tuple[pathlib.Path, pathlib.Path]],
+        dir_path_content: pathlib.Path,
+        count: int,
+    ) -> list[list[tuple[pathlib.Path, pathlib.Path]]]:
+    # Largest pages first onto the least loaded shard keeps the shards close in total size, and the
+    # path hash breaks ties so that every machine computes the same partition from the same content
+    weighted = []
+    for from_path, to_path in pages:
+        key = from_path.relative_to(dir_path_content).as_posix()
+        weighted.append((-from_path.stat().st_size, hashlib.sha256(key.encode()).hexdigest(), key, from_path, to_path))
+    weighted.sort(key=lambda page: page[:3])
+    loads = [(0, shard) for shard in range(count)]
+    shards = [[] for _ in range(count)]
+    for negative_size, _, _, from_path, to_path in weighted:
+        load, shard = heapq.heappop(loads)
+        shards[shard].append((from_path, to_path))
+        heapq.heappush(loads, (load - negative_size, shard))
+    return shards
+
+
+def shard_dir(shard_root: pathlib.Path, index: int, count: int) -> pathlib.Path:
+    return shard_root / f"{index}-of-{count}"
+
+
+def write_shard_manifest(directory: pathlib.Path, index: int, count: int, outputs: list[str]) -> None:
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = directory / f".{SHARD_MANIFEST}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"shard": index, "shards": count, "pages": sorted(outputs)}, f, indent=1)
+    os.replace(tmp_path, directory / SHARD_MANIFEST)
+
+
+def verify_shards(shard_root: pathlib.Path, count: int, expected: set[str]) -> dict[str, int]:
+    owners = {}
+    errors = []
+    for index in range(1, count + 1):
+        directory = shard_dir(shard_root, index, count)
+        try:
+            with open(directory / SHARD_MANIFEST, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            errors.append(f"shard {index}/{count} has not been built")
+            continue
+        for output in data["pages"]:
+            if output in owners:
+                errors.append(f"{output} was rendered by shards {owners[output]} and {index}")
+            elif not (directory / output).exists():
+                errors.append(f"{output} is listed by shard {index} but missing from {directory}")
+            owners.setdefault(output, index)
+    errors.extend(f"{output} was not rendered by any shard" for output in sorted(expected - owners.keys()))
+    errors.extend(f"{output} has no source page" for output in sorted(owners.keys() - expected))
+    if errors:
+        raise ValueError("Shard outputs do not cover the site:\n" + "\n".join(errors))
+    return owners
+
+
+def find_shard_count(shard_root: pathlib.Path) -> int:
+    counts = {int(path.parent.name.rpartition("-of-")[2]) for path in shard_root.glob(f"*-of-*/{SHARD_MANIFEST}")}
+    if not counts:
+        raise ValueError(f"No shard outputs found in {shard_root}")
+    if len(counts) > 1:
+        raise ValueError(f"Shard outputs in {shard_root} come from different shard counts: {sorted(counts)}")
+    return counts.pop()
+
+
+def merge_shards(shard_root: pathlib.Path, count: int, owners: dict[str, int], dest: pathlib.Path) -> None:
+    for output, index in owners.items():
+        target = dest / output
+        os.makedirs(target.parent, exist_ok=True)
+        shutil.move(shard_dir(shard_root, index, count) / output, target)
+    for index in range(1, count + 1):
+        shutil.rmtree(shard_dir(shard_root, index, count))
@@ -0,0 +1,100 @@
+import os
+import pathlib
+import shutil
+
+from manifest import hash_file
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Linux ioctl that shares extents between files on copy-on-write filesystems (btrfs, xfs)
+FICLONE = 0x40049409
+
+
+def sync_tree(
+        src: pathlib.Path,
+        dest: pathlib.Path,
+        previous: dict[str, dict],
+        compare: str = "mtime",
+        hardlink: bool = False,
+    ) -> tuple[dict[str, dict], list[pathlib.Path], list[pathlib.Path]]:
+    if compare not in {"mtime", "hash"}:
+        raise ValueError(f"Unknown compare mode {compare!r}")
+    src = pathlib.Path(src)
+    dest = pathlib.Path(dest)
+    state = {}
+    copied = []
+    for dirpath, _, filenames in os.walk(src):
+        for filename in filenames:
+            src_path = pathlib.Path(dirpath) / filename
+            rel = src_path.relative_to(src).as_posix()
+            dest_path = dest / rel
+            stat = src_path.stat()
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+            if compare == "hash":
+                entry["hash"] = _source_hash(previous.get(rel), src_path, entry)
+            if not _is_current(previous.get(rel), entry, dest_path):
+                clone_file(src_path, dest_path, hardlink)
+                copied.append(dest_path)
+            state[rel] = entry
+
+    removed = []
+    for rel in previous.keys() - state.keys():
+        dest_path = dest / rel
+        if prune_file(dest, dest_path):
+            removed.append(dest_path)
+    return state, copied, removed
+
+
+def _source_hash(previous: dict, src_path: pathlib.Path, entry: dict) -> str:
+    if previous and previous.get("hash") and previous["size"] == entry["size"] and previous["mtime"] == entry["mtime"]:
+        return previous["hash"]
+    return hash_file(src_path)
+
+
+def _is_current(previous: dict, entry: dict, dest_path: pathlib.Path) -> bool:
+    try:
+        stat = dest_path.stat()
+    except FileNotFoundError:
+        return False
+    if stat.st_size != entry["size"]:
+        return False
+    if "hash" in entry:
+        return previous is not None and previous.get("hash") == entry["hash"]
+    return stat.st_mtime_ns == entry["mtime"]
+
+
+def clone_file(src_path: pathlib.Path, dest_path: pathlib.Path, hardlink: bool = False) -> None:
+    os.makedirs(dest_path.parent, exist_ok=True)
+    # Never write through an existing file, it may be a hardlink to the source
+    if dest_path.exists() or dest_path.is_symlink():
+        dest_path.unlink()
+    if hardlink:
+        try:
+            os.link(src_path, dest_path)
+            return
+        except OSError:
+            pass
+    if fcntl is not None:
+        try:
+            with open(src_path, "rb") as src_file, open(dest_path, "wb") as dest_file:
+                fcntl.ioctl(dest_file.fileno(), FICLONE, src_file.fileno())
+            shutil.copystat(src_path, dest_path)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src_path, dest_path)
+
+
+def prune_file(root: pathlib.Path, path: pathlib.Path) -> bool:
+    if not path.exists():
+        return False
+    path.unlink()
+    parent = path.parent
+    while parent != root and parent.is_dir() and not any(parent.iterdir()):
+        parent.rmdir()
+        parent = parent.parent
+    return True
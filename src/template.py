@@ -0,0 +1,85 @@
+import io
+import os
+import pathlib
+import re
+from typing import TextIO, Union
+
+from htmlnode import HTMLNode, escape_text
+
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*([A-Za-z_][\w.-]*)\s*\}\}")
+
+
+class Placeholder:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __eq__(self, other: "Placeholder") -> bool:
+        return isinstance(other, Placeholder) and self.name == other.name
+
+    def __repr__(self) -> str:
+        return f"Placeholder({self.name=})"
+
+
+class Template:
+    def __init__(self, segments: list[Union[str, Placeholder]]) -> None:
+        self.segments = segments
+
+    def __repr__(self) -> str:
+        return f"Template({self.segments=})"
+
+    @classmethod
+    def parse(cls, source: str) -> "Template":
+        segments = []
+        cursor = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            if cursor < match.start():
+                segments.append(source[cursor:match.start()])
+            segments.append(Placeholder(match.group(1)))
+            cursor = match.end()
+        if cursor < len(source):
+            segments.append(source[cursor:])
+        return cls(segments)
+
+    @property
+    def names(self) -> set[str]:
+        return {segment.name for segment in self.segments if isinstance(segment, Placeholder)}
+
+    def write(self, fp: TextIO, context: dict[str, object]) -> None:
+        # HTMLNode values are streamed into fp, callables are called with fp to write themselves,
+        # anything else is written as escaped text; missing names render empty
+        for segment in self.segments:
+            if isinstance(segment, str):
+                fp.write(segment)
+                continue
+            value = context.get(segment.name)
+            if value is None:
+                continue
+            if isinstance(value, HTMLNode):
+                value.write_html(fp)
+            elif callable(value):
+                value(fp)
+            else:
+                fp.write(escape_text(str(value)))
+
+    def render(self, context: dict[str, object]) -> str:
+        buffer = io.StringIO()
+        self.write(buffer, context)
+        return buffer.getvalue()
+
+
+_TEMPLATE_CACHE: dict[pathlib.Path, tuple[tuple[int, int], Template]] = {}
+
+
+def load_template(path: pathlib.Path) -> Template:
+    # Parsed templates are reused until the file's mtime or size changes
+    path = pathlib.Path(path)
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _TEMPLATE_CACHE.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with open(path, "r") as f:
+        template = Template.parse(f.read())
+    _TEMPLATE_CACHE[path] = (key, template)
+    return template
@@ -0,0 +1,24 @@
+import unittest
+
+from bench import compare_results, format_results, measure
+
+
+class TestBench(unittest.TestCase):
+    def test_measure(self):
+        calls = []
+        self.assertGreaterEqual(measure(lambda: calls.append(1), 3), 0)
+        self.assertEqual(len(calls), 3)
+
+    def test_compare_results(self):
+        baseline = {"fast": 1.0, "slow": 1.0, "new": 0.0}
+        results = {"fast": 1.05, "slow": 1.5, "new": 1.0, "unknown": 2.0}
+        self.assertEqual(compare_results(baseline, results, 0.1), ["slow"])
+
+    def test_format_results(self):
+        report = format_results({"bench": 0.002}, {"bench": 0.001})
+        self.assertIn("bench", report)
+        self.assertIn("+100.0%", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import pathlib
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from cache import RenderCache, copy_entry_body, read_entry_title
+from main import generate_page, parse_size
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        self.cache = RenderCache(self.root / "cache", 1 << 20)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get("ab" * 32))
+        self.cache.put("ab" * 32, "Title", lambda fp: fp.write("<div>body</div>"))
+        entry = self.cache.get("ab" * 32)
+        self.assertEqual(read_entry_title(entry), "Title")
+        buffer = StringIO()
+        copy_entry_body(entry, buffer)
+        self.assertEqual(buffer.getvalue(), "<div>body</div>")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_title_with_newline(self):
+        self.cache.put("cd" * 32, "Two\nlines", lambda fp: fp.write("body"))
+        self.assertEqual(read_entry_title(self.cache.get("cd" * 32)), "Two\nlines")
+
+    def test_failed_put_leaves_no_entry(self):
+        def fail(fp):
+            fp.write("partial")
+            raise ValueError("Invalid code block")
+        self.assertRaises(ValueError, self.cache.put, "ef" * 32, "Title", fail)
+        self.assertIsNone(self.cache.get("ef" * 32))
+        self.assertEqual(list((self.root / "cache").rglob("*")), [(self.root / "cache" / "ef")])
+
+    def test_key_depends_on_content(self):
+        (self.root / "a.md").write_text("# A")
+        (self.root / "b.md").write_text("# A")
+        (self.root / "c.md").write_text("# C")
+        self.assertEqual(self.cache.key(self.root / "a.md"), self.cache.key(self.root / "b.md"))
+        self.assertNotEqual(self.cache.key(self.root / "a.md"), self.cache.key(self.root / "c.md"))
+
+    def test_prune_evicts_least_recently_used(self):
+        cache = RenderCache(self.root / "cache", 250)
+        for i, key in enumerate(("aa" * 32, "bb" * 32, "cc" * 32)):
+            path = cache.put(key, "t", lambda fp: fp.write("x" * 100))
+            os.utime(path, ns=(i * 10**9, i * 10**9))
+        os.utime(cache.entry_path("aa" * 32), ns=(10 * 10**9, 10 * 10**9))
+        self.assertEqual(cache.prune(), 1)
+        self.assertFalse(cache.entry_path("bb" * 32).exists())
+        self.assertTrue(cache.entry_path("aa" * 32).exists())
+        self.assertTrue(cache.entry_path("cc" * 32).exists())
+
+
+class TestCachedGeneratePage(unittest.TestCase):
+    def test_template_change_reuses_cached_body(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = pathlib.Path(tmp)
+            cache = RenderCache(root / "cache", 1 << 20)
+            (root / "page.md").write_text("# Title\n\nBody")
+            (root / "template.html").write_text("<h1>{{ Title }}</h1>{{ Content }}")
+            with redirect_stdout(StringIO()):
+                generate_page(root / "page.md", root / "template.html", root / "page.html", cache=cache)
+                (root / "template.html").write_text("<main>{{ Content }}</main><p>{{ Title }}</p>")
+                generate_page(root / "page.md", root / "template.html", root / "page.html", cache=cache)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            self.assertEqual(
+                (root / "page.html").read_text(),
+                "<main><div><h1>Title</h1><p>Body</p></div></main><p>Title</p>"
+            )
+
+
+class TestParseSize(unittest.TestCase):
+    def test_parse_size(self):
+        self.assertEqual(parse_size("1024"), 1024)
+        self.assertEqual(parse_size("512M"), 512 << 20)
+        self.assertEqual(parse_size("1.5kb"), 1536)
+        self.assertEqual(parse_size("2G"), 2 << 30)
+
+    def test_parse_size_invalid(self):
+        self.assertRaises(Exception, parse_size, "lots")
+
+
+if __name__ == "__main__":
+    unittest.main()
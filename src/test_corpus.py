@@ -0,0 +1,47 @@
+import pathlib
+import tempfile
+import unittest
+
+from corpus import CorpusOptions, generate_corpus_pages, write_corpus
+from markdown import extract_title, markdown_to_html_node
+
+
+class TestCorpus(unittest.TestCase):
+    def test_deterministic(self):
+        options = CorpusOptions(pages=5, seed=42)
+        self.assertEqual(generate_corpus_pages(options), generate_corpus_pages(options))
+
+    def test_seed_changes_output(self):
+        self.assertNotEqual(
+            generate_corpus_pages(CorpusOptions(pages=5, seed=1)),
+            generate_corpus_pages(CorpusOptions(pages=5, seed=2)),
+        )
+
+    def test_pages_render(self):
+        options = CorpusOptions(pages=20, link_density=0.2, image_density=0.1, list_ratio=0.3, code_ratio=0.3)
+        for markdown in generate_corpus_pages(options).values():
+            extract_title(markdown)
+            markdown_to_html_node(markdown).to_html()
+
+    def test_density(self):
+        markdown = "".join(generate_corpus_pages(CorpusOptions(pages=3, link_density=0.0, image_density=0.0)).values())
+        self.assertNotIn("](", markdown)
+        markdown = "".join(generate_corpus_pages(CorpusOptions(pages=3, link_density=0.5)).values())
+        self.assertIn("](/", markdown)
+
+    def test_nesting_depth(self):
+        pages = generate_corpus_pages(CorpusOptions(pages=30, nesting_depth=3))
+        self.assertEqual(len(pages), 30)
+        self.assertTrue(all(path.count("/") <= 5 for path in pages))
+        flat = generate_corpus_pages(CorpusOptions(pages=5, nesting_depth=0))
+        self.assertEqual(set(flat), {f"page{i}/index.md" for i in range(5)})
+
+    def test_write_corpus(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_corpus(pathlib.Path(tmp), CorpusOptions(pages=4))
+            self.assertEqual(len(paths), 4)
+            self.assertTrue(all(path.read_text().startswith("# ") for path in paths))
+
+
+if __name__ == "__main__":
+    unittest.main()
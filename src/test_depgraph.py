@@ -0,0 +1,140 @@
+import functools
+import pathlib
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+import main
+from cache import RenderCache
+from depgraph import DependencyGraph, page_url, reference_dependencies, site_path
+from main import generate_pages_incremental
+from textnode import TextType
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_page_url(self):
+        self.assertEqual(page_url("index.html"), "/")
+        self.assertEqual(page_url("blog/index.html"), "/blog")
+        self.assertEqual(page_url("blog/post.html"), "/blog/post")
+
+    def test_site_path(self):
+        self.assertEqual(site_path("/majesty/", "index.html"), "/majesty")
+        self.assertEqual(site_path("../index.html#top", "blog/post.html"), "/")
+        self.assertEqual(site_path("other.md", "blog/post.html"), "/blog/other")
+        self.assertEqual(site_path("img/a.png", "blog/index.html"), "/blog/img/a.png")
+        self.assertIsNone(site_path("https://example.com/a", "index.html"))
+        self.assertIsNone(site_path("#section", "index.html"))
+
+    def test_reference_dependencies(self):
+        references = [
+            (TextType.LINK, "/a", 1),
+            (TextType.LINK, "https://b.org", 1),
+            (TextType.IMAGE, "/c.png", 2),
+            (TextType.LINK, "/a/", 3),
+        ]
+        links, images = reference_dependencies(references, "index.html")
+        self.assertEqual(links, ["/a"])
+        self.assertEqual(images, ["/c.png"])
+
+    def test_save_load_and_dependents(self):
+        graph = DependencyGraph(self.root / "depgraph.json")
+        graph.record("index.md", "index.html", "template.html", ["/blog"], ["/logo.png"])
+        graph.record("blog/index.md", "blog/index.html", "blog.html", ["/"], [], [(TextType.LINK, "/", 3)])
+        graph.assets = ["logo.png"]
+        graph.save()
+        graph = DependencyGraph.load(self.root / "depgraph.json")
+        self.assertEqual(graph.references("blog/index.md"), [(TextType.LINK, "/", 3)])
+        self.assertIsNone(graph.references("index.md"))
+        self.assertEqual(graph.dependents("/blog"), {"index.md"})
+        self.assertEqual(graph.dependents("/logo.png"), {"index.md"})
+        self.assertEqual(graph.template_dependents("blog.html"), {"blog/index.md"})
+        graph.remove("index.md")
+        self.assertEqual(graph.dependents("/blog"), set())
+        self.assertEqual(graph.find("content/blog/index.md"), "blog/index.md")
+        self.assertEqual(graph.find("/blog"), "blog/index.md")
+        self.assertIsNone(graph.find("missing.md"))
+
+    def test_explain(self):
+        graph = DependencyGraph(self.root / "depgraph.json", assets=["logo.png"])
+        graph.record("index.md", "index.html", "template.html", ["/blog", "/gone"], ["/logo.png"])
+        graph.record("blog/index.md", "blog/index.html", "template.html", ["/"], [])
+        self.assertEqual(
+            graph.explain("index.md"),
+            "index.md -> index.html\n"
+            "  template: template.html\n"
+            "  links: /blog (page blog/index.md)\n"
+            "  links: /gone (not found)\n"
+            "  images: /logo.png (asset logo.png)\n"
+            "  linked from: blog/index.md",
+        )
+
+
+class TestDependencyInvalidation(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        (self.root / "content").mkdir()
+        (self.root / "content" / "index.md").write_text("# Home\n\n[new](/new) `[code](/code)`")
+        (self.root / "content" / "about.md").write_text("# About")
+        (self.root / "template.html").write_text("{{ Content }}")
+        self.build()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self) -> list[str]:
+        with redirect_stdout(StringIO()):
+            generated = generate_pages_incremental(self.root / "content", self.root / "template.html", self.root / "public", self.root / "manifest.json")
+        return sorted(path.name for path in generated)
+
+    def test_graph_is_persisted(self):
+        # Links come from the rendered TextNodes, so the one in a code span is not a dependency
+        graph = DependencyGraph.load(self.root / "depgraph.json")
+        self.assertEqual(graph.pages["index.md"]["links"], ["/new"])
+        self.assertEqual(graph.pages["about.md"]["template"], (self.root / "template.html").as_posix())
+
+    def test_unchanged_build(self):
+        self.assertEqual(self.build(), [])
+
+    def test_added_page_rebuilds_linking_pages(self):
+        (self.root / "content" / "new.md").write_text("# New")
+        self.assertEqual(self.build(), ["index.html", "new.html"])
+        (self.root / "content" / "new.md").unlink()
+        self.assertEqual(self.build(), ["index.html"])
+
+    def test_template_change_rebuilds_its_dependents(self):
+        (self.root / "template.html").write_text("<main>{{ Content }}</main>")
+        self.assertEqual(self.build(), ["about.html", "index.html"])
+
+    def test_template_change_keeps_recorded_links(self):
+        cache = RenderCache(self.root / "cache", 1 << 20)
+        build = functools.partial(
+            generate_pages_incremental, self.root / "content", self.root / "template.html", self.root / "public", self.root / "manifest.json", cache=cache
+        )
+        (self.root / "content" / "about.md").write_text("# About\n\n[home](/)")
+        with redirect_stdout(StringIO()):
+            build()
+            (self.root / "template.html").write_text("<main>{{ Content }}</main>")
+            build()
+            (self.root / "template.html").write_text("{{ Content }}")
+            # Every page is a cache hit and its source is unchanged, so nothing is parsed again
+            with mock.patch.object(main, "collect_references") as collect:
+                self.assertEqual(len(build()), 2)
+                collect.assert_not_called()
+        graph = DependencyGraph.load(self.root / "depgraph.json")
+        self.assertEqual(graph.pages["about.md"]["links"], ["/"])
+        self.assertEqual(graph.references("about.md"), [(TextType.LINK, "/", 3)])
+        self.assertEqual(graph.pages["about.md"]["template"], (self.root / "template.html").as_posix())
+
+
+if __name__ == "__main__":
+    unittest.main()
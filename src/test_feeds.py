@@ -0,0 +1,120 @@
+import pathlib
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+import feeds
+from feeds import Feeds, HashWriter, rss_date, tag_slug
+from main import build_feeds
+from metadata import SiteMetadata
+from template import Template
+
+
+class TestFeedHelpers(unittest.TestCase):
+    def test_tag_slug(self):
+        self.assertEqual(tag_slug("Middle Earth"), "middle-earth")
+        self.assertEqual(tag_slug("C++"), "c")
+        self.assertEqual(tag_slug("++"), "tag")
+
+    def test_rss_date(self):
+        self.assertEqual(rss_date("2024-05-01"), "Wed, 01 May 2024 00:00:00 +0000")
+        self.assertIsNone(rss_date("someday"))
+
+    def test_hash_writer(self):
+        first = HashWriter()
+        first.write("<a>")
+        first.write("b</a>")
+        second = HashWriter()
+        second.write("<a>b</a>")
+        self.assertEqual(first.hexdigest(), second.hexdigest())
+        self.assertNotEqual(HashWriter("salt").hexdigest(), HashWriter().hexdigest())
+
+
+class TestFeeds(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        self.content = self.root / "content"
+        self.public = self.root / "public"
+        (self.content / "blog").mkdir(parents=True)
+        (self.content / "index.md").write_text("---\ndescription: Notes & essays\n---\n# Home\n")
+        (self.content / "blog" / "a.md").write_text("---\ndate: 2024-01-01\ntags: [Tolkien, news]\n---\n# A <post>\n")
+        (self.content / "blog" / "b.md").write_text("---\ndate: 2024-02-01\ntags: [tolkien]\n---\n# B\n")
+        self.template = Template.parse("<h1>{{ Title }}</h1>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def update(self, feeds_state, salt=""):
+        site = SiteMetadata(self.content, self.root / ".build" / "metadata.json")
+        written, removed = feeds_state.update(site, self.template, self.public, "https://example.com/", salt)
+        site.save()
+        return written, removed
+
+    def test_outputs(self):
+        written, removed = self.update(Feeds(self.root / "feeds.json"))
+        self.assertEqual(sorted(written), ["rss.xml", "sitemap.xml", "tags/index.html", "tags/news.html", "tags/tolkien.html"])
+        self.assertEqual(removed, [])
+        sitemap = (self.public / "sitemap.xml").read_text()
+        self.assertIn("<url><loc>https://example.com/blog/a</loc><lastmod>2024-01-01</lastmod></url>", sitemap)
+        self.assertIn("<url><loc>https://example.com/</loc></url>", sitemap)
+        rss = (self.public / "rss.xml").read_text()
+        self.assertIn("<title>Home</title>", rss)
+        self.assertIn("<description>Notes &amp; essays</description>", rss)
+        self.assertLess(rss.index("<title>B</title>"), rss.index("<title>A &lt;post&gt;</title>"))
+        self.assertNotIn("<link>https://example.com/</link><guid>", rss)
+        self.assertEqual(
+            (self.public / "tags" / "tolkien.html").read_text(),
+            '<h1>Tagged tolkien</h1><ul><li><a href="/blog/b">B</a> <time>2024-02-01</time></li>'
+            '<li><a href="/blog/a">A &lt;post&gt;</a> <time>2024-01-01</time></li></ul>',
+        )
+        self.assertEqual(
+            (self.public / "tags" / "index.html").read_text(),
+            '<h1>Tags</h1><ul><li><a href="/tags/news">news</a> (1)</li><li><a href="/tags/tolkien">tolkien</a> (2)</li></ul>',
+        )
+
+    def test_incremental_update(self):
+        state = Feeds(self.root / "feeds.json")
+        self.update(state)
+        state.save()
+        state = Feeds.load(self.root / "feeds.json")
+        self.assertEqual(self.update(state), ([], []))
+
+        (self.content / "blog" / "a.md").write_text("---\ndate: 2024-01-01\ntags: [tolkien]\n---\n# A <post>\n")
+        written, removed = self.update(state)
+        self.assertEqual(sorted(written), ["rss.xml", "tags/index.html"])
+        self.assertEqual(removed, ["tags/news.html"])
+        self.assertFalse((self.public / "tags" / "news.html").exists())
+
+        written, _ = self.update(state, salt="fingerprints changed")
+        self.assertEqual(sorted(written), ["tags/index.html", "tags/tolkien.html"])
+        (self.public / "rss.xml").unlink()
+        self.assertEqual(self.update(state, salt="fingerprints changed"), (["rss.xml"], []))
+
+    def test_sitemap_is_chunked(self):
+        for index in range(3):
+            (self.content / f"page{index}.md").write_text(f"# Page {index}\n")
+        with mock.patch.object(feeds, "SITEMAP_URL_LIMIT", 2):
+            written, _ = self.update(Feeds(self.root / "feeds.json"))
+        self.assertIn("sitemap-3.xml", written)
+        self.assertNotIn("sitemap-4.xml", written)
+        index = (self.public / "sitemap.xml").read_text()
+        self.assertIn("<sitemap><loc>https://example.com/sitemap-1.xml</loc></sitemap>", index)
+        self.assertEqual((self.public / "sitemap-1.xml").read_text().count("<url>"), 2)
+
+    def test_build_feeds(self):
+        template = self.root / "template.html"
+        template.write_text("{{ Title }}{{ Content }}")
+        with redirect_stdout(StringIO()) as output:
+            written = build_feeds(self.content, template, self.public, self.root / "metadata.json", self.root / "feeds.json", "https://example.com")
+        self.assertEqual(len(written), 5)
+        self.assertIn("Feeds: 3 pages scanned, 5 files written, 0 removed", output.getvalue())
+        with redirect_stdout(StringIO()) as output:
+            self.assertEqual(build_feeds(self.content, template, self.public, self.root / "metadata.json", self.root / "feeds.json", "https://example.com"), [])
+        self.assertIn("Feeds: 0 pages scanned, 0 files written, 0 removed", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
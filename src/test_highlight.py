@@ -0,0 +1,95 @@
+import unittest
+
+from highlight import (
+    HighlightCache,
+    HighlightedCode,
+    disable_highlighting,
+    enable_highlighting,
+    find_language,
+    format_highlight_stats,
+    highlight_code,
+    highlight_stats,
+)
+from manifest import generator_version
+from textnode import BlockType, block_to_parent_node
+
+
+class TestHighlightCode(unittest.TestCase):
+    def test_python(self):
+        self.assertEqual(
+            highlight_code('def f(x):  # <b>\n    return "*a*" + 0x1F', "python"),
+            '<span class="hl-keyword">def</span> f(x):  <span class="hl-comment"># &lt;b&gt;</span>\n'
+            '    <span class="hl-keyword">return</span> <span class="hl-string">"*a*"</span> + <span class="hl-number">0x1F</span>',
+        )
+
+    def test_keywords_need_word_boundaries(self):
+        self.assertEqual(highlight_code("define = format", "python"), "define = format")
+        self.assertEqual(highlight_code("const x = `${a}`;", "javascript"), '<span class="hl-keyword">const</span> x = <span class="hl-string">`${a}`</span>;')
+
+    def test_bash_and_json(self):
+        self.assertEqual(
+            highlight_code('echo "$HOME" $# # done', "bash"),
+            'echo <span class="hl-string">"$HOME"</span> <span class="hl-variable">$#</span> <span class="hl-comment"># done</span>',
+        )
+        self.assertEqual(
+            highlight_code('{"a": [1, true]}', "json"),
+            '{<span class="hl-key">"a"</span>: [<span class="hl-number">1</span>, <span class="hl-keyword">true</span>]}',
+        )
+
+    def test_unknown_language_is_escaped(self):
+        self.assertEqual(highlight_code("a < b", "cobol"), "a &lt; b")
+
+    def test_find_language(self):
+        self.assertEqual(find_language("py"), "python")
+        self.assertEqual(find_language("JS title=x"), "javascript")
+        self.assertIsNone(find_language("  "))
+
+
+class TestHighlightCache(unittest.TestCase):
+    def test_hits_and_eviction(self):
+        cache = HighlightCache(2)
+        first = cache.highlight("x = 1", "python")
+        self.assertIs(cache.highlight("x = 1", "python"), first)
+        cache.highlight("x = 1", "javascript")
+        cache.highlight("y = 2", "python")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 3, "size": 2, "maxsize": 2})
+        cache.highlight("x = 1", "python")
+        self.assertEqual(cache.misses, 4)
+        cache.merge(3, 1)
+        self.assertEqual(format_highlight_stats(cache.stats()), "Highlight cache: 4 hits, 5 misses (44.4% hit rate), capacity 2")
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, HighlightCache, 0)
+
+
+class TestCodeBlocks(unittest.TestCase):
+    def tearDown(self):
+        disable_highlighting()
+
+    def test_code_is_literal(self):
+        node = block_to_parent_node("```\n*not* `inline` <b>\n```", BlockType.CODE)
+        self.assertEqual(node.to_html(), "<pre><code>\n*not* `inline` &lt;b&gt;\n</code></pre>")
+
+    def test_highlighted_block(self):
+        unchanged = generator_version()
+        enable_highlighting(8)
+        node = block_to_parent_node("```python\nx = None\n```", BlockType.CODE)
+        self.assertIsInstance(node.children[0], HighlightedCode)
+        self.assertEqual(node.to_html(), '<pre><code class="language-python">x = <span class="hl-keyword">None</span>\n</code></pre>')
+        self.assertEqual("".join(node.iter_html()), node.to_html())
+        block_to_parent_node("```py\nx = None\n```", BlockType.CODE)
+        self.assertEqual(highlight_stats()["hits"], 1)
+        self.assertNotEqual(generator_version(), unchanged)
+
+    def test_highlighted_without_known_language(self):
+        enable_highlighting(8)
+        # Untagged fences render exactly as they do without highlighting
+        self.assertEqual(block_to_parent_node("```\n*a*\n```", BlockType.CODE).to_html(), "<pre><code>\n*a*\n</code></pre>")
+        self.assertEqual(
+            block_to_parent_node("```text\na < b\n```", BlockType.CODE).to_html(),
+            '<pre><code class="language-text">a &lt; b\n</code></pre>',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, close_tag, escape_attribute, escape_text, open_tag
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -20,9 +21,31 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode("p", "This is a paragraph", [], None)
         self.assertEqual(node.props_to_html(), "")
 
+    def test_props_to_html_escapes_values(self):
+        node = HTMLNode("a", "link", None, {"href": '/search?q=a&b="c"', "title": "<x>"})
+        self.assertEqual(node.props_to_html(), ' href="/search?q=a&amp;b=&quot;c&quot;" title="&lt;x&gt;"')
+
+    def test_escape_text(self):
+        self.assertEqual(escape_text("plain 'text'"), "plain 'text'")
+        self.assertEqual(escape_text('a < b && "c" > d'), 'a &lt; b &amp;&amp; "c" &gt; d')
+        self.assertEqual(escape_attribute('"&'), "&quot;&amp;")
+
+    def test_tag_fragments_are_cached(self):
+        self.assertEqual(open_tag("p"), "<p>")
+        self.assertIs(open_tag("p"), open_tag("p"))
+        self.assertIs(close_tag("p"), close_tag("p"))
+
     def test_to_html(self):
         self.assertRaises(NotImplementedError, HTMLNode("p", "This is a paragraph", [], {"class": "paragraph"}).to_html)
 
+    def test_write_html(self):
+        self.assertRaises(NotImplementedError, HTMLNode("p", "This is a paragraph").write_html, io.StringIO())
+
+    def test_slots(self):
+        node = HTMLNode("p")
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertRaises(AttributeError, setattr, node, "extra", 1)
+
 
 if __name__ == "__main__":
     unittest.main()
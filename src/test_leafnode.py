@@ -27,6 +27,19 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode(None, "This is a paragraph", {"class": "paragraph"})
         self.assertEqual(node.to_html(), 'This is a paragraph')
 
+    def test_to_html_escapes_value(self):
+        self.assertEqual(LeafNode("code", "if a < b && c:").to_html(), "<code>if a &lt; b &amp;&amp; c:</code>")
+        self.assertEqual(LeafNode(None, "<script>").to_html(), "&lt;script&gt;")
+        self.assertEqual(
+            LeafNode("img", "", {"src": "/a.png", "alt": 'say "hi"'}).to_html(),
+            '<img src="/a.png" alt="say &quot;hi&quot;"></img>',
+        )
+
+    def test_slots(self):
+        node = LeafNode("p", "This is a paragraph")
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertRaises(AttributeError, setattr, node, "extra", 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,111 @@
+import pathlib
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+import main
+from linkcheck import ReferenceCollector, check_references, collect_references, format_dead_links, site_targets
+from main import check_links, find_pages, generate_pages, generate_pages_incremental
+from pipeline import render_page
+from search import TermCounter
+from textnode import TextType
+
+
+class TestLinkCheck(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_collect_references_with_lines(self):
+        markdown = "# Title\n\nSee [a](/a) and\n[b](/b)\n\n> ![c](/c.png)\n\n- `[not](/link)`\n- [a again](/a)"
+        self.assertEqual(
+            collect_references(markdown),
+            [
+                (TextType.LINK, "/a", 3),
+                (TextType.LINK, "/b", 4),
+                (TextType.IMAGE, "/c.png", 6),
+                (TextType.LINK, "/a", 9),
+            ],
+        )
+
+    def test_collector_matches_collect_references(self):
+        (self.root / "template.html").write_text("{{ Content }}")
+        markdowns = [
+            "# Title\n\nSee [a](/a) and\n[b](/b)\n\n> ![c](/c.png)\n\n- `[not](/link)`\n- [a again](/a)",
+            "---\ntitle: Front\n---\n\n\n  [a](/a)  \n  \n\n```\n[b](/b)\n\n[c](/c)\n```\n\n1. ![d](/d.png) [d](/d.png)",
+            "---\n---\n# Title [a](/a)\n\n\n\ntext [b](/b) ![b](/b) [b](/b)",
+        ]
+        for markdown in markdowns:
+            for counter in (None, TermCounter()):
+                collector = ReferenceCollector()
+                render_page(markdown, self.root / "template.html", counter, collector)
+                self.assertEqual(collector.references, collect_references(markdown), markdown)
+
+    def test_check_references(self):
+        (self.root / "images").mkdir()
+        (self.root / "images" / "logo.png").write_bytes(b"png")
+        targets = site_targets(["index.html", "blog/index.html", "blog/post.html"], self.root)
+        references = [
+            (TextType.LINK, "/blog/", 1),
+            (TextType.LINK, "post.html#top", 2),
+            (TextType.LINK, "../missing", 3),
+            (TextType.IMAGE, "/images/logo.png", 4),
+            (TextType.IMAGE, "/images/gone.png", 5),
+            (TextType.LINK, "https://example.com/nowhere", 6),
+        ]
+        dead = check_references([("content/blog/index.md", "blog/index.html", references)], targets)
+        self.assertEqual(dead, [("content/blog/index.md", 3, "link", "../missing"), ("content/blog/index.md", 5, "image", "/images/gone.png")])
+        self.assertEqual(
+            format_dead_links(dead),
+            "content/blog/index.md:3: broken link ../missing\ncontent/blog/index.md:5: broken image /images/gone.png\n2 broken link(s)",
+        )
+
+    def test_check_links(self):
+        (self.root / "content" / "blog").mkdir(parents=True)
+        (self.root / "static").mkdir()
+        (self.root / "static" / "index.css").write_text("body {}")
+        (self.root / "content" / "index.md").write_text("# Home\n\n[post](/blog/post) [css](/index.css)")
+        (self.root / "content" / "blog" / "post.md").write_text("# Post\n\n[home](/)\n\n[draft](/blog/draft)")
+        with redirect_stdout(StringIO()) as output:
+            self.assertEqual(check_links(self.root / "content", self.root / "static", self.root / "public"), 1)
+        self.assertIn("content/blog/post.md:5: broken link /blog/draft", output.getvalue())
+
+    def test_check_links_uses_rendered_references(self):
+        (self.root / "content").mkdir()
+        (self.root / "static").mkdir()
+        (self.root / "template.html").write_text("{{ Content }}")
+        (self.root / "content" / "index.md").write_text("# Home\n\n[gone](/gone)\n\n```\n[code](/code)\n```")
+        references = {}
+        with redirect_stdout(StringIO()) as output:
+            generate_pages(find_pages(self.root / "content", self.root / "public"), self.root / "template.html", jobs=2, references=references)
+            with mock.patch.object(main, "collect_references") as collect:
+                self.assertEqual(check_links(self.root / "content", self.root / "static", self.root / "public", rendered=references), 1)
+                collect.assert_not_called()
+        self.assertIn("content/index.md:3: broken link /gone", output.getvalue())
+
+    def test_check_links_reuses_recorded_references(self):
+        (self.root / "content" / "blog").mkdir(parents=True)
+        (self.root / "static").mkdir()
+        (self.root / "template.html").write_text("{{ Title }}{{ Content }}")
+        (self.root / "content" / "index.md").write_text("# Home\n\n[post](/blog/post) [gone](/gone)")
+        (self.root / "content" / "blog" / "post.md").write_text("# Post\n\n[home](/)")
+        args = (self.root / "content", self.root / "static", self.root / "public", (), self.root / "manifest.json")
+        with redirect_stdout(StringIO()) as output:
+            generate_pages_incremental(self.root / "content", self.root / "template.html", self.root / "public", self.root / "manifest.json")
+            with mock.patch.object(main, "collect_references", wraps=collect_references) as collect:
+                self.assertEqual(check_links(*args), 1)
+                self.assertEqual(collect.call_count, 0)
+                # An edit made since the last incremental build is parsed again
+                (self.root / "content" / "blog" / "post.md").write_text("# Post\n\n[home](/)\n\n[draft](/draft)")
+                self.assertEqual(check_links(*args), 2)
+                self.assertEqual(collect.call_count, 1)
+        self.assertIn("content/blog/post.md:5: broken link /draft", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import pathlib
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from main import batch_pages, find_pages, generate_page, generate_pages, generate_pages_incremental, generate_pages_recursive, rebuild_changed
+
+
+class TestParallelBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        for i in range(6):
+            section = self.root / "content" / f"section{i % 2}"
+            section.mkdir(parents=True, exist_ok=True)
+            (section / f"page{i}.md").write_text(f"# Page {i}\n\nSome **bold** text and a [link](/page{i})")
+        (self.root / "template.html").write_text("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_tree(self, directory: pathlib.Path) -> dict[str, str]:
+        return {path.relative_to(directory).as_posix(): path.read_text() for path in directory.rglob("*.html")}
+
+    def test_batch_pages(self):
+        pages = [(pathlib.Path(f"{i}.md"), pathlib.Path(f"{i}.html")) for i in range(10)]
+        batches = batch_pages(pages, 2, batches_per_job=2)
+        self.assertEqual(len(batches), 4)
+        self.assertEqual(sorted(page for batch in batches for page in batch), sorted(pages))
+
+    def test_batch_pages_empty(self):
+        self.assertEqual(batch_pages([], 4), [])
+
+    def test_find_pages(self):
+        pages = find_pages(self.root / "content", self.root / "public")
+        self.assertEqual(len(pages), 6)
+        self.assertIn(
+            (self.root / "content" / "section1" / "page3.md", self.root / "public" / "section1" / "page3.html"),
+            pages,
+        )
+
+    def test_parallel_matches_serial(self):
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.root / "content", self.root / "template.html", self.root / "serial")
+            generate_pages(find_pages(self.root / "content", self.root / "parallel"), self.root / "template.html", jobs=3)
+        serial = self.read_tree(self.root / "serial")
+        self.assertEqual(len(serial), 6)
+        self.assertEqual(serial, self.read_tree(self.root / "parallel"))
+
+
+class TestGeneratePage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        (self.root / "template.html").write_text("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def generate(self, markdown: str) -> None:
+        (self.root / "page.md").write_text(markdown)
+        with redirect_stdout(StringIO()):
+            generate_page(self.root / "page.md", self.root / "template.html", self.root / "page.html")
+
+    def test_generate_page(self):
+        self.generate("# Title\n\n```\ncode\n\nblock\n```\n\n- one")
+        self.assertEqual(
+            (self.root / "page.html").read_text(),
+            "<title>Title</title><div><h1>Title</h1><pre><code>\ncode\n\nblock\n</code></pre><ul><li>one</li></ul></div>"
+        )
+
+    def test_failed_page_keeps_previous_output(self):
+        self.generate("# Title")
+        self.assertRaises(ValueError, self.generate, "# Title\n\n- one\ntwo")
+        self.assertEqual((self.root / "page.html").read_text(), "<title>Title</title><div><h1>Title</h1></div>")
+        self.assertEqual(sorted(path.name for path in self.root.iterdir()), ["page.html", "page.md", "template.html"])
+
+    def test_front_matter_title_without_body(self):
+        self.generate("---\ntitle: Empty\n---\n")
+        self.assertEqual((self.root / "page.html").read_text(), "<title>Empty</title><div></div>")
+
+    def test_missing_title(self):
+        self.assertRaises(Exception, self.generate, "No title")
+
+
+class TestRebuildChanged(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        (self.root / "content" / "blog").mkdir(parents=True)
+        (self.root / "content" / "index.md").write_text("# Home")
+        (self.root / "content" / "blog" / "post.md").write_text("# Post")
+        (self.root / "static").mkdir()
+        (self.root / "static" / "index.css").write_text("body {}")
+        (self.root / "template.html").write_text("{{ Content }}")
+        with redirect_stdout(StringIO()):
+            generate_pages_incremental(self.root / "content", self.root / "template.html", self.root / "public", self.root / "manifest.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def rebuild(self, changed: set[pathlib.Path], removed: set[pathlib.Path]) -> list[pathlib.Path]:
+        with redirect_stdout(StringIO()):
+            return rebuild_changed(
+                changed,
+                removed,
+                self.root / "content",
+                self.root / "static",
+                self.root / "template.html",
+                self.root / "public",
+                self.root / "manifest.json",
+            )
+
+    def test_changed_page(self):
+        path = self.root / "content" / "index.md"
+        path.write_text("# Home\n\nUpdated")
+        self.assertEqual(self.rebuild({path}, set()), [self.root / "public" / "index.html"])
+        self.assertEqual((self.root / "public" / "index.html").read_text(), "<div><h1>Home</h1><p>Updated</p></div>")
+
+    def test_removed_page(self):
+        path = self.root / "content" / "blog" / "post.md"
+        path.unlink()
+        self.assertEqual(self.rebuild(set(), {path}), [])
+        self.assertFalse((self.root / "public" / "blog").exists())
+
+    def test_changed_template(self):
+        path = self.root / "template.html"
+        path.write_text("<main>{{ Content }}</main>")
+        self.assertEqual(len(self.rebuild({path}, set())), 2)
+        self.assertEqual((self.root / "public" / "index.html").read_text(), "<main><div><h1>Home</h1></div></main>")
+
+    def test_changed_and_removed_assets(self):
+        css = self.root / "static" / "index.css"
+        image = self.root / "static" / "images" / "logo.png"
+        image.parent.mkdir()
+        image.write_bytes(b"png")
+        self.rebuild({css, image}, set())
+        self.assertEqual((self.root / "public" / "images" / "logo.png").read_bytes(), b"png")
+        image.unlink()
+        self.assertEqual(self.rebuild(set(), {image}), [])
+        self.assertFalse((self.root / "public" / "images").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
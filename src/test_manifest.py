@@ -0,0 +1,132 @@
+import pathlib
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from main import generate_pages_incremental
+from manifest import RENDER_MODULES, SRC_DIR, BuildManifest, hash_file
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_load_missing(self):
+        manifest = BuildManifest.load(self.root / "manifest.json")
+        self.assertEqual(manifest.pages, {})
+        self.assertIsNone(manifest.template_hash)
+
+    def test_save_and_load(self):
+        path = self.root / "build" / "manifest.json"
+        BuildManifest(path, "t", "g", {"index.md": {"hash": "h", "output": "index.html"}}).save()
+        manifest = BuildManifest.load(path)
+        self.assertEqual(manifest.template_hash, "t")
+        self.assertEqual(manifest.generator_hash, "g")
+        self.assertEqual(manifest.pages, {"index.md": {"hash": "h", "output": "index.html"}})
+
+    def test_render_modules(self):
+        # Every listed module exists and tooling outside the render path does not change the version
+        self.assertTrue(all((SRC_DIR / name).exists() for name in RENDER_MODULES))
+        self.assertTrue({"bench.py", "corpus.py", "watch.py"}.isdisjoint(RENDER_MODULES))
+
+    def test_load_corrupt(self):
+        path = self.root / "manifest.json"
+        path.write_text("{not json")
+        self.assertEqual(BuildManifest.load(path).pages, {})
+
+    def test_is_stale(self):
+        manifest = BuildManifest(self.root / "manifest.json", "t", "g", {"index.md": {"hash": "h"}})
+        self.assertFalse(manifest.is_stale("index.md", "h", "t", "g"))
+        self.assertTrue(manifest.is_stale("index.md", "other", "t", "g"))
+        self.assertTrue(manifest.is_stale("index.md", "h", "other", "g"))
+        self.assertTrue(manifest.is_stale("index.md", "h", "t", "other"))
+        self.assertTrue(manifest.is_stale("new.md", "h", "t", "g"))
+
+    def test_hash_file(self):
+        path = self.root / "file.txt"
+        path.write_text("hello")
+        self.assertEqual(hash_file(path), "2cf24dba5fb0a30e26e83b2ac5b9e29e1b161e5c1fa7425e73043362938b9824")
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        (self.root / "content" / "blog").mkdir(parents=True)
+        (self.root / "content" / "index.md").write_text("# Home\n\nWelcome")
+        (self.root / "content" / "blog" / "post.md").write_text("# Post\n\nHello")
+        (self.root / "template.html").write_text("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self) -> list[pathlib.Path]:
+        with redirect_stdout(StringIO()):
+            return generate_pages_incremental(
+                self.root / "content", self.root / "template.html", self.root / "public", self.root / "manifest.json"
+            )
+
+    def test_first_build_generates_everything(self):
+        self.assertEqual(len(self.build()), 2)
+        self.assertEqual(
+            (self.root / "public" / "index.html").read_text(),
+            "<title>Home</title><div><h1>Home</h1><p>Welcome</p></div>",
+        )
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build()
+        self.assertEqual(self.build(), [])
+
+    def test_changed_page_is_regenerated(self):
+        self.build()
+        (self.root / "content" / "index.md").write_text("# Home\n\nWelcome back")
+        self.assertEqual(self.build(), [self.root / "public" / "index.html"])
+
+    def test_template_change_regenerates_everything(self):
+        self.build()
+        (self.root / "template.html").write_text("<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(len(self.build()), 2)
+
+    def test_deleted_source_is_pruned(self):
+        self.build()
+        (self.root / "content" / "blog" / "post.md").unlink()
+        self.build()
+        self.assertFalse((self.root / "public" / "blog").exists())
+        self.assertTrue((self.root / "public" / "index.html").exists())
+
+    def test_outputs_of_failed_build_are_pruned(self):
+        self.build()
+        content = self.root / "content"
+        for name in ("b", "d"):
+            (content / f"{name}.md").write_text(f"# {name}\n")
+        (content / "zz.md").write_text("# Broken\n\n```\nunclosed")
+        with self.assertRaises(ValueError):
+            self.build()
+        manifest = BuildManifest.load(self.root / "manifest.json")
+        for name in ("b", "d"):
+            if (self.root / "public" / f"{name}.html").exists():
+                self.assertEqual(manifest.pages[f"{name}.md"], {"hash": None, "output": f"{name}.html"})
+        self.assertNotIn("zz.md", manifest.pages)
+
+        for name in ("b", "d", "zz"):
+            (content / f"{name}.md").unlink()
+        self.assertEqual(self.build(), [])
+        self.assertEqual(sorted(path.name for path in (self.root / "public").rglob("*.html")), ["index.html", "post.html"])
+
+    def test_page_of_failed_build_is_rebuilt(self):
+        self.build()
+        (self.root / "content" / "b.md").write_text("# B\n")
+        (self.root / "content" / "zz.md").write_text("```\nunclosed")
+        with self.assertRaises(ValueError):
+            self.build()
+        (self.root / "content" / "zz.md").unlink()
+        self.assertEqual(self.build(), [self.root / "public" / "b.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
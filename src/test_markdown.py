@@ -1,6 +1,8 @@
+import io
 import unittest
 
-from markdown import markdown_to_html_node, extract_title
+from markdown import markdown_to_html_node, extract_title, write_blocks_html
+from textnode import BlockType
 
 
 class TestMarkdownConversion(unittest.TestCase):
@@ -32,6 +34,14 @@ class TestMarkdownConversion(unittest.TestCase):
         with self.assertRaises(Exception):
             extract_title(markdown)
     
+    def test_extract_title_ignores_rest_of_document(self):
+        self.assertEqual(extract_title("# Title\n\n- broken\nlist"), "Title")
+
+    def test_write_blocks_html(self):
+        buffer = io.StringIO()
+        write_blocks_html([(BlockType.HEADING, "# Title"), (BlockType.PARAGRAPH, "Some **bold**")], buffer)
+        self.assertEqual(buffer.getvalue(), "<div><h1>Title</h1><p>Some <b>bold</b></p></div>")
+
     def test_extract_title_empty(self):
         markdown = ""
         with self.assertRaises(Exception):
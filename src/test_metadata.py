@@ -0,0 +1,113 @@
+import pathlib
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from frontmatter import split_front_matter, strip_front_matter, template_context
+from main import generate_page
+from markdown import extract_title, markdown_to_html_node
+from metadata import SiteMetadata, read_page_metadata
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_yaml_subset(self):
+        metadata, body = strip_front_matter(
+            "---\n"
+            "title: \"Riddles: in the Dark\"\n"
+            "# a comment\n"
+            "date: 1937-09-21\n"
+            "draft: false\n"
+            "chapter: 5\n"
+            "tags: [hobbit, riddles]\n"
+            "authors:\n"
+            "  - Tolkien\n"
+            "  - 'Bilbo'\n"
+            "---\n"
+            "# Heading\n"
+        )
+        self.assertEqual(metadata, {
+            "title": "Riddles: in the Dark",
+            "date": "1937-09-21",
+            "draft": False,
+            "chapter": 5,
+            "tags": ["hobbit", "riddles"],
+            "authors": ["Tolkien", "Bilbo"],
+        })
+        self.assertEqual(body, "# Heading\n")
+
+    def test_toml(self):
+        metadata, body = strip_front_matter('+++\ntitle = "Shire"\ndate = 1954-07-29\ntags = ["a", "b"]\n+++\nbody\n')
+        self.assertEqual(metadata, {"title": "Shire", "date": "1954-07-29", "tags": ["a", "b"]})
+        self.assertEqual(body, "body\n")
+
+    def test_no_front_matter(self):
+        self.assertEqual(strip_front_matter("# Title\n"), ({}, "# Title\n"))
+        self.assertEqual(strip_front_matter("---\ntitle: x\n# Title\n"), ({}, "---\ntitle: x\n# Title\n"))
+        self.assertEqual(strip_front_matter(""), ({}, ""))
+
+    def test_invalid_yaml(self):
+        with self.assertRaises(ValueError):
+            strip_front_matter("---\njust text\n---\n# Title\n")
+
+    def test_split_reads_only_the_head(self):
+        lines = iter(["---\n", "title: x\n", "---\n", "# Body\n", "more\n"])
+        metadata, rest = split_front_matter(lines)
+        self.assertEqual(metadata, {"title": "x"})
+        self.assertEqual(next(lines), "# Body\n")
+        self.assertEqual(list(rest), ["more\n"])
+
+    def test_template_context_joins_lists(self):
+        self.assertEqual(template_context({"tags": ["a", "b"], "draft": False}), {"tags": "a, b", "draft": False})
+
+    def test_markdown_honours_front_matter(self):
+        markdown = "---\ntitle: From front matter\n---\n# Heading\n\nText"
+        self.assertEqual(extract_title(markdown), "From front matter")
+        self.assertEqual(extract_title("---\ntags: [a]\n---\n# Heading\n"), "Heading")
+        self.assertEqual(markdown_to_html_node(markdown).to_html(), "<div><h1>Heading</h1><p>Text</p></div>")
+
+
+class TestSiteMetadata(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        self.content = self.root / "content"
+        (self.content / "blog").mkdir(parents=True)
+        (self.content / "index.md").write_text("# Home\n\nWelcome")
+        (self.content / "blog" / "old.md").write_text("---\ndate: 2020-01-01\ntags: news, tolkien\n---\n# Old post\n")
+        (self.content / "blog" / "new.md").write_text("---\ntitle: New post\ndate: 2024-05-01\ntags: [tolkien]\n---\nNo heading here\n")
+        self.cache_path = self.root / ".build" / "metadata.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_read_page_metadata(self):
+        self.assertEqual(read_page_metadata(self.content / "blog" / "old.md"), {"title": "Old post", "date": "2020-01-01", "tags": "news, tolkien"})
+
+    def test_scan_is_lazy_and_cached(self):
+        site = SiteMetadata(self.content, self.cache_path)
+        self.assertIsNone(site._pages)
+        self.assertEqual(site.pages["blog/new.md"]["title"], "New post")
+        self.assertEqual(site.pages["blog/old.md"]["tags"], ["news", "tolkien"])
+        self.assertEqual(site.pages["blog/old.md"]["output"], "blog/old.html")
+        self.assertEqual(site.by_date(), ["blog/new.md", "blog/old.md", "index.md"])
+        self.assertEqual(site.by_tag(), {"tolkien": ["blog/new.md", "blog/old.md"], "news": ["blog/old.md"]})
+        self.assertEqual(sorted(site.scanned), ["blog/new.md", "blog/old.md", "index.md"])
+        site.save()
+
+        (self.content / "index.md").write_text("# Home again\n")
+        site = SiteMetadata(self.content, self.cache_path)
+        self.assertEqual(site.pages["index.md"]["title"], "Home again")
+        self.assertEqual(site.scanned, ["index.md"])
+
+    def test_generate_page_passes_fields_to_template(self):
+        template = self.root / "template.html"
+        template.write_text("<title>{{ Title }}</title><p>{{ tags }} {{ date }}</p>{{ Content }}")
+        output = self.root / "new.html"
+        with redirect_stdout(StringIO()):
+            generate_page(self.content / "blog" / "new.md", template, output)
+        self.assertEqual(output.read_text(), "<title>New post</title><p>tolkien 2024-05-01</p><div><p>No heading here</p></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
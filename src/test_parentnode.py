@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from parentnode import ParentNode
@@ -30,6 +31,29 @@ class TestParentNode(unittest.TestCase):
         node = ParentNode("div", [ParentNode("div", [LeafNode("p", "This is a paragraph", {"class": "paragraph"})], {"class": "container"}), ParentNode("div", [LeafNode("p", "This is another paragraph", {"class": "paragraph"})], {"class": "container"})], {"class": "container"})
         self.assertEqual(node.to_html(), '<div class="container"><div class="container"><p class="paragraph">This is a paragraph</p></div><div class="container"><p class="paragraph">This is another paragraph</p></div></div>')
 
+    def test_iter_html_matches_to_html(self):
+        node = ParentNode("div", [LeafNode("p", "This is a paragraph", {"class": "paragraph"}), ParentNode("div", [LeafNode(None, "text"), LeafNode("b", "bold")], {"class": "container"})], None)
+        self.assertEqual("".join(node.iter_html()), node.to_html())
+
+    def test_write_html(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode(None, "one")], None), ParentNode("li", [LeafNode("i", "two")], None)], None)
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), "<ul><li>one</li><li><i>two</i></li></ul>")
+
+    def test_iter_html_children_empty(self):
+        self.assertRaises(ValueError, list, ParentNode("div", [], None).iter_html())
+
+    def test_iter_html_joins_runs_of_leaves(self):
+        node = ParentNode("p", [LeafNode(None, "a "), LeafNode("b", "b"), ParentNode("i", [LeafNode(None, "c")], None), LeafNode(None, " <d>")], None)
+        self.assertEqual(list(node.iter_html()), ["<p>", "a <b>b</b>", "<i>", "c", "</i>", " &lt;d&gt;", "</p>"])
+        self.assertEqual("".join(node.iter_html()), node.to_html())
+
+    def test_slots(self):
+        node = ParentNode("div", [], None)
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertRaises(AttributeError, setattr, node, "extra", 1)
+
 
 if __name__ == "__main__":
     unittest.main()
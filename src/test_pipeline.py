@@ -0,0 +1,82 @@
+import asyncio
+import pathlib
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from highlight import disable_highlighting, enable_highlighting
+from main import find_pages, generate_pages, generate_pages_recursive
+from pipeline import build_pages, render_page
+from textnode import disable_inline_memo, enable_inline_memo
+
+
+class TestAsyncPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        for i in range(10):
+            section = self.root / "content" / f"section{i % 3}"
+            section.mkdir(parents=True, exist_ok=True)
+            (section / f"page{i}.md").write_text(f"# Page {i}\n\n```\ncode\n\n{i}\n```\n\n- *item* {i}")
+        (self.root / "template.html").write_text("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_tree(self, directory: pathlib.Path) -> dict[str, str]:
+        return {path.relative_to(directory).as_posix(): path.read_text() for path in directory.rglob("*.html")}
+
+    def test_render_page(self):
+        self.assertEqual(
+            render_page("# Hi\n\ntext", self.root / "template.html"),
+            "<title>Hi</title><div><h1>Hi</h1><p>text</p></div>",
+        )
+
+    def test_pipeline_matches_serial(self):
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.root / "content", self.root / "template.html", self.root / "serial")
+            count = asyncio.run(build_pages(
+                find_pages(self.root / "content", self.root / "async"),
+                self.root / "template.html",
+                readers=3,
+                writers=2,
+                queue_size=1,
+            ))
+        self.assertEqual(count, 10)
+        self.assertEqual(self.read_tree(self.root / "serial"), self.read_tree(self.root / "async"))
+
+    def test_render_page_without_body(self):
+        self.assertEqual(render_page("---\ntitle: Empty\n---\n", self.root / "template.html"), "<title>Empty</title><div></div>")
+
+    def test_pipeline_with_process_executor(self):
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.root / "content", self.root / "template.html", self.root / "serial")
+            generate_pages(find_pages(self.root / "content", self.root / "async"), self.root / "template.html", jobs=2, async_io=True)
+        self.assertEqual(self.read_tree(self.root / "serial"), self.read_tree(self.root / "async"))
+
+    def test_pipeline_merges_worker_cache_counts(self):
+        memo = enable_inline_memo(100)
+        highlighter = enable_highlighting(100)
+        self.addCleanup(disable_inline_memo)
+        self.addCleanup(disable_highlighting)
+        (self.root / "content" / "code.md").write_text("# Code\n\n```python\nx = 1\n```")
+        with redirect_stdout(StringIO()):
+            generate_pages(find_pages(self.root / "content", self.root / "async"), self.root / "template.html", jobs=2, async_io=True)
+        # A heading and a list item per page plus the heading of the code page
+        self.assertEqual(memo.hits + memo.misses, 21)
+        self.assertEqual((highlighter.hits, highlighter.misses), (0, 1))
+
+    def test_pipeline_propagates_errors(self):
+        (self.root / "content" / "section0" / "broken.md").write_text("# Broken\n\n**unclosed")
+        with redirect_stdout(StringIO()):
+            with self.assertRaisesRegex(ValueError, "Unclosed delimiter"):
+                asyncio.run(build_pages(find_pages(self.root / "content", self.root / "async"), self.root / "template.html"))
+
+    def test_empty_pipeline(self):
+        self.assertEqual(asyncio.run(build_pages([], self.root / "template.html")), 0)
+        self.assertRaises(ValueError, asyncio.run, build_pages([], self.root / "template.html", readers=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import gzip
+import os
+import pathlib
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from main import commit_fingerprints, generate_pages_incremental, sync_fingerprints
+from postprocess import compress_file, compress_tree, fingerprint_name, post_write, prune_fingerprints, rewrite_references, update_fingerprints
+
+
+class TestFingerprints(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        (self.root / "static" / "images").mkdir(parents=True)
+        (self.root / "static" / "index.css").write_text("body {}")
+        (self.root / "static" / "images" / "logo.png").write_bytes(b"png")
+        (self.root / "public").mkdir()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name("images/logo.png", "0123456789abcdef"), "images/logo.0123456789.png")
+        self.assertEqual(fingerprint_name("LICENSE", "0123456789abcdef"), "LICENSE.0123456789")
+        self.assertEqual(fingerprint_name(".htaccess", "0123456789abcdef"), ".htaccess.0123456789")
+
+    def test_update_fingerprints(self):
+        fingerprints, changed = update_fingerprints(self.root / "static", self.root / "public", {})
+        self.assertEqual(changed, {"index.css", "images/logo.png"})
+        css = fingerprints["index.css"]["name"]
+        self.assertEqual((self.root / "public" / css).read_text(), "body {}")
+        self.assertEqual(update_fingerprints(self.root / "static", self.root / "public", fingerprints), (fingerprints, set()))
+
+        (self.root / "static" / "index.css").write_text("body { margin: 0 }")
+        (self.root / "static" / "images" / "logo.png").unlink()
+        updated, changed = update_fingerprints(self.root / "static", self.root / "public", fingerprints)
+        self.assertEqual(changed, {"index.css"})
+        self.assertNotEqual(updated["index.css"]["name"], css)
+        self.assertTrue((self.root / "public" / css).exists())
+        compress_file(self.root / "public" / css)
+        prune_fingerprints(self.root / "public", fingerprints, updated)
+        self.assertFalse((self.root / "public" / css).exists())
+        self.assertEqual(list((self.root / "public").glob(css + ".*")), [])
+        self.assertFalse((self.root / "public" / "images").exists())
+
+    def test_rewrite_references(self):
+        page = self.root / "public" / "index.html"
+        page.write_text('<link href="/index.css"><img src="/images/logo.png" alt="x"><a href="/other">o</a>')
+        names = {"index.css": "index.abc.css", "images/logo.png": "images/logo.def.png"}
+        self.assertTrue(rewrite_references(page, names))
+        self.assertEqual(page.read_text(), '<link href="/index.abc.css"><img src="/images/logo.def.png" alt="x"><a href="/other">o</a>')
+        self.assertFalse(rewrite_references(page, names))
+
+    def test_incremental_build_rebuilds_pages_using_changed_assets(self):
+        (self.root / "content").mkdir()
+        (self.root / "content" / "index.md").write_text("# Home\n\n![logo](/images/logo.png)")
+        (self.root / "content" / "about.md").write_text("# About")
+        (self.root / "template.html").write_text("{{ Content }}")
+
+        def build() -> list[str]:
+            with redirect_stdout(StringIO()):
+                fingerprints, invalidated = sync_fingerprints(self.root / "static", self.root / "public", self.root / "manifest.json", True)
+                generated = generate_pages_incremental(
+                    self.root / "content", self.root / "template.html", self.root / "public", self.root / "manifest.json", invalidated=invalidated
+                )
+                post_write(self.root / "public", generated, fingerprints)
+                commit_fingerprints(self.root / "public", self.root / "manifest.json", fingerprints)
+            return sorted(path.name for path in generated)
+
+        self.assertEqual(build(), ["about.html", "index.html"])
+        self.assertEqual(build(), [])
+        (self.root / "static" / "images" / "logo.png").write_bytes(b"new png")
+        self.assertEqual(build(), ["index.html"])
+        (self.root / "template.html").write_text('<link href="/index.css">{{ Content }}')
+        self.assertEqual(build(), ["about.html", "index.html"])
+        (self.root / "static" / "index.css").write_text("body { margin: 0 }")
+        self.assertEqual(build(), ["about.html", "index.html"])
+        self.assertEqual(len(list((self.root / "public").glob("index.*.css"))), 1)
+
+        # A build failing after the asset changed keeps the old copy the current pages link to and
+        # leaves the change pending, so the next build still rewrites them
+        (self.root / "static" / "index.css").write_text("body { margin: 1em }")
+        (self.root / "content" / "broken.md").write_text("# Broken\n\n```\nunclosed")
+        with self.assertRaises(ValueError):
+            build()
+        for page in ("index.html", "about.html"):
+            linked = (self.root / "public" / page).read_text().split('"')[1]
+            self.assertTrue((self.root / "public" / linked.lstrip("/")).exists())
+        (self.root / "content" / "broken.md").unlink()
+        self.assertEqual(build(), ["about.html", "index.html"])
+        css = list((self.root / "public").glob("index.*.css"))
+        self.assertEqual(len(css), 1)
+        self.assertIn(f'href="/{css[0].name}"', (self.root / "public" / "about.html").read_text())
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        (self.root / "blog").mkdir()
+        (self.root / "index.html").write_text("<p>home</p>")
+        (self.root / "blog" / "post.html").write_text("<p>post</p>")
+        (self.root / "logo.png").write_bytes(b"png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compress_tree_skips_unchanged_files(self):
+        self.assertEqual(sorted(path.name for path in compress_tree(self.root)), ["index.html", "post.html"])
+        self.assertEqual(gzip.decompress((self.root / "index.html.gz").read_bytes()), b"<p>home</p>")
+        self.assertFalse((self.root / "logo.png.gz").exists())
+        self.assertEqual(compress_tree(self.root), [])
+
+        (self.root / "index.html").write_text("<p>updated</p>")
+        os.utime(self.root / "index.html", ns=(0, 1))
+        self.assertEqual(compress_tree(self.root, jobs=2), [self.root / "index.html"])
+        self.assertEqual(gzip.decompress((self.root / "index.html.gz").read_bytes()), b"<p>updated</p>")
+
+    def test_compress_tree_removes_orphans(self):
+        compress_tree(self.root)
+        (self.root / "blog" / "post.html").unlink()
+        compress_tree(self.root)
+        self.assertFalse((self.root / "blog").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
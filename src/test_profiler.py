@@ -0,0 +1,69 @@
+import json
+import pathlib
+import tempfile
+import unittest
+
+from profiler import STAGES, BuildProfiler, profile_page
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def test_add_accumulates(self):
+        profiler = BuildProfiler()
+        profiler.add("a.md", "read", 0.5)
+        profiler.add("a.md", "read", 0.25)
+        self.assertEqual(profiler.pages, {"a.md": {"read": 0.75}})
+
+    def test_stage(self):
+        profiler = BuildProfiler()
+        with profiler.stage("a.md", "write"):
+            pass
+        self.assertIn("write", profiler.pages["a.md"])
+
+    def test_merge(self):
+        first, second = BuildProfiler(), BuildProfiler()
+        first.add("a.md", "read", 1.0)
+        second.add("a.md", "read", 2.0)
+        second.add("b.md", "write", 1.0)
+        second.peak_memory = 100
+        first.merge(second)
+        self.assertEqual(first.pages, {"a.md": {"read": 3.0}, "b.md": {"write": 1.0}})
+        self.assertEqual(first.peak_memory, 100)
+
+    def test_summary(self):
+        profiler = BuildProfiler()
+        profiler.add("fast.md", "read", 1.0)
+        profiler.add("slow.md", "read", 1.0)
+        profiler.add("slow.md", "to_html", 2.0)
+        summary = profiler.summary(slowest=1)
+        self.assertEqual(summary["pages"], 2)
+        self.assertEqual(summary["total_seconds"], 4.0)
+        self.assertEqual(summary["stages"]["read"], 2.0)
+        self.assertEqual([page["page"] for page in summary["slowest"]], ["slow.md"])
+
+    def test_format_summary(self):
+        profiler = BuildProfiler()
+        profiler.add("slow.md", "to_html", 0.002)
+        report = profiler.format_summary()
+        self.assertIn("Profiled 1 page(s) in 2.0 ms", report)
+        self.assertIn("slow.md", report)
+
+
+class TestProfilePage(unittest.TestCase):
+    def test_profile_page(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = pathlib.Path(tmp)
+            (root / "page.md").write_text("# Title\n\nSome **bold** text\n\n- one\n- two")
+            (root / "template.html").write_text("<title>{{ Title }}</title>{{ Content }}")
+            profiler = BuildProfiler()
+            profile_page(root / "page.md", root / "template.html", root / "page.html", profiler)
+            self.assertEqual(
+                (root / "page.html").read_text(),
+                "<title>Title</title><div><h1>Title</h1><p>Some <b>bold</b> text</p><ul><li>one</li><li>two</li></ul></div>"
+            )
+            self.assertEqual(set(profiler.pages[str(root / "page.md")]), set(STAGES))
+            profiler.write_json(root / "profile.json")
+            self.assertEqual(json.loads((root / "profile.json").read_text())["pages"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import concurrent.futures
+import pathlib
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from main import find_pages, generate_pages, generate_pages_recursive
+from scheduler import MemoryScheduler, estimate_cost
+
+
+class TestMemoryScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        self.pages = []
+        for i, size in enumerate([1000, 50000, 200, 120000, 3000, 80000]):
+            path = self.root / f"page{i}.md"
+            path.write_text("x" * size)
+            self.pages.append((path, self.root / f"page{i}.html"))
+        self.lock = threading.Lock()
+        self.started = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def render(self, pages, scheduler):
+        with self.lock:
+            self.started.append((pages[0][0].stat().st_size, scheduler.in_flight_bytes))
+        time.sleep(0.01)
+        return pages[0][0].name
+
+    def run_scheduler(self, budget: int, slots: int = 3) -> tuple[MemoryScheduler, list[str]]:
+        scheduler = MemoryScheduler(budget, slots)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=slots) as executor:
+            results = list(scheduler.run(executor, self.render, self.pages, scheduler))
+        return scheduler, results
+
+    def test_largest_page_first_within_budget(self):
+        budget = estimate_cost(120000) + estimate_cost(3000)
+        scheduler, results = self.run_scheduler(budget)
+        self.assertEqual(sorted(results), sorted(from_path.name for from_path, _ in self.pages))
+        self.assertEqual(self.started[0][0], 120000)
+        self.assertEqual(self.started[1][0], 3000)
+        self.assertTrue(all(in_flight <= budget for _, in_flight in self.started))
+        self.assertLessEqual(scheduler.peak_in_flight_bytes, budget)
+        self.assertEqual((scheduler.in_flight_bytes, scheduler.queued, scheduler.over_budget), (0, 0, 0))
+
+    def test_page_over_budget_runs_alone(self):
+        budget = estimate_cost(60000)
+        scheduler, _ = self.run_scheduler(budget)
+        self.assertEqual(scheduler.over_budget, 2)
+        for size, in_flight in self.started:
+            if estimate_cost(size) > budget:
+                self.assertEqual(in_flight, estimate_cost(size))
+
+    def test_invalid_budget(self):
+        self.assertRaises(ValueError, MemoryScheduler, 0, 2)
+
+    def test_generate_pages_with_budget_matches_serial(self):
+        (self.root / "content").mkdir()
+        for i in range(5):
+            (self.root / "content" / f"page{i}.md").write_text(f"# Page {i}\n\n" + "word " * (i * 500))
+        (self.root / "template.html").write_text("<title>{{ Title }}</title>{{ Content }}")
+        with redirect_stdout(StringIO()) as output:
+            generate_pages_recursive(self.root / "content", self.root / "template.html", self.root / "serial")
+            generate_pages(find_pages(self.root / "content", self.root / "budget"), self.root / "template.html", jobs=2, max_memory=1 << 20)
+        self.assertIn("Memory budget 1.0 MiB", output.getvalue())
+        for path in (self.root / "serial").iterdir():
+            self.assertEqual(path.read_text(), (self.root / "budget" / path.name).read_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import pathlib
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from cache import RenderCache
+from main import build_search_index, find_pages, generate_pages
+from search import (
+    SearchIndex, decode_shard, decode_varint, encode_shard, encode_varint, page_terms, read_page_terms, term_shard, tokenize,
+)
+
+
+class TestSearchEncoding(unittest.TestCase):
+    def test_varint_round_trip(self):
+        out = bytearray()
+        values = [0, 1, 127, 128, 300, 1 << 35]
+        for value in values:
+            encode_varint(value, out)
+        self.assertEqual(out[:4], bytearray([0, 1, 127, 0x80]))
+        position = 0
+        for value in values:
+            decoded, position = decode_varint(out, position)
+            self.assertEqual(decoded, value)
+        self.assertEqual(position, len(out))
+
+    def test_shard_round_trip(self):
+        postings = {"tolkien": [(0, 3), (2, 1), (300, 7)], "eä": [(5, 1)]}
+        self.assertEqual(decode_shard(encode_shard(postings)), postings)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("The Lord_of the **Rings**, a 1954 novel"), ["the", "lord", "of", "the", "rings", "1954", "novel"])
+        self.assertEqual(term_shard("tolkien"), "746f")
+        self.assertEqual(term_shard("eä"), "65c3")
+
+    def test_page_terms_uses_text_nodes(self):
+        title, terms = page_terms(["# Middle *Earth*\n", "\n", "- [the Shire](/shire) and ![Mordor map](/mordor.png)\n", "- the end\n"])
+        self.assertEqual(title, "Middle *Earth*")
+        self.assertEqual(terms, {"middle": 1, "earth": 1, "the": 2, "shire": 1, "and": 1, "mordor": 1, "map": 1, "end": 1})
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        (self.root / "content" / "blog").mkdir(parents=True)
+        (self.root / "content" / "index.md").write_text("# Home\n\nWelcome to the shire")
+        (self.root / "content" / "blog" / "post.md").write_text("# Post\n\nThe shire is green, the shire is quiet")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, rendered=None) -> str:
+        with redirect_stdout(StringIO()) as output:
+            build_search_index(self.root / "content", self.root / "public", self.root / "search.json", rendered)
+        return output.getvalue()
+
+    def postings(self, term: str) -> list[tuple[int, int]]:
+        data = (self.root / "public" / "search" / f"{term_shard(term)}.bin").read_bytes()
+        return decode_shard(data)[term]
+
+    def test_build_and_incremental_update(self):
+        self.assertIn("2 pages tokenized", self.build())
+        self.assertEqual(
+            (self.root / "public" / "search" / "docs.json").read_text(),
+            '[["/blog/post","Post"],["/","Home"]]',
+        )
+        self.assertEqual(self.postings("shire"), [(0, 2), (1, 1)])
+        self.assertIn("0 pages tokenized, 0 files written", self.build())
+
+        (self.root / "content" / "index.md").write_text("# Home\n\nWelcome to Mordor")
+        self.assertIn("1 pages tokenized", self.build())
+        self.assertEqual(self.postings("shire"), [(0, 2)])
+        self.assertEqual(self.postings("mordor"), [(1, 1)])
+
+        os.utime(self.root / "content" / "index.md", ns=(0, 0))
+        self.assertIn("0 pages tokenized", self.build())
+
+        (self.root / "content" / "blog" / "post.md").unlink()
+        self.build()
+        self.assertEqual(sorted(SearchIndex.load(self.root / "search.json").pages), ["index.md"])
+        self.assertFalse((self.root / "public" / "search" / f"{term_shard('shire')}.bin").exists())
+
+    def test_terms_are_counted_while_rendering(self):
+        (self.root / "content" / "code.md").write_text("# Code\n\n```\nthe *shire* code\n```\n\nand `more` text")
+        (self.root / "template.html").write_text("{{ Title }}{{ Content }}")
+        pages = find_pages(self.root / "content", self.root / "public")
+        expected = {from_path: read_page_terms(from_path) for from_path, _ in pages}
+        for jobs, async_io in ((1, False), (2, False), (2, True)):
+            terms = {}
+            with redirect_stdout(StringIO()):
+                generate_pages(pages, self.root / "template.html", jobs, async_io=async_io, terms=terms)
+            self.assertEqual(terms, expected)
+
+    def test_cache_hits_are_not_counted(self):
+        (self.root / "template.html").write_text("{{ Title }}{{ Content }}")
+        pages = find_pages(self.root / "content", self.root / "public")
+        cache = RenderCache(self.root / "cache", 1 << 20)
+        terms = {}
+        with redirect_stdout(StringIO()):
+            generate_pages(pages, self.root / "template.html", cache=cache)
+            (self.root / "content" / "index.md").write_text("# Home\n\nWelcome to Mordor")
+            generate_pages(pages, self.root / "template.html", cache=cache, terms=terms)
+        self.assertEqual(list(terms), [self.root / "content" / "index.md"])
+
+    def test_rendered_terms_are_not_read_again(self):
+        self.build({self.root / "content" / "index.md": ("Home", {"mordor": 3})})
+        self.assertEqual(self.postings("mordor"), [(1, 3)])
+        self.assertEqual(self.postings("shire"), [(0, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import argparse
+import concurrent.futures
+import pathlib
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from main import build_shard, find_pages, generate_pages_recursive, merge_site
+from shard import find_shard_count, parse_shard, partition_pages, shard_dir, verify_shards
+
+
+def build_quietly(index: int, count: int, root: pathlib.Path) -> None:
+    with redirect_stdout(StringIO()):
+        build_shard(index, count, root / "content", root / "template.html", root / "shards")
+
+
+class TestShardedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        for i in range(11):
+            section = self.root / "content" / f"section{i % 3}"
+            section.mkdir(parents=True, exist_ok=True)
+            (section / f"page{i}.md").write_text(f"# Page {i}\n\n" + "text " * (i * 40))
+        (self.root / "static").mkdir()
+        (self.root / "static" / "index.css").write_text("body {}")
+        (self.root / "template.html").write_text("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_tree(self, directory: pathlib.Path) -> dict[str, str]:
+        return {path.relative_to(directory).as_posix(): path.read_text() for path in directory.rglob("*") if path.is_file()}
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ["0/4", "5/4", "1/0", "1", "a/b"]:
+            self.assertRaises(argparse.ArgumentTypeError, parse_shard, value)
+
+    def test_partition_is_deterministic_and_balanced(self):
+        pages = find_pages(self.root / "content", self.root / "public")
+        shards = partition_pages(pages, self.root / "content", 3)
+        self.assertEqual(shards, partition_pages(list(reversed(pages)), self.root / "content", 3))
+        self.assertEqual(sorted(page for shard in shards for page in shard), sorted(pages))
+        loads = [sum(from_path.stat().st_size for from_path, _ in shard) for shard in shards]
+        self.assertLess(max(loads) - min(loads), max(from_path.stat().st_size for from_path, _ in pages))
+
+    def test_shards_in_separate_processes_merge_to_full_build(self):
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.root / "content", self.root / "template.html", self.root / "serial")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=3) as executor:
+            list(executor.map(build_quietly, [1, 2, 3], [3] * 3, [self.root] * 3))
+        self.assertEqual(find_shard_count(self.root / "shards"), 3)
+        with redirect_stdout(StringIO()):
+            merge_site(self.root / "content", self.root / "static", self.root / "public", self.root / "shards")
+        expected = self.read_tree(self.root / "serial")
+        expected["index.css"] = "body {}"
+        self.assertEqual(self.read_tree(self.root / "public"), expected)
+        self.assertEqual(list((self.root / "shards").iterdir()), [])
+
+    def test_merge_detects_missing_and_duplicate_pages(self):
+        for index in (1, 2):
+            build_quietly(index, 3, self.root)
+        expected = {to_path.relative_to(self.root / "public").as_posix() for _, to_path in find_pages(self.root / "content", self.root / "public")}
+        with self.assertRaisesRegex(ValueError, "shard 3/3 has not been built"):
+            verify_shards(self.root / "shards", 3, expected)
+        build_quietly(3, 3, self.root)
+        verify_shards(self.root / "shards", 3, expected)
+        (shard_dir(self.root / "shards", 1, 3) / "shard.json").write_text(
+            (shard_dir(self.root / "shards", 2, 3) / "shard.json").read_text()
+        )
+        with self.assertRaisesRegex(ValueError, "rendered by shards 1 and 2"):
+            verify_shards(self.root / "shards", 3, expected)
+        self.assertFalse((self.root / "public").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
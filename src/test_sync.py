@@ -0,0 +1,80 @@
+import os
+import pathlib
+import tempfile
+import unittest
+
+from sync import clone_file, prune_file, sync_tree
+
+
+class TestSyncTree(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        self.src = self.root / "static"
+        self.dest = self.root / "public"
+        (self.src / "images").mkdir(parents=True)
+        (self.src / "index.css").write_text("body {}")
+        (self.src / "images" / "logo.png").write_bytes(b"png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def bump_mtime(self, path: pathlib.Path) -> None:
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def test_initial_sync_copies_everything(self):
+        state, copied, removed = sync_tree(self.src, self.dest, {})
+        self.assertEqual(set(state), {"index.css", "images/logo.png"})
+        self.assertEqual(len(copied), 2)
+        self.assertEqual(removed, [])
+        self.assertEqual((self.dest / "images" / "logo.png").read_bytes(), b"png")
+
+    def test_unchanged_files_are_skipped(self):
+        state, _, _ = sync_tree(self.src, self.dest, {})
+        self.assertEqual(sync_tree(self.src, self.dest, state)[1:], ([], []))
+
+    def test_changed_file_is_copied(self):
+        state, _, _ = sync_tree(self.src, self.dest, {})
+        (self.src / "index.css").write_text("body { color: red }")
+        self.bump_mtime(self.src / "index.css")
+        _, copied, _ = sync_tree(self.src, self.dest, state)
+        self.assertEqual(copied, [self.dest / "index.css"])
+        self.assertEqual((self.dest / "index.css").read_text(), "body { color: red }")
+
+    def test_hash_compare_ignores_touched_files(self):
+        state, _, _ = sync_tree(self.src, self.dest, {}, compare="hash")
+        self.bump_mtime(self.src / "index.css")
+        _, copied, _ = sync_tree(self.src, self.dest, state, compare="hash")
+        self.assertEqual(copied, [])
+
+    def test_stale_files_are_removed(self):
+        state, _, _ = sync_tree(self.src, self.dest, {})
+        (self.dest / "page.html").write_text("generated")
+        (self.src / "images" / "logo.png").unlink()
+        _, _, removed = sync_tree(self.src, self.dest, state)
+        self.assertEqual(removed, [self.dest / "images" / "logo.png"])
+        self.assertFalse((self.dest / "images").exists())
+        self.assertTrue((self.dest / "page.html").exists())
+
+    def test_unknown_compare_mode(self):
+        self.assertRaises(ValueError, sync_tree, self.src, self.dest, {}, "size")
+
+    def test_hardlink(self):
+        sync_tree(self.src, self.dest, {}, hardlink=True)
+        self.assertEqual((self.dest / "index.css").stat().st_ino, (self.src / "index.css").stat().st_ino)
+
+    def test_clone_file_does_not_write_through_hardlinks(self):
+        other = self.root / "other.css"
+        other.write_text("other")
+        os.link(self.src / "index.css", self.dest.with_name("linked.css"))
+        clone_file(other, self.dest.with_name("linked.css"))
+        self.assertEqual((self.src / "index.css").read_text(), "body {}")
+        self.assertEqual(self.dest.with_name("linked.css").read_text(), "other")
+
+    def test_prune_file_missing(self):
+        self.assertFalse(prune_file(self.dest, self.dest / "missing.txt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
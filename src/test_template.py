@@ -0,0 +1,77 @@
+import io
+import os
+import pathlib
+import tempfile
+import unittest
+
+from leafnode import LeafNode
+from parentnode import ParentNode
+from template import Placeholder, Template, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_parse(self):
+        template = Template.parse("<title>{{ Title }}</title>{{Content}}!")
+        self.assertEqual(
+            template.segments,
+            ["<title>", Placeholder("Title"), "</title>", Placeholder("Content"), "!"]
+        )
+
+    def test_parse_no_placeholders(self):
+        self.assertEqual(Template.parse("<p>static</p>").segments, ["<p>static</p>"])
+
+    def test_names(self):
+        self.assertEqual(Template.parse("{{ a }}{{ b }}{{ a }}").names, {"a", "b"})
+
+    def test_render(self):
+        template = Template.parse("<title> {{ Title }} </title><p>{{ date }}</p>")
+        self.assertEqual(
+            template.render({"Title": "Home", "date": "2024-01-01"}),
+            "<title> Home </title><p>2024-01-01</p>"
+        )
+
+    def test_render_missing_variable(self):
+        self.assertEqual(Template.parse("a{{ missing }}b").render({}), "ab")
+
+    def test_render_does_not_substitute_values(self):
+        template = Template.parse("{{ Title }}|{{ Content }}")
+        self.assertEqual(template.render({"Title": "T", "Content": "{{ Title }}"}), "T|{{ Title }}")
+
+    def test_render_escapes_text_values(self):
+        template = Template.parse("<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(
+            template.render({"Title": "Q&A <draft>", "Content": lambda fp: fp.write("<p>markup</p>")}),
+            "<title>Q&amp;A &lt;draft&gt;</title><p>markup</p>",
+        )
+
+    def test_write_streams_html_nodes(self):
+        template = Template.parse("<article>{{ Content }}</article>")
+        buffer = io.StringIO()
+        template.write(buffer, {"Content": ParentNode("div", [LeafNode("b", "bold")], None)})
+        self.assertEqual(buffer.getvalue(), "<article><div><b>bold</b></div></article>")
+
+
+class TestLoadTemplate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tmp.name) / "template.html"
+        self.path.write_text("<h1>{{ Title }}</h1>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_load_template_is_cached(self):
+        self.assertIs(load_template(self.path), load_template(self.path))
+
+    def test_load_template_reloads_changed_file(self):
+        first = load_template(self.path)
+        self.path.write_text("<h2>{{ Title }}</h2>")
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        second = load_template(self.path)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.render({"Title": "x"}), "<h2>x</h2>")
+
+
+if __name__ == "__main__":
+    unittest.main()
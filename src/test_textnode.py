@@ -1,3 +1,5 @@
+import io
+import random
 import unittest
 
 from textnode import (
@@ -5,18 +7,32 @@ from textnode import (
     TextNode, 
     TextType, 
     text_node_to_html_node, 
+    text_to_leafnodes,
+    token_to_html_node,
     split_nodes_delimiter, 
     extract_markdown_images, 
     extract_markdown_links, 
     split_nodes_image, 
     split_nodes_link,
     text_to_textnodes,
+    scan_inline,
+    delimiter_pattern,
+    enable_inline_memo,
+    disable_inline_memo,
+    inline_memo_stats,
+    InlineMemo,
     markdown_to_blocks,
+    scan_blocks,
+    iter_blocks,
     block_to_block_type,
     block_to_parent_node
 )
 
 
+def passes_tokens(text):
+    return [(node.text_type, node.text, node.url) for node in text_to_textnodes(text, "passes")]
+
+
 class TestTextNode(unittest.TestCase):
     def test_eq(self):
         node = TextNode("This is a text node", TextType.BOLD)
@@ -33,6 +49,11 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", TextType.BOLD, "https://google.com")
         self.assertEqual(node, node2)
     
+    def test_slots(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertRaises(AttributeError, setattr, node, "extra", 1)
+
     def test_repr(self):
         node = TextNode("This is a text node", TextType.BOLD)
         self.assertEqual(repr(node), "TextNode(self.text='This is a text node', self.text_type.value='bold', self.url=None)")
@@ -287,6 +308,98 @@ class TestTextNode(unittest.TestCase):
     def test_text_to_textnodes_unclosed_markdown(self):
         self.assertRaises(ValueError, text_to_textnodes, "This is **bold *italic* text")
 
+    def test_text_to_textnodes_engines(self):
+        text = "A [link](/a) with ![img](/b.png) **bold** *it* `code` and **** runs"
+        self.assertEqual(text_to_textnodes(text, "scanner"), text_to_textnodes(text, "passes"))
+        self.assertRaises(KeyError, text_to_textnodes, text, "unknown")
+
+    def test_text_to_textnodes_engines_unclosed(self):
+        for engine in ("scanner", "passes"):
+            self.assertRaises(ValueError, text_to_textnodes, "This is **bold *italic* text", engine)
+            self.assertRaises(ValueError, text_to_textnodes, "**bold** and `code", engine)
+
+    def test_text_to_textnodes_engines_image_then_same_link(self):
+        # The passes engine splits the text around the first occurrence of each link literal, so an
+        # image followed by an identical link literal loses the image. The scanner, the default, keeps
+        # both; this is a deliberate output change from the passes engine.
+        text = "See ![a](b) and [a](b)"
+        self.assertEqual(
+            text_to_textnodes(text),
+            [
+                TextNode("See ", TextType.TEXT),
+                TextNode("a", TextType.IMAGE, "b"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "b"),
+            ]
+        )
+        self.assertEqual(
+            text_to_textnodes(text, "passes"),
+            [TextNode("See !", TextType.TEXT), TextNode("a", TextType.LINK, "b"), TextNode(" and [a](b)", TextType.TEXT)],
+        )
+
+    def test_text_to_textnodes_engines_match_on_random_input(self):
+        fragments = ["*", "**", "***", "`", "``", "a", " ", "[", "]", "(", ")", "![", "](", "!", "\n", "x"]
+        rng = random.Random(1)
+        for _ in range(5000):
+            text = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 20)))
+            try:
+                expected = text_to_textnodes(text, "passes")
+            except ValueError:
+                self.assertRaises(ValueError, text_to_textnodes, text, "scanner")
+                continue
+            self.assertEqual(text_to_textnodes(text, "scanner"), expected, text)
+
+    def test_text_to_leafnodes(self):
+        text = "This is **text** with an *italic* word, `code`, ![image](/a.png) and a [link](https://boot.dev)"
+        self.assertEqual(
+            [node.to_html() for node in text_to_leafnodes(text)],
+            [text_node_to_html_node(node).to_html() for node in text_to_textnodes(text)]
+        )
+
+    def test_token_to_html_node(self):
+        self.assertEqual(token_to_html_node(TextType.ITALIC, "text").to_html(), "<i>text</i>")
+        self.assertEqual(token_to_html_node(TextType.LINK, "text", "/a").to_html(), '<a href="/a">text</a>')
+        self.assertRaises(ValueError, token_to_html_node, TextType.IMAGE, "alt")
+
+    def test_scan_inline(self):
+        self.assertEqual(
+            scan_inline("[a](/a)![b](/b.png)"),
+            [
+                (TextType.TEXT, "", None),
+                (TextType.LINK, "a", "/a"),
+                (TextType.TEXT, "", None),
+                (TextType.IMAGE, "b", "/b.png"),
+            ]
+        )
+
+    def test_delimiter_pattern_is_compiled_once(self):
+        self.assertIs(delimiter_pattern("**"), delimiter_pattern("**"))
+        self.assertEqual(delimiter_pattern("~~").split("a ~~b~~ c"), ["a ", "b", " c"])
+
+    def test_inline_memo(self):
+        enable_inline_memo(2)
+        try:
+            for text in ["**a** b", "**a** b", "*c*", "`d`", "**a** b"]:
+                self.assertEqual(scan_inline(text), passes_tokens(text))
+            self.assertEqual(inline_memo_stats(), {"hits": 1, "misses": 4, "size": 2, "maxsize": 2})
+            tokens = scan_inline("*c*")
+            tokens.append((TextType.TEXT, "mutated", None))
+            self.assertEqual(scan_inline("*c*"), [(TextType.ITALIC, "c", None)])
+            self.assertRaises(ValueError, scan_inline, "**unclosed")
+        finally:
+            disable_inline_memo()
+        self.assertIsNone(inline_memo_stats())
+
+    def test_inline_memo_skips_long_text(self):
+        memo = enable_inline_memo(4, max_length=8)
+        try:
+            scan_inline("a long paragraph")
+            scan_inline("short")
+        finally:
+            disable_inline_memo()
+        self.assertEqual((memo.hits, memo.misses, len(memo.entries)), (0, 1, 1))
+        self.assertRaises(ValueError, InlineMemo, 0)
+
     def test_markdown_to_blocks(self):
         text = """
 # This is a heading
@@ -327,6 +440,41 @@ This is a paragraph of text. It has some **bold** and *italic* words inside of i
             [text[:-4]]
         )
     
+    def test_markdown_to_blocks_fenced_code_with_blank_lines(self):
+        text = "Intro\n\n```\nfirst\n\n\nsecond\n```\n\nOutro"
+        self.assertEqual(
+            markdown_to_blocks(text),
+            ["Intro", "```\nfirst\n\n\nsecond\n```", "Outro"]
+        )
+
+    def test_markdown_to_blocks_whitespace_lines(self):
+        self.assertEqual(markdown_to_blocks("  a\n \nb  \n\n \n\nc"), ["a\n \nb", "c"])
+
+    def test_scan_blocks(self):
+        text = "# Title\n\n```\ncode\n\nmore\n```\n\n- one\n- two\n\n1. a\n2. b"
+        blocks = scan_blocks(text)
+        self.assertEqual(
+            [block_type for block_type, _, _ in blocks],
+            [BlockType.HEADING, BlockType.CODE, BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST]
+        )
+        self.assertEqual([text[start:end] for _, start, end in blocks], markdown_to_blocks(text))
+
+    def test_scan_blocks_unclosed_fence(self):
+        self.assertRaises(ValueError, scan_blocks, "```\ncode\n\nstill code")
+
+    def test_scan_blocks_invalid_block(self):
+        self.assertRaises(ValueError, scan_blocks, "# Title\n\n- one\ntwo")
+
+    def test_iter_blocks_matches_scan_blocks(self):
+        text = "  # Title\n\n```\ncode\n\nmore\n```\n\n\n> quote\n> more \n\n \n\n- one\n- two\n"
+        self.assertEqual(
+            list(iter_blocks(io.StringIO(text))),
+            [(block_type, text[start:end]) for block_type, start, end in scan_blocks(text)]
+        )
+
+    def test_iter_blocks_invalid_block(self):
+        self.assertRaises(ValueError, list, iter_blocks(io.StringIO("- one\ntwo")))
+
     def test_block_to_block_type(self):
         self.assertEqual(
             block_to_block_type("# This is a heading"),
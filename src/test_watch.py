@@ -0,0 +1,56 @@
+import os
+import pathlib
+import tempfile
+import unittest
+
+from watch import Watcher, diff_snapshots, snapshot
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        (self.root / "content" / "blog").mkdir(parents=True)
+        (self.root / "content" / "index.md").write_text("# Home")
+        (self.root / "content" / "blog" / "post.md").write_text("# Post")
+        (self.root / "template.html").write_text("{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def touch(self, path: pathlib.Path, text: str) -> None:
+        path.write_text(text)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def test_snapshot(self):
+        files = snapshot([self.root / "content", self.root / "template.html", self.root / "missing"])
+        self.assertEqual(
+            set(files),
+            {self.root / "content" / "index.md", self.root / "content" / "blog" / "post.md", self.root / "template.html"}
+        )
+
+    def test_diff_snapshots(self):
+        a, b, c = pathlib.Path("a"), pathlib.Path("b"), pathlib.Path("c")
+        changed, removed = diff_snapshots({a: (1, 1), b: (1, 1)}, {a: (2, 1), c: (1, 1)})
+        self.assertEqual(changed, {a, c})
+        self.assertEqual(removed, {b})
+
+    def test_poll(self):
+        watcher = Watcher([self.root / "content", self.root / "template.html"])
+        self.assertEqual(watcher.poll(), (set(), set()))
+        self.touch(self.root / "content" / "index.md", "# Home page")
+        (self.root / "content" / "blog" / "post.md").unlink()
+        self.touch(self.root / "content" / "blog" / "new.md", "# New")
+        self.assertEqual(
+            watcher.poll(),
+            (
+                {self.root / "content" / "index.md", self.root / "content" / "blog" / "new.md"},
+                {self.root / "content" / "blog" / "post.md"},
+            )
+        )
+        self.assertEqual(watcher.poll(), (set(), set()))
+
+
+if __name__ == "__main__":
+    unittest.main()
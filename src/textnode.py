@@ -1,8 +1,12 @@
+import bisect
+import collections
+import itertools
 import re
 
 from enum import Enum
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
 
+from highlight import code_block_node
 from leafnode import LeafNode
 from parentnode import ParentNode
 
@@ -26,6 +30,8 @@ class BlockType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: Optional[str] = None) -> None:
         self.text = text
         self.text_type = text_type
@@ -49,41 +55,60 @@ TEXTTYPE_TO_DELIMITERS = {
 }
 
 
+TEXTTYPE_TO_TAGS = {
+    TextType.TEXT: None,
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.CODE: "code",
+}
+
+
 def text_node_to_html_node(text_node: TextNode) -> LeafNode:
-    match text_node.text_type:
-        case TextType.TEXT:
-            return LeafNode(None, text_node.text)
-        case TextType.BOLD:
-            return LeafNode("b", text_node.text)
-        case TextType.ITALIC:
-            return LeafNode("i", text_node.text)
-        case TextType.CODE:
-            return LeafNode("code", text_node.text)
-        case TextType.LINK:
-            if not text_node.url:
-                raise ValueError("Link text node must have a URL")
-            return LeafNode("a", text_node.text, {"href": text_node.url})
-        case TextType.IMAGE:
-            if not text_node.url:
-                raise ValueError("Image text node must have a URL")
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
-
-
-def block_to_parent_node(block: str, block_type: BlockType) -> ParentNode:
+    return token_to_html_node(text_node.text_type, text_node.text, text_node.url)
+
+
+def token_to_html_node(text_type: TextType, text: str, url: Optional[str] = None) -> LeafNode:
+    if text_type in TEXTTYPE_TO_TAGS:
+        return LeafNode(TEXTTYPE_TO_TAGS[text_type], text)
+    if text_type == TextType.LINK:
+        if not url:
+            raise ValueError("Link text node must have a URL")
+        return LeafNode("a", text, {"href": url})
+    if text_type == TextType.IMAGE:
+        if not url:
+            raise ValueError("Image text node must have a URL")
+        return LeafNode("img", "", {"src": url, "alt": text})
+
+
+def text_to_leafnodes(text: str) -> list[LeafNode]:
+    # Builds leaves straight from the scanner tokens instead of going through TextNode objects
+    if DEFAULT_INLINE_ENGINE != "scanner":
+        return [text_node_to_html_node(node) for node in text_to_textnodes(text)]
+    return [token_to_html_node(*token) for token in scan_inline(text)]
+
+
+def _inline_children(text: str, inline: Optional[Callable[[str], list[TextNode]]]) -> list[LeafNode]:
+    if inline is None:
+        return text_to_leafnodes(text)
+    return [text_node_to_html_node(node) for node in inline(text)]
+
+
+def block_to_parent_node(block: str, block_type: BlockType, inline: Optional[Callable[[str], list[TextNode]]] = None) -> ParentNode:
     block = block.strip()
     if block_type == BlockType.PARAGRAPH:
-        return ParentNode("p", [text_node_to_html_node(node) for node in text_to_textnodes(block)], None)
+        return ParentNode("p", _inline_children(block, inline), None)
     elif block_type == BlockType.HEADING:
         level = block.split(" ")[0].count("#")
-        return ParentNode(f"h{level}", [text_node_to_html_node(node) for node in text_to_textnodes(block[level + 1:])], None)
+        return ParentNode(f"h{level}", _inline_children(block[level + 1:], inline), None)
     elif block_type == BlockType.CODE:
-        return ParentNode("pre", [ParentNode("code", [text_node_to_html_node(node) for node in text_to_textnodes(block[3:-3])], None)], None)
+        # Code is literal text, inline markers inside it are not parsed
+        return ParentNode("pre", [code_block_node(block[3:-3])], None)
     elif block_type == BlockType.QUOTE:
-        return ParentNode("blockquote", [text_node_to_html_node(node) for node in text_to_textnodes(block[2:].replace("\n> ", "\n"))], None)
+        return ParentNode("blockquote", _inline_children(block[2:].replace("\n> ", "\n"), inline), None)
     elif block_type == BlockType.UNORDERED_LIST:
-        return ParentNode("ul", [ParentNode("li", [text_node_to_html_node(node) for node in text_to_textnodes(line[2:])], None) for line in block.split("\n")], None)
+        return ParentNode("ul", [ParentNode("li", _inline_children(line[2:], inline), None) for line in block.split("\n")], None)
     elif block_type == BlockType.ORDERED_LIST:
-        return ParentNode("ol", [ParentNode("li", [text_node_to_html_node(node) for node in text_to_textnodes(line[3:])], None) for line in block.split("\n")], None)
+        return ParentNode("ol", [ParentNode("li", _inline_children(line[3:], inline), None) for line in block.split("\n")], None)
     raise ValueError("Invalid block type")
 
 
@@ -93,8 +118,7 @@ def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, text_type:
         if node.text_type != TextType.TEXT:
             new_nodes.append(node)
             continue
-        # This assumes that we're using standard markdown delimiters, will not work for generic delimiters
-        parts = re.split(rf'(?<!{re.escape(delimiter[-1])}){re.escape(delimiter)}(?!{re.escape(delimiter[0])})', node.text)
+        parts = delimiter_pattern(delimiter).split(node.text)
         if len(parts) != 1 and len(parts) % 2 == 0:
             raise ValueError("Unclosed delimiter")
         for i, part in enumerate(parts):
@@ -106,12 +130,30 @@ def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, text_type:
     return new_nodes
 
 
+DELIMITER_PATTERNS: dict[str, re.Pattern] = {}
+EXTRACT_IMAGE_PATTERN = re.compile(r"(!\[(.*?)\]\((.+?)\))")
+EXTRACT_LINK_PATTERN = re.compile(r"((?<!\!)\[(.*?)\]\((.+?)\))")
+
+
+def delimiter_pattern(delimiter: str) -> re.Pattern:
+    pattern = DELIMITER_PATTERNS.get(delimiter)
+    if pattern is None:
+        # This assumes that we're using standard markdown delimiters, will not work for generic delimiters
+        pattern = re.compile(rf'(?<!{re.escape(delimiter[-1])}){re.escape(delimiter)}(?!{re.escape(delimiter[0])})')
+        DELIMITER_PATTERNS[delimiter] = pattern
+    return pattern
+
+
+for _delimiter in TEXTTYPE_TO_DELIMITERS.values():
+    delimiter_pattern(_delimiter)
+
+
 def extract_markdown_images(text: str) -> list[tuple[str]]:
-    return re.findall(r"(!\[(.*?)\]\((.+?)\))", text)
+    return EXTRACT_IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text: str) -> list[tuple[str]]:
-    return re.findall(r"((?<!\!)\[(.*?)\]\((.+?)\))", text)
+    return EXTRACT_LINK_PATTERN.findall(text)
 
 
 def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
@@ -156,44 +198,139 @@ def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     return new_nodes
 
 
+BLANK_LINES_PATTERN = re.compile(r"\n\n+")
+FENCE_CLOSE_PATTERN = re.compile(r"```[^\S\n]*$", re.MULTILINE)
+LINE_PREFIX_PATTERNS = {
+    BlockType.QUOTE: re.compile(r"\n(?!>)"),
+    "- ": re.compile(r"\n(?!- )"),
+    "* ": re.compile(r"\n(?!\* )"),
+}
+
+
 def markdown_to_blocks(markdown: str) -> list[str]:
-    return [block.strip() for block in markdown.split("\n\n") if block.strip()]
+    return [markdown[start:end] for start, end in block_spans(markdown)]
+
+
+def scan_blocks(markdown: str) -> list[tuple[BlockType, int, int]]:
+    return [(classify_block(markdown, start, end), start, end) for start, end in block_spans(markdown)]
+
+
+def block_spans(markdown: str) -> Iterator[tuple[int, int]]:
+    # Walks the document once. Blocks are separated by blank lines, except that a fenced code block
+    # continues until its closing fence even across blank lines. Blocks are yielded as stripped
+    # (start, end) offsets into the document.
+    position = 0
+    fence_start = None
+    for separator in itertools.chain(BLANK_LINES_PATTERN.finditer(markdown), (None,)):
+        chunk_end = len(markdown) if separator is None else separator.start()
+        if fence_start is not None:
+            if FENCE_CLOSE_PATTERN.search(markdown, position, chunk_end) or separator is None:
+                yield _strip_span(markdown, fence_start, chunk_end)
+                fence_start = None
+        else:
+            span = _strip_span(markdown, position, chunk_end)
+            if span is None:
+                pass
+            elif separator is not None and markdown.startswith("```", *span) and _opens_fence(markdown, *span):
+                fence_start = span[0]
+            else:
+                yield span
+        if separator is not None:
+            position = separator.end()
+
+
+def iter_blocks(lines: Iterable[str]) -> Iterator[tuple[BlockType, str]]:
+    # Line-at-a-time counterpart of scan_blocks for file objects: only the current block is held in
+    # memory, and fences are tracked the same way as in block_spans.
+    run = []
+    has_content = False
+    fence_open = False
+    for line in lines:
+        if line.endswith("\n"):
+            line = line[:-1]
+        if not line and not fence_open:
+            if run:
+                yield from _close_block(run)
+                run = []
+                has_content = False
+            continue
+        run.append(line)
+        if fence_open:
+            fence_open = not line.rstrip().endswith("```")
+        elif not has_content and not line.isspace():
+            has_content = True
+            stripped = line.strip()
+            fence_open = stripped.startswith("```") and (len(stripped) < 6 or not stripped.endswith("```"))
+    if run:
+        yield from _close_block(run)
+
+
+def _close_block(run: list[str]) -> Iterator[tuple[BlockType, str]]:
+    block = "\n".join(run).strip()
+    if block:
+        yield classify_block(block, 0, len(block)), block
+
+
+def _opens_fence(markdown: str, start: int, end: int) -> bool:
+    line_end = markdown.find("\n", start, end)
+    first_line = markdown[start:end if line_end == -1 else line_end].rstrip()
+    if len(first_line) >= 6 and first_line.endswith("```"):
+        return False
+    return line_end == -1 or FENCE_CLOSE_PATTERN.search(markdown, line_end + 1, end) is None
+
+
+def _strip_span(markdown: str, start: int, end: int) -> Optional[tuple[int, int]]:
+    if start < end and not markdown[start].isspace() and not markdown[end - 1].isspace():
+        return start, end
+    while start < end and markdown[start].isspace():
+        start += 1
+    while end > start and markdown[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
 
 
 def block_to_block_type(block: str) -> BlockType:
     block = block.strip()
-    if block.startswith("#"):
-        if '# ' not in block[:7]:
+    return classify_block(block, 0, len(block))
+
+
+def classify_block(markdown: str, start: int, end: int) -> BlockType:
+    # Same rules as checking each line of markdown[start:end], without slicing the block or its lines
+    first = markdown[start]
+    if first == "#":
+        if markdown.find("# ", start, min(start + 7, end)) == -1:
             raise ValueError("Invalid heading block")
         return BlockType.HEADING
-    elif block.startswith("```"):
-        if not block.endswith("```"):
+    elif first == "`" and markdown.startswith("```", start, end):
+        if not markdown.endswith("```", start, end):
             raise ValueError("Invalid code block")
         return BlockType.CODE
-    elif block.startswith(">"):
-        for line in block.split("\n"):
-            if not line.startswith(">"):
-                raise ValueError("Invalid quote block")
+    elif first == ">":
+        if LINE_PREFIX_PATTERNS[BlockType.QUOTE].search(markdown, start, end):
+            raise ValueError("Invalid quote block")
         return BlockType.QUOTE
-    if block.startswith("- "):
-        for line in block.split("\n"):
-            if not line.startswith("- "):
-                raise ValueError("Invalid unordered list block")
-        return BlockType.UNORDERED_LIST
-    if block.startswith("* "):
-        for line in block.split("\n"):
-            if not line.startswith("* "):
-                raise ValueError("Invalid unordered list block")
+    if (first == "-" or first == "*") and markdown.startswith(" ", start + 1, end):
+        if LINE_PREFIX_PATTERNS[markdown[start:start + 2]].search(markdown, start, end):
+            raise ValueError("Invalid unordered list block")
         return BlockType.UNORDERED_LIST
-    if block[0].isdigit():
-        for line in block.split("\n"):
-            if not line[0].isdigit() or line[1:3] != ". ":
+    if first.isdigit():
+        line_start = start
+        while line_start < end:
+            line_end = markdown.find("\n", line_start, end)
+            if line_end == -1:
+                line_end = end
+            if line_start == line_end or not markdown[line_start].isdigit() or not markdown.startswith(". ", line_start + 1, line_end):
                 raise ValueError("Invalid ordered list block")
+            line_start = line_end + 1
         return BlockType.ORDERED_LIST
     return BlockType.PARAGRAPH
 
 
-def text_to_textnodes(text: str) -> list[TextNode]:
+def text_to_textnodes(text: str, engine: Optional[str] = None) -> list[TextNode]:
+    return INLINE_ENGINES[engine or DEFAULT_INLINE_ENGINE](text)
+
+
+def split_text_passes(text: str) -> list[TextNode]:
     node = TextNode(text, TextType.TEXT)
     parts = [node]
     for text_type in TextType:
@@ -207,3 +344,166 @@ def text_to_textnodes(text: str) -> list[TextNode]:
             parts = split_nodes_link(parts)
     return parts
 
+
+def split_text_scanner(text: str) -> list[TextNode]:
+    return [TextNode(value, text_type, url) for text_type, value, url in scan_inline(text)]
+
+
+DELIMITER_RUN_PATTERN = re.compile(r"\*+|`+")
+IMAGE_PATTERN = re.compile(r"!\[(.*?)\]\((.+?)\)")
+LINK_PATTERN = re.compile(r"(?<!\!)\[(.*?)\]\((.+?)\)")
+
+
+class InlineMemo:
+    __slots__ = ("maxsize", "max_length", "entries", "hits", "misses")
+
+    def __init__(self, maxsize: int = 4096, max_length: int = 1024) -> None:
+        if maxsize < 1:
+            raise ValueError("Inline memo size must be positive")
+        self.maxsize = maxsize
+        self.max_length = max_length
+        self.entries: collections.OrderedDict[str, tuple] = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f"InlineMemo({self.maxsize=}, {len(self.entries)=}, {self.hits=}, {self.misses=})"
+
+    def get(self, text: str) -> Optional[tuple]:
+        tokens = self.entries.get(text)
+        if tokens is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(text)
+        self.hits += 1
+        return tokens
+
+    def put(self, text: str, tokens: tuple) -> None:
+        self.entries[text] = tokens
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "maxsize": self.maxsize}
+
+    def merge(self, hits: int, misses: int) -> None:
+        # Worker processes keep their own memo and report their counters back to the parent
+        self.hits += hits
+        self.misses += misses
+
+
+INLINE_MEMO: Optional[InlineMemo] = None
+
+
+def enable_inline_memo(maxsize: int = 4096, max_length: int = 1024) -> InlineMemo:
+    global INLINE_MEMO
+    INLINE_MEMO = InlineMemo(maxsize, max_length)
+    return INLINE_MEMO
+
+
+def disable_inline_memo() -> None:
+    global INLINE_MEMO
+    INLINE_MEMO = None
+
+
+def current_inline_memo() -> Optional[InlineMemo]:
+    return INLINE_MEMO
+
+
+def inline_memo_stats() -> Optional[dict[str, int]]:
+    return INLINE_MEMO.stats() if INLINE_MEMO is not None else None
+
+
+def format_memo_stats(stats: dict[str, int]) -> str:
+    lookups = stats["hits"] + stats["misses"]
+    rate = stats["hits"] / lookups * 100 if lookups else 0.0
+    return f"Inline memo: {stats['hits']} hits, {stats['misses']} misses ({rate:.1f}% hit rate), capacity {stats['maxsize']}"
+
+
+def scan_inline(text: str) -> list[tuple[TextType, str, Optional[str]]]:
+    # Tokens are immutable tuples, so repeated fragments (nav snippets, footers, list items) can share them
+    memo = INLINE_MEMO
+    if memo is None or len(text) > memo.max_length:
+        return _scan_inline(text)
+    tokens = memo.get(text)
+    if tokens is None:
+        tokens = tuple(_scan_inline(text))
+        memo.put(text, tokens)
+    return list(tokens)
+
+
+def _scan_inline(text: str) -> list[tuple[TextType, str, Optional[str]]]:
+    # Mirrors the chained split_nodes_* passes: only runs of exactly "**", "*" or "`" are delimiters,
+    # bold is resolved before italic before code, and links and then images are only searched for in
+    # the plain text that remains. Delimiters are located in one scan and spans are sliced once.
+    # Unlike the passes, which split around the first occurrence of a link literal, an image followed
+    # by the same text as a link keeps both nodes.
+    delimiters = {"**": [], "*": [], "`": []}
+    for match in DELIMITER_RUN_PATTERN.finditer(text):
+        positions = delimiters.get(match.group())
+        if positions is not None:
+            positions.append(match.start())
+    levels = (
+        (delimiters["**"], 2, TextType.BOLD),
+        (delimiters["*"], 1, TextType.ITALIC),
+        (delimiters["`"], 1, TextType.CODE),
+    )
+    tokens = []
+    _scan_delimited(text, 0, len(text), levels, 0, tokens)
+    return tokens
+
+
+def _scan_delimited(
+        text: str,
+        start: int,
+        end: int,
+        levels: tuple[tuple[list[int], int, TextType], ...],
+        level: int,
+        tokens: list[tuple[TextType, str, Optional[str]]],
+    ) -> None:
+    if level == len(levels):
+        _scan_links(text, start, end, tokens)
+        return
+    positions, width, text_type = levels[level]
+    lo = bisect.bisect_left(positions, start)
+    hi = bisect.bisect_left(positions, end)
+    if (hi - lo) % 2:
+        raise ValueError("Unclosed delimiter")
+    cursor = start
+    for i in range(lo, hi, 2):
+        opening, closing = positions[i], positions[i + 1]
+        if cursor < opening:
+            _scan_delimited(text, cursor, opening, levels, level + 1, tokens)
+        if opening + width < closing:
+            tokens.append((text_type, text[opening + width:closing], None))
+        cursor = closing + width
+    if cursor < end:
+        _scan_delimited(text, cursor, end, levels, level + 1, tokens)
+
+
+def _scan_links(text: str, start: int, end: int, tokens: list[tuple[TextType, str, Optional[str]]]) -> None:
+    cursor = start
+    for match in LINK_PATTERN.finditer(text, start, end):
+        # split_nodes_link keeps the text before every link, even when it is empty
+        _scan_images(text, cursor, match.start(), tokens)
+        tokens.append((TextType.LINK, match.group(1), match.group(2)))
+        cursor = match.end()
+    if cursor == start or cursor < end:
+        _scan_images(text, cursor, end, tokens)
+
+
+def _scan_images(text: str, start: int, end: int, tokens: list[tuple[TextType, str, Optional[str]]]) -> None:
+    cursor = start
+    for match in IMAGE_PATTERN.finditer(text, start, end):
+        tokens.append((TextType.TEXT, text[cursor:match.start()], None))
+        tokens.append((TextType.IMAGE, match.group(1), match.group(2)))
+        cursor = match.end()
+    if cursor == start or cursor < end:
+        tokens.append((TextType.TEXT, text[cursor:end], None))
+
+
+INLINE_ENGINES = {
+    "scanner": split_text_scanner,
+    "passes": split_text_passes,
+}
+DEFAULT_INLINE_ENGINE = "scanner"
@@ -0,0 +1,53 @@
+import os
+import pathlib
+
+
+def snapshot(paths: list[pathlib.Path]) -> dict[pathlib.Path, tuple[int, int]]:
+    files = {}
+    for path in paths:
+        _snapshot_into(pathlib.Path(path), files)
+    return files
+
+
+def _snapshot_into(path: pathlib.Path, files: dict[pathlib.Path, tuple[int, int]]) -> None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return
+    if not path.is_dir():
+        files[path] = (stat.st_mtime_ns, stat.st_size)
+        return
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                _snapshot_into(pathlib.Path(entry.path), files)
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files[pathlib.Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+
+
+def diff_snapshots(
+        old: dict[pathlib.Path, tuple[int, int]],
+        new: dict[pathlib.Path, tuple[int, int]],
+    ) -> tuple[set[pathlib.Path], set[pathlib.Path]]:
+    changed = {path for path, signature in new.items() if old.get(path) != signature}
+    removed = old.keys() - new.keys()
+    return changed, removed
+
+
+class Watcher:
+    def __init__(self, paths: list[pathlib.Path]) -> None:
+        self.paths = [pathlib.Path(path) for path in paths]
+        self.files = snapshot(self.paths)
+
+    def __repr__(self) -> str:
+        return f"Watcher({self.paths=}, {len(self.files)=})"
+
+    def poll(self) -> tuple[set[pathlib.Path], set[pathlib.Path]]:
+        files = snapshot(self.paths)
+        changed, removed = diff_snapshots(self.files, files)
+        self.files = files
+        return changed, removed
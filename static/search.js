@@ -0,0 +1,109 @@
+// Client for the index written by `main.py --search` into /search/. The document list and each
+// term-prefix shard are fetched only when a query needs them and are cached for later queries.
+const SEARCH_ROOT = "/search/";
+const MIN_TERM_LENGTH = 2;
+const SHARD_PREFIX_BYTES = 2;
+const shards = new Map();
+let documents = null;
+
+function tokenize(text) {
+    return (text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || []).filter((term) => term.length >= MIN_TERM_LENGTH);
+}
+
+function shardName(term) {
+    const bytes = new TextEncoder().encode(term).slice(0, SHARD_PREFIX_BYTES);
+    return Array.from(bytes, (byte) => byte.toString(16).padStart(2, "0")).join("");
+}
+
+function decodeShard(data) {
+    const decoder = new TextDecoder();
+    const postings = new Map();
+    let position = 0;
+    const varint = () => {
+        let value = 0;
+        let shift = 0;
+        let byte;
+        do {
+            byte = data[position++];
+            value += (byte & 0x7f) * 2 ** shift;
+            shift += 7;
+        } while (byte >= 0x80);
+        return value;
+    };
+    while (position < data.length) {
+        const length = varint();
+        const term = decoder.decode(data.subarray(position, position + length));
+        position += length;
+        const entries = [];
+        let document = 0;
+        for (let count = varint(); count > 0; count--) {
+            document += varint();
+            entries.push([document, varint()]);
+        }
+        postings.set(term, entries);
+    }
+    return postings;
+}
+
+function loadShard(name) {
+    if (!shards.has(name)) {
+        shards.set(name, fetch(SEARCH_ROOT + name + ".bin").then((response) =>
+            response.ok ? response.arrayBuffer().then((buffer) => decodeShard(new Uint8Array(buffer))) : new Map()
+        ));
+    }
+    return shards.get(name);
+}
+
+function loadDocuments() {
+    if (documents === null) {
+        documents = fetch(SEARCH_ROOT + "docs.json").then((response) => response.json());
+    }
+    return documents;
+}
+
+// Returns the pages containing every query term, best matches first, as {url, title, score}
+async function search(query) {
+    const terms = [...new Set(tokenize(query))];
+    if (terms.length === 0) {
+        return [];
+    }
+    const postings = await Promise.all(terms.map((term) => loadShard(shardName(term)).then((shard) => shard.get(term) || [])));
+    let scores = new Map(postings[0]);
+    for (const entries of postings.slice(1)) {
+        const next = new Map();
+        for (const [document, frequency] of entries) {
+            if (scores.has(document)) {
+                next.set(document, scores.get(document) + frequency);
+            }
+        }
+        scores = next;
+    }
+    const docs = await loadDocuments();
+    return [...scores]
+        .sort((a, b) => b[1] - a[1])
+        .map(([document, score]) => ({ url: docs[document][0], title: docs[document][1], score }));
+}
+
+// Optional wiring for a page with <input id="search"> and <ul id="search-results">
+document.addEventListener("DOMContentLoaded", () => {
+    const input = document.getElementById("search");
+    const list = document.getElementById("search-results");
+    if (!input || !list) {
+        return;
+    }
+    input.addEventListener("input", async () => {
+        const query = input.value;
+        const results = await search(query);
+        if (query !== input.value) {
+            return;
+        }
+        list.replaceChildren(...results.slice(0, 20).map((result) => {
+            const item = document.createElement("li");
+            const link = document.createElement("a");
+            link.href = result.url;
+            link.textContent = result.title;
+            item.append(link);
+            return item;
+        }));
+    });
+});